@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+집계 경로 메모리/시간 벤치마크
+
+한 달치(기본 30일 x 3개 스토어) 합성 주문 데이터를 만들어
+object 문자열 표현과 category/다운캐스트 표현(config.COMPACT_DTYPES)의
+최대 메모리 사용량과 groupby 시간을 비교합니다.
+
+사용법: python benchmarks/bench_aggregation.py [--rows-per-file 20000] [--days 30] [--stores 3]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from modules import config
+from modules import report_generator
+
+def make_catalog(n_products=300, options_per_product=4, seed=0):
+    """마진정보와 비슷한 형태의 합성 상품 카탈로그 생성"""
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(9_000_000_000, 12_000_000_000, n_products)
+    rows = []
+    for pid in ids:
+        name = f"합성상품 {pid} 차량용 무선 청소기 휴대용 세트"
+        for k in range(options_per_product):
+            rows.append((str(pid), name, f"선택: 옵션 {k + 1}개"))
+    return pd.DataFrame(rows, columns=['상품ID', '상품명', '옵션정보'])
+
+def make_order_frames(catalog, days, stores, rows_per_file, seed=1):
+    """스토어 x 날짜별 주문조회 프레임 목록 생성 (모든 키는 object 문자열)"""
+    rng = np.random.default_rng(seed)
+    statuses = np.array(['', '취소완료', '반품완료', '교환요청'], dtype=object)
+    frames = []
+    for s in range(stores):
+        for d in range(days):
+            idx = rng.integers(0, len(catalog), rows_per_file)
+            picked = catalog.iloc[idx]
+            frames.append(pd.DataFrame({
+                '상품주문번호': rng.integers(0, rows_per_file, rows_per_file),
+                '상품ID': picked['상품ID'].to_numpy(dtype=object),
+                '상품명': picked['상품명'].to_numpy(dtype=object),
+                '옵션정보': picked['옵션정보'].to_numpy(dtype=object),
+                '클레임상태': rng.choice(statuses, rows_per_file, p=[0.85, 0.06, 0.05, 0.04]),
+                '수량': rng.integers(1, 4, rows_per_file),
+                '스토어명': f"스토어{s}",
+            }))
+    return frames
+
+def run_aggregation(frames, catalog):
+    """한 달치 프레임을 준비 -> 병합 -> 옵션별 집계하고 (보유 메모리, 최대 메모리, groupby 시간) 반환"""
+    group_cols = ['스토어명', '상품ID', '상품명', '옵션정보']
+    key_dtypes = {
+        '상품ID': report_generator.build_category_dtype(catalog['상품ID']),
+        '상품명': report_generator.build_category_dtype(catalog['상품명']),
+        '옵션정보': report_generator.build_category_dtype(catalog['옵션정보']),
+        '스토어명': report_generator.build_category_dtype(*[f['스토어명'].iloc[:1] for f in frames]),
+    }
+
+    tracemalloc.start()
+    prepared = []
+    for frame in frames:
+        df = report_generator.compact_frame(frame.copy(), key_dtypes)
+        cancel_mask = df['클레임상태'].isin(config.CANCEL_OR_REFUND_STATUSES)
+        df['환불수량'] = df['수량'].where(cancel_mask, 0)
+        prepared.append(df)
+    held_bytes = sum(df.memory_usage(deep=True).sum() for df in prepared)
+
+    # 한 달치를 한 프레임으로 모은 뒤 스토어 x 상품 x 옵션 단위로 집계 (consolidate_daily_reports와 같은 형태)
+    month_df = pd.concat(prepared, ignore_index=True)
+    start = time.perf_counter()
+    month_df.groupby(group_cols, as_index=False, observed=True).agg({'수량': 'sum', '환불수량': 'sum'})
+    groupby_seconds = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held_bytes, peak, groupby_seconds
+
+def main():
+    parser = argparse.ArgumentParser(description="집계 경로 메모리/시간 벤치마크")
+    parser.add_argument('--rows-per-file', type=int, default=20000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--stores', type=int, default=3)
+    args = parser.parse_args()
+
+    catalog = make_catalog()
+    frames = make_order_frames(catalog, args.days, args.stores, args.rows_per_file)
+    total_rows = sum(len(f) for f in frames)
+    print(f"합성 데이터: {len(frames)}개 파일, 총 {total_rows:,}행")
+
+    results = {}
+    for label, compact in [('object', False), ('compact', True)]:
+        config.COMPACT_DTYPES = compact
+        results[label] = run_aggregation(frames, catalog)
+        held, peak, seconds = results[label]
+        print(f"{label:>8}: 보유 메모리 {held / 1024 / 1024:8.1f} MB, 최대 메모리 {peak / 1024 / 1024:8.1f} MB, "
+              f"groupby {seconds:6.2f} s")
+
+    _, base_peak, base_seconds = results['object']
+    _, new_peak, new_seconds = results['compact']
+    print(f"감소율: 메모리 {1 - new_peak / base_peak:.0%}, groupby 시간 {1 - new_seconds / base_seconds:.0%}")
+
+if __name__ == '__main__':
+    main()
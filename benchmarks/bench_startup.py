@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+시작 속도 벤치마크
+
+새 파이썬 프로세스에서 `python -X importtime -c "import desktop_app"`을 실행해
+패키지별 누적 import 시간과 전체 시간을 출력하고, 창 생성 시간을 측정합니다.
+무거운 모듈(pandas/numpy/watchdog 등)이 시작 시점에 불러와지지 않는지도 확인합니다.
+
+사용법: python benchmarks/bench_startup.py [--repeat 3]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 누적 시간을 집계할 최상위 패키지
+TRACKED_PACKAGES = ('PyQt5', 'pandas', 'numpy', 'openpyxl', 'watchdog', 'msoffcrypto', 'modules')
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl', 'watchdog', 'msoffcrypto', 'modules.report_generator')
+
+WINDOW_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+import desktop_app
+imported = time.perf_counter()
+app = QApplication(sys.argv)
+from modules import config
+config.WARM_IMPORTS_ON_STARTUP = False
+window = desktop_app.DesktopApp()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+heavy = [name for name in %r if name in sys.modules]
+print(f"{imported - start:.4f} {shown - start:.4f} {','.join(heavy) or '-'}")
+""" % (HEAVY_MODULES,)
+
+def _child_env():
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    return env
+
+def measure_import_time():
+    """-X importtime 출력에서 최상위 패키지별 누적 시간(초)과 desktop_app 전체 시간을 계산"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import desktop_app'],
+        cwd=ROOT, env=_child_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import 실패')
+
+    per_package = {name: 0.0 for name in TRACKED_PACKAGES}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = _parse_line(line)
+        top_level = name.split('.')[0]
+        # 같은 패키지 안의 하위 모듈은 상위 모듈 누적 시간에 포함되므로 자신(self) 시간만 더함
+        if top_level in per_package:
+            per_package[top_level] += self_us / 1e6
+        if name == 'desktop_app':
+            total = cumulative_us / 1e6
+    return per_package, total
+
+def _parse_line(line):
+    """'import time: self | cumulative | name' 한 줄을 (self_us, cumulative_us, name)으로 분리"""
+    self_part, cumulative_part, name_part = line[len('import time:'):].split('|')
+    return int(self_part), int(cumulative_part), name_part.strip()
+
+def measure_window():
+    """창 생성까지의 시간과 시작 시점에 불러온 무거운 모듈 목록"""
+    result = subprocess.run(
+        [sys.executable, '-c', WINDOW_SCRIPT],
+        cwd=ROOT, env=_child_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else '창 생성 실패')
+    import_s, shown_s, heavy = result.stdout.strip().splitlines()[-1].split()
+    return float(import_s), float(shown_s), [] if heavy == '-' else heavy.split(',')
+
+def main():
+    parser = argparse.ArgumentParser(description='시작 속도 벤치마크')
+    parser.add_argument('--repeat', type=int, default=3, help='반복 횟수 (최솟값을 보고)')
+    args = parser.parse_args()
+
+    best_packages, best_total = None, None
+    for _ in range(args.repeat):
+        per_package, total = measure_import_time()
+        if best_total is None or total < best_total:
+            best_packages, best_total = per_package, total
+
+    print(f"=== import desktop_app (최소 {args.repeat}회 중) ===")
+    for name in TRACKED_PACKAGES:
+        print(f"  {name:<12} {best_packages[name] * 1000:8.1f} ms")
+    print(f"  {'합계':<10} {best_total * 1000:8.1f} ms")
+
+    windows = [measure_window() for _ in range(args.repeat)]
+    import_s, shown_s, heavy = min(windows, key=lambda item: item[1])
+    print("=== 창 표시 ===")
+    print(f"  import 완료  {import_s * 1000:8.1f} ms")
+    print(f"  창 표시      {shown_s * 1000:8.1f} ms")
+    print(f"  시작 시 불러온 무거운 모듈: {', '.join(heavy) if heavy else '없음'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+엑셀 쓰기 방식 시간/메모리 벤치마크
+
+전체 통합 리포트와 같은 열 구성의 합성 데이터를 만들어
+'standard'(pandas to_excel + 표 서식)와 'fast'(constant_memory 행 단위 기록 + 표본 열 너비)
+두 방식으로 기록하고 시간, 최대 메모리, 파일 크기를 비교합니다.
+
+사용법: python benchmarks/bench_xlsx_writer.py [--rows 200000] [--output-dir /tmp]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from modules import xlsx_writer
+
+def make_report_frame(rows, seed=0):
+    """전체 통합 리포트 형태의 합성 데이터 (문자열 키 + 정수/실수 지표)"""
+    rng = np.random.default_rng(seed)
+    product_ids = rng.integers(9_000_000_000, 12_000_000_000, 300)
+    idx = rng.integers(0, len(product_ids), rows)
+    sales = rng.integers(0, 2_000_000, rows)
+    return pd.DataFrame({
+        '스토어명': [f"스토어{i % 5}" for i in range(rows)],
+        '상품ID': product_ids[idx].astype(str),
+        '상품명': [f"합성상품 {product_ids[i]} 차량용 무선 청소기 휴대용 세트" for i in idx],
+        '옵션정보': [f"선택: 옵션 {i % 4 + 1}개" for i in range(rows)],
+        '판매수량': rng.integers(0, 50, rows),
+        '판매가': sales,
+        '순매출': sales * 0.9,
+        '순이익': sales * rng.uniform(-0.2, 0.4, rows),
+        '마진율': rng.uniform(-20, 40, rows).round(1),
+    })
+
+def run_profile(df, profile, output_dir):
+    """(기록 시간, 최대 메모리, 파일 크기) 반환"""
+    output_path = os.path.join(output_dir, f'bench_{profile}.xlsx')
+    sheets = [xlsx_writer.Sheet('전체 통합 데이터', df, styled=True)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    xlsx_writer.write_workbook(output_path, sheets, profile=profile)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(output_path)
+    os.remove(output_path)
+    return seconds, peak, size
+
+def main():
+    parser = argparse.ArgumentParser(description="엑셀 쓰기 방식 시간/메모리 벤치마크")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--output-dir', default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    df = make_report_frame(args.rows)
+    print(f"합성 데이터: {len(df):,}행 x {len(df.columns)}열")
+
+    results = {}
+    for profile in xlsx_writer.PROFILES:
+        results[profile] = run_profile(df, profile, args.output_dir)
+        seconds, peak, size = results[profile]
+        print(f"{profile:>8}: 기록 {seconds:6.2f} s, 최대 메모리 {peak / 1024 / 1024:8.1f} MB, "
+              f"파일 {size / 1024 / 1024:6.1f} MB")
+
+    base_seconds, base_peak, _ = results['standard']
+    new_seconds, new_peak, _ = results['fast']
+    print(f"감소율: 시간 {1 - new_seconds / base_seconds:.0%}, 메모리 {1 - new_peak / base_peak:.0%}")
+
+if __name__ == '__main__':
+    main()
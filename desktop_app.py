@@ -1,16 +1,185 @@
 import sys
 import os
 import logging
-import json
-import pandas as pd
-from datetime import datetime, date
+from datetime import date
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLineEdit, QTextEdit, QFileDialog, QLabel, QGroupBox, QGridLayout,
-    QDialog, QTableWidget, QTableWidgetItem, QDateEdit, QHeaderView,
-    QMessageBox, QSpinBox
+    QLineEdit, QPlainTextEdit, QFileDialog, QLabel, QGroupBox, QGridLayout, QProgressBar,
+    QDialog, QTableView, QStyledItemDelegate, QDateEdit, QHeaderView,
+    QMessageBox, QSpinBox, QComboBox, QTableWidget, QTableWidgetItem, QAbstractItemView
 )
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QDate
+from PyQt5.QtCore import (
+    QObject, QTimer, pyqtSignal, Qt, QDate, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QUrl
+)
+from PyQt5.QtGui import QDesktopServices
+# pandas/numpy는 시작 속도를 위해 처음 필요할 때 불러옴 (창 표시 후 백그라운드에서 미리 로드)
+from modules import config
+from modules import progress
+from modules.settings_store import normalize_product_id, reward_store, purchase_store
+from modules.log_sink import LogRingBuffer, RingBufferHandler, setup_file_logging, LOG_FORMAT
+
+# --- Product Table Model (리워드/가구매 공용) ---
+class ProductTableModel(QAbstractTableModel):
+    """
+    상품ID / 상품명 / 현재 값 / 새 값 4개 컬럼을 배열로 보관하는 테이블 모델.
+    뷰는 화면에 보이는 셀만 data()로 요청하므로 상품 수와 관계없이 열리는 시간이 일정합니다.
+    """
+    ID_COLUMN, NAME_COLUMN, CURRENT_COLUMN, NEW_COLUMN = range(4)
+
+    def __init__(self, headers, suffix='', parent=None):
+        super().__init__(parent)
+        import numpy as np
+        import pandas as pd
+        self.headers = headers
+        self.suffix = suffix
+        self.product_ids = np.array([], dtype=object)
+        self.product_names = np.array([], dtype=object)
+        self.current_values = np.zeros(0, dtype=np.int64)
+        self.new_values = np.zeros(0, dtype=np.int64)
+        self.row_by_id = {}
+        self.search_index = pd.Series([], dtype=object)
+
+    def set_products(self, products_df):
+        """상품 DataFrame(상품ID, 상품명)으로 모델 전체를 교체하고 ID/검색 인덱스를 미리 계산"""
+        import numpy as np
+        self.beginResetModel()
+        ids = products_df['상품ID'].astype(str)
+        names = products_df['상품명'].astype(str)
+        self.product_ids = ids.to_numpy(dtype=object)
+        self.product_names = names.to_numpy(dtype=object)
+        self.current_values = np.zeros(len(products_df), dtype=np.int64)
+        self.new_values = np.zeros(len(products_df), dtype=np.int64)
+        # 같은 상품ID가 여러 번 나오면 첫 번째 행을 사용 (기존 동작과 동일)
+        self.row_by_id = {}
+        for row, product_id in enumerate(self.product_ids):
+            self.row_by_id.setdefault(normalize_product_id(product_id), row)
+        # 상품ID와 상품명을 합친 소문자 문자열 - 검색어가 구분자(\x00)를 넘어 매칭되지 않음
+        self.search_index = (ids + '\x00' + names).str.lower().reset_index(drop=True)
+        self.endResetModel()
+
+    def row_for_id(self, product_id):
+        """상품ID에 해당하는 행 번호 (없으면 None)"""
+        return self.row_by_id.get(normalize_product_id(product_id))
+
+    def values_to_save(self):
+        """저장할 {상품ID: 새 값} - 현재 값도 새 값도 0인 행(변경 없음)은 제외"""
+        import numpy as np
+        rows = np.flatnonzero((self.new_values != 0) | (self.current_values != 0))
+        return {self.product_ids[row]: int(self.new_values[row]) for row in rows}
+
+    def match_rows(self, search_text):
+        """검색어가 상품ID 또는 상품명에 포함된 행의 불리언 마스크"""
+        import numpy as np
+        if not search_text:
+            return np.ones(len(self.product_ids), dtype=bool)
+        return self.search_index.str.contains(search_text.lower(), regex=False).to_numpy(dtype=bool)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.product_ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            if column == self.ID_COLUMN:
+                return self.product_ids[row]
+            if column == self.NAME_COLUMN:
+                return self.product_names[row]
+            if column == self.CURRENT_COLUMN:
+                return str(self.current_values[row])
+            return f"{self.new_values[row]}{self.suffix}"
+        if role == Qt.EditRole and column == self.NEW_COLUMN:
+            return int(self.new_values[row])
+        if role == Qt.TextAlignmentRole and column in (self.CURRENT_COLUMN, self.NEW_COLUMN):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() == self.NEW_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole or index.column() != self.NEW_COLUMN:
+            return False
+        self.new_values[index.row()] = int(value)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def set_row_values(self, row, value):
+        """기존 설정 로드: 현재 값과 새 값을 함께 설정"""
+        self.current_values[row] = value
+        self.new_values[row] = value
+        self.dataChanged.emit(self.index(row, self.CURRENT_COLUMN), self.index(row, self.NEW_COLUMN))
+
+    def set_new_values(self, rows, value):
+        """여러 행의 새 값을 한 번에 설정하고 변경 알림은 한 번만 보냄"""
+        if len(rows) == 0:
+            return
+        self.new_values[rows] = value
+        self.dataChanged.emit(self.index(int(min(rows)), self.NEW_COLUMN), self.index(int(max(rows)), self.NEW_COLUMN))
+
+
+class ProductFilterProxyModel(QSortFilterProxyModel):
+    """
+    ProductTableModel용 검색 필터.
+    검색어가 바뀔 때 원본 모델의 검색 인덱스로 마스크를 한 번에 계산하고,
+    filterAcceptsRow는 마스크만 조회합니다.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search_text = ''
+        self.accepted = None
+
+    def set_search_text(self, search_text):
+        self.search_text = search_text
+        self.accepted = self.sourceModel().match_rows(search_text)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.accepted is None or len(self.accepted) != self.sourceModel().rowCount():
+            # 원본 모델이 교체된 경우 마스크 재계산
+            self.accepted = self.sourceModel().match_rows(self.search_text)
+        return bool(self.accepted[source_row])
+
+    def accepted_source_rows(self):
+        """현재 필터를 통과한 원본 행 번호 배열"""
+        import numpy as np
+        return np.flatnonzero(self.sourceModel().match_rows(self.search_text))
+
+
+class SpinBoxDelegate(QStyledItemDelegate):
+    """새 값 컬럼 편집용 델리게이트 - 편집 중인 셀에만 QSpinBox를 생성"""
+    def __init__(self, maximum, suffix='', single_step=1, parent=None):
+        super().__init__(parent)
+        self.maximum = maximum
+        self.suffix = suffix
+        self.single_step = single_step
+
+    def createEditor(self, parent, option, index):
+        spinbox = QSpinBox(parent)
+        spinbox.setRange(0, self.maximum)
+        spinbox.setSuffix(self.suffix)
+        spinbox.setSingleStep(self.single_step)
+        return spinbox
+
+    def setEditorData(self, editor, index):
+        editor.setValue(index.data(Qt.EditRole) or 0)
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.EditRole)
+
 
 # --- Reward Manager Dialog ---
 class RewardManagerDialog(QDialog):
@@ -21,9 +190,9 @@ class RewardManagerDialog(QDialog):
         self.setFixedSize(900, 700)
         self.setModal(True)
         
-        # 데이터 저장 경로 (exe 파일과 같은 디렉토리)
+        # 설정 저장소 (config.SETTINGS_BACKEND에 따라 JSON 파일 또는 SQLite, exe 파일과 같은 디렉토리)
         from modules import config
-        self.reward_file = os.path.join(config.BASE_DIR, '리워드설정.json')
+        self.reward_store = reward_store()
         self.margin_file = config.MARGIN_FILE
         
         self.initUI()
@@ -91,22 +260,37 @@ class RewardManagerDialog(QDialog):
         search_layout = QHBoxLayout()
         search_layout.addWidget(QLabel("검색:"))
         self.search_box = QLineEdit()
-        self.search_box.setPlaceholderText("상품명으로 검색...")
-        self.search_box.textChanged.connect(self.filter_products)
+        self.search_box.setPlaceholderText("상품명 또는 상품ID로 검색...")
+        # 입력이 멈춘 뒤 한 번만 필터링 (디바운스)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(config.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.filter_products)
+        self.search_box.textChanged.connect(self.search_timer.start)
         search_layout.addWidget(self.search_box)
         layout.addLayout(search_layout)
         
         # 상품 테이블
-        self.product_table = QTableWidget()
-        self.product_table.setColumnCount(4)
-        self.product_table.setHorizontalHeaderLabels(['상품ID', '상품명', '현재 리워드', '새 리워드'])
+        self.product_model = ProductTableModel(['상품ID', '상품명', '현재 리워드', '새 리워드'], suffix=" 원", parent=self)
+        self.product_proxy = ProductFilterProxyModel(self)
+        self.product_proxy.setSourceModel(self.product_model)
+        self.product_table = QTableView()
+        self.product_table.setModel(self.product_proxy)
+        self.product_table.setItemDelegateForColumn(
+            ProductTableModel.NEW_COLUMN, SpinBoxDelegate(999999, " 원", 1000, self.product_table))
+        self.product_table.setEditTriggers(QTableView.AllEditTriggers)
+        self.product_table.verticalHeader().setDefaultSectionSize(24)
         
         # 테이블 컬럼 너비 설정
         header = self.product_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)  # 상품ID
+        # ResizeToContents는 모든 행을 측정하므로 고정 너비 사용
+        header.setSectionResizeMode(0, QHeaderView.Interactive)  # 상품ID
         header.setSectionResizeMode(1, QHeaderView.Stretch)  # 상품명
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # 현재 리워드
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # 새 리워드
+        header.setSectionResizeMode(2, QHeaderView.Interactive)  # 현재 리워드
+        header.setSectionResizeMode(3, QHeaderView.Interactive)  # 새 리워드
+        self.product_table.setColumnWidth(0, 130)
+        self.product_table.setColumnWidth(2, 110)
+        self.product_table.setColumnWidth(3, 130)
         
         layout.addWidget(self.product_table)
         
@@ -131,6 +315,7 @@ class RewardManagerDialog(QDialog):
                 QMessageBox.warning(self, "경고", "마진정보.xlsx 파일을 찾을 수 없습니다.")
                 return
             
+            import pandas as pd
             df = pd.read_excel(self.margin_file, engine='openpyxl')
             if '상품번호' in df.columns:
                 df = df.rename(columns={'상품번호': '상품ID'})
@@ -147,54 +332,24 @@ class RewardManagerDialog(QDialog):
             QMessageBox.critical(self, "오류", f"상품 목록을 로드하는 중 오류가 발생했습니다:\n{e}")
 
     def populate_table(self):
-        """테이블에 상품 목록 채우기"""
-        self.product_table.setRowCount(len(self.products_df))
-        
-        for row, (_, product) in enumerate(self.products_df.iterrows()):
-            # 상품ID
-            self.product_table.setItem(row, 0, QTableWidgetItem(str(product['상품ID'])))
-            
-            # 상품명
-            self.product_table.setItem(row, 1, QTableWidgetItem(str(product['상품명'])))
-            
-            # 현재 리워드 (처음엔 0)
-            self.product_table.setItem(row, 2, QTableWidgetItem("0"))
-            
-            # 새 리워드 (편집 가능한 SpinBox)
-            spinbox = QSpinBox()
-            spinbox.setRange(0, 999999)
-            spinbox.setSuffix(" 원")
-            spinbox.setValue(0)
-            self.product_table.setCellWidget(row, 3, spinbox)
+        """테이블에 상품 목록 채우기 (현재/새 값은 0으로 시작)"""
+        self.product_model.set_products(self.products_df)
 
     def load_existing_rewards(self):
         """기존 리워드 설정 로드"""
-        if not os.path.exists(self.reward_file):
-            return
-        
         try:
-            with open(self.reward_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
+            # 저장된 설정을 상품별 구간으로 정리한 뒤 오늘 날짜에 해당하는 값만 표시
+            intervals = self.reward_store.build_intervals(self.reward_store.load_entries())
             current_date = date.today()
             
-            # 현재 날짜에 해당하는 리워드 설정 찾기
-            for reward_entry in data.get('rewards', []):
-                start_date = datetime.strptime(reward_entry['start_date'], '%Y-%m-%d').date()
-                end_date = datetime.strptime(reward_entry['end_date'], '%Y-%m-%d').date()
-                
-                if start_date <= current_date <= end_date:
-                    product_id = reward_entry['product_id']
-                    reward_value = reward_entry['reward']
-                    
-                    # 테이블에서 해당 상품 찾아서 현재 리워드 업데이트
-                    for row in range(self.product_table.rowCount()):
-                        if self.product_table.item(row, 0).text() == str(product_id):
-                            self.product_table.item(row, 2).setText(str(reward_value))
-                            spinbox = self.product_table.cellWidget(row, 3)
-                            if spinbox:
-                                spinbox.setValue(reward_value)
-                            break
+            for product_id, product_intervals in intervals.items():
+                row = self.product_model.row_for_id(product_id)
+                if row is None:
+                    continue
+                for start_date, end_date, reward_value in product_intervals:
+                    if start_date <= current_date <= end_date:
+                        self.product_model.set_row_values(row, reward_value)
+                        break
                             
         except Exception as e:
             print(f"기존 리워드 로드 중 오류: {e}")
@@ -203,20 +358,16 @@ class RewardManagerDialog(QDialog):
         """일괄 리워드 적용"""
         bulk_value = self.bulk_reward.value()
         
-        for row in range(self.product_table.rowCount()):
-            if not self.product_table.isRowHidden(row):  # 필터링되지 않은 행만
-                spinbox = self.product_table.cellWidget(row, 3)
-                if spinbox:
-                    spinbox.setValue(bulk_value)
+        # 필터링되지 않은 행만
+        self.filter_products()  # 디바운스 대기 중인 검색어도 반영
+        self.product_model.set_new_values(self.product_proxy.accepted_source_rows(), bulk_value)
 
     def filter_products(self):
-        """상품명으로 필터링"""
-        search_text = self.search_box.text().lower()
-        
-        for row in range(self.product_table.rowCount()):
-            product_name = self.product_table.item(row, 1).text().lower()
-            should_show = search_text in product_name
-            self.product_table.setRowHidden(row, not should_show)
+        """상품명/상품ID로 필터링"""
+        self.search_timer.stop()
+        search_text = self.search_box.text()
+        if search_text != self.product_proxy.search_text:
+            self.product_proxy.set_search_text(search_text)
 
     def save_rewards(self):
         """리워드 설정 저장"""
@@ -224,31 +375,10 @@ class RewardManagerDialog(QDialog):
             start_date_str = self.start_date.date().toString("yyyy-MM-dd")
             end_date_str = self.end_date.date().toString("yyyy-MM-dd")
             
-            # 기존 데이터 로드
-            reward_data = {'rewards': []}
-            if os.path.exists(self.reward_file):
-                with open(self.reward_file, 'r', encoding='utf-8') as f:
-                    reward_data = json.load(f)
-            
-            # 새로운 설정들 추가
-            for row in range(self.product_table.rowCount()):
-                product_id = self.product_table.item(row, 0).text()
-                spinbox = self.product_table.cellWidget(row, 3)
-                if spinbox:
-                    reward_value = spinbox.value()
-                    
-                    reward_entry = {
-                        'start_date': start_date_str,
-                        'end_date': end_date_str,
-                        'product_id': product_id,
-                        'reward': reward_value
-                    }
-                    reward_data['rewards'].append(reward_entry)
-            
-            # 파일 저장
-            with open(self.reward_file, 'w', encoding='utf-8') as f:
-                json.dump(reward_data, f, ensure_ascii=False, indent=2)
+            # 상품별 구간 단위로 덮어쓰기 저장 (겹치는 기존 구간은 새 값으로 대체, 0은 설정 제거)
+            self.reward_store.upsert_many(self.product_model.values_to_save(), start_date_str, end_date_str)
             
+            self.saved_range = (start_date_str, end_date_str)  # 보관 리포트 재생성 범위
             QMessageBox.information(self, "완료", f"리워드 설정이 저장되었습니다.\n({start_date_str} ~ {end_date_str})")
             self.accept()
             
@@ -264,9 +394,9 @@ class PurchaseManagerDialog(QDialog):
         self.setFixedSize(900, 700)
         self.setModal(True)
         
-        # 데이터 저장 경로 (exe 파일과 같은 디렉토리)
+        # 설정 저장소 (config.SETTINGS_BACKEND에 따라 JSON 파일 또는 SQLite, exe 파일과 같은 디렉토리)
         from modules import config
-        self.purchase_file = os.path.join(config.BASE_DIR, '가구매설정.json')
+        self.purchase_store = purchase_store()
         self.margin_file = config.MARGIN_FILE
         
         self.initUI()
@@ -334,22 +464,37 @@ class PurchaseManagerDialog(QDialog):
         search_layout = QHBoxLayout()
         search_layout.addWidget(QLabel("검색:"))
         self.search_box = QLineEdit()
-        self.search_box.setPlaceholderText("상품명으로 검색...")
-        self.search_box.textChanged.connect(self.filter_products)
+        self.search_box.setPlaceholderText("상품명 또는 상품ID로 검색...")
+        # 입력이 멈춘 뒤 한 번만 필터링 (디바운스)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(config.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.filter_products)
+        self.search_box.textChanged.connect(self.search_timer.start)
         search_layout.addWidget(self.search_box)
         layout.addLayout(search_layout)
         
         # 상품 테이블
-        self.product_table = QTableWidget()
-        self.product_table.setColumnCount(4)
-        self.product_table.setHorizontalHeaderLabels(['상품ID', '상품명', '현재 가구매', '새 가구매'])
+        self.product_model = ProductTableModel(['상품ID', '상품명', '현재 가구매', '새 가구매'], suffix=" 개", parent=self)
+        self.product_proxy = ProductFilterProxyModel(self)
+        self.product_proxy.setSourceModel(self.product_model)
+        self.product_table = QTableView()
+        self.product_table.setModel(self.product_proxy)
+        self.product_table.setItemDelegateForColumn(
+            ProductTableModel.NEW_COLUMN, SpinBoxDelegate(9999, " 개", 1, self.product_table))
+        self.product_table.setEditTriggers(QTableView.AllEditTriggers)
+        self.product_table.verticalHeader().setDefaultSectionSize(24)
         
         # 테이블 컬럼 너비 설정
         header = self.product_table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)  # 상품ID
+        # ResizeToContents는 모든 행을 측정하므로 고정 너비 사용
+        header.setSectionResizeMode(0, QHeaderView.Interactive)  # 상품ID
         header.setSectionResizeMode(1, QHeaderView.Stretch)  # 상품명
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)  # 현재 가구매
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)  # 새 가구매
+        header.setSectionResizeMode(2, QHeaderView.Interactive)  # 현재 가구매
+        header.setSectionResizeMode(3, QHeaderView.Interactive)  # 새 가구매
+        self.product_table.setColumnWidth(0, 130)
+        self.product_table.setColumnWidth(2, 110)
+        self.product_table.setColumnWidth(3, 130)
         
         layout.addWidget(self.product_table)
         
@@ -374,6 +519,7 @@ class PurchaseManagerDialog(QDialog):
                 QMessageBox.warning(self, "경고", "마진정보.xlsx 파일을 찾을 수 없습니다.")
                 return
             
+            import pandas as pd
             df = pd.read_excel(self.margin_file, engine='openpyxl')
             if '상품번호' in df.columns:
                 df = df.rename(columns={'상품번호': '상품ID'})
@@ -390,54 +536,24 @@ class PurchaseManagerDialog(QDialog):
             QMessageBox.critical(self, "오류", f"상품 목록을 로드하는 중 오류가 발생했습니다:\n{e}")
 
     def populate_table(self):
-        """테이블에 상품 목록 채우기"""
-        self.product_table.setRowCount(len(self.products_df))
-        
-        for row, (_, product) in enumerate(self.products_df.iterrows()):
-            # 상품ID
-            self.product_table.setItem(row, 0, QTableWidgetItem(str(product['상품ID'])))
-            
-            # 상품명
-            self.product_table.setItem(row, 1, QTableWidgetItem(str(product['상품명'])))
-            
-            # 현재 가구매 개수 (처음엔 0)
-            self.product_table.setItem(row, 2, QTableWidgetItem("0"))
-            
-            # 새 가구매 개수 (편집 가능한 SpinBox)
-            spinbox = QSpinBox()
-            spinbox.setRange(0, 9999)
-            spinbox.setSuffix(" 개")
-            spinbox.setValue(0)
-            self.product_table.setCellWidget(row, 3, spinbox)
+        """테이블에 상품 목록 채우기 (현재/새 값은 0으로 시작)"""
+        self.product_model.set_products(self.products_df)
 
     def load_existing_purchases(self):
         """기존 가구매 설정 로드"""
-        if not os.path.exists(self.purchase_file):
-            return
-        
         try:
-            with open(self.purchase_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
+            # 저장된 설정을 상품별 구간으로 정리한 뒤 오늘 날짜에 해당하는 값만 표시
+            intervals = self.purchase_store.build_intervals(self.purchase_store.load_entries())
             current_date = date.today()
             
-            # 현재 날짜에 해당하는 가구매 설정 찾기
-            for purchase_entry in data.get('purchases', []):
-                start_date = datetime.strptime(purchase_entry['start_date'], '%Y-%m-%d').date()
-                end_date = datetime.strptime(purchase_entry['end_date'], '%Y-%m-%d').date()
-                
-                if start_date <= current_date <= end_date:
-                    product_id = purchase_entry['product_id']
-                    purchase_count = purchase_entry['purchase_count']
-                    
-                    # 테이블에서 해당 상품 찾아서 현재 가구매 개수 업데이트
-                    for row in range(self.product_table.rowCount()):
-                        if self.product_table.item(row, 0).text() == str(product_id):
-                            self.product_table.item(row, 2).setText(str(purchase_count))
-                            spinbox = self.product_table.cellWidget(row, 3)
-                            if spinbox:
-                                spinbox.setValue(purchase_count)
-                            break
+            for product_id, product_intervals in intervals.items():
+                row = self.product_model.row_for_id(product_id)
+                if row is None:
+                    continue
+                for start_date, end_date, purchase_count in product_intervals:
+                    if start_date <= current_date <= end_date:
+                        self.product_model.set_row_values(row, purchase_count)
+                        break
                             
         except Exception as e:
             print(f"기존 가구매 설정 로드 중 오류: {e}")
@@ -446,20 +562,16 @@ class PurchaseManagerDialog(QDialog):
         """일괄 가구매 개수 적용"""
         bulk_value = self.bulk_purchase.value()
         
-        for row in range(self.product_table.rowCount()):
-            if not self.product_table.isRowHidden(row):  # 필터링되지 않은 행만
-                spinbox = self.product_table.cellWidget(row, 3)
-                if spinbox:
-                    spinbox.setValue(bulk_value)
+        # 필터링되지 않은 행만
+        self.filter_products()  # 디바운스 대기 중인 검색어도 반영
+        self.product_model.set_new_values(self.product_proxy.accepted_source_rows(), bulk_value)
 
     def filter_products(self):
-        """상품명으로 필터링"""
-        search_text = self.search_box.text().lower()
-        
-        for row in range(self.product_table.rowCount()):
-            product_name = self.product_table.item(row, 1).text().lower()
-            should_show = search_text in product_name
-            self.product_table.setRowHidden(row, not should_show)
+        """상품명/상품ID로 필터링"""
+        self.search_timer.stop()
+        search_text = self.search_box.text()
+        if search_text != self.product_proxy.search_text:
+            self.product_proxy.set_search_text(search_text)
 
     def save_purchases(self):
         """가구매 설정 저장"""
@@ -467,31 +579,10 @@ class PurchaseManagerDialog(QDialog):
             start_date_str = self.start_date.date().toString("yyyy-MM-dd")
             end_date_str = self.end_date.date().toString("yyyy-MM-dd")
             
-            # 기존 데이터 로드
-            purchase_data = {'purchases': []}
-            if os.path.exists(self.purchase_file):
-                with open(self.purchase_file, 'r', encoding='utf-8') as f:
-                    purchase_data = json.load(f)
-            
-            # 새로운 설정들 추가
-            for row in range(self.product_table.rowCount()):
-                product_id = self.product_table.item(row, 0).text()
-                spinbox = self.product_table.cellWidget(row, 3)
-                if spinbox:
-                    purchase_count = spinbox.value()
-                    
-                    purchase_entry = {
-                        'start_date': start_date_str,
-                        'end_date': end_date_str,
-                        'product_id': product_id,
-                        'purchase_count': purchase_count
-                    }
-                    purchase_data['purchases'].append(purchase_entry)
-            
-            # 파일 저장
-            with open(self.purchase_file, 'w', encoding='utf-8') as f:
-                json.dump(purchase_data, f, ensure_ascii=False, indent=2)
+            # 상품별 구간 단위로 덮어쓰기 저장 (겹치는 기존 구간은 새 값으로 대체, 0은 설정 제거)
+            self.purchase_store.upsert_many(self.product_model.values_to_save(), start_date_str, end_date_str)
             
+            self.saved_range = (start_date_str, end_date_str)  # 보관 리포트 재생성 범위
             QMessageBox.information(self, "완료", f"가구매 개수 설정이 저장되었습니다.\n({start_date_str} ~ {end_date_str})")
             self.accept()
             
@@ -499,114 +590,241 @@ class PurchaseManagerDialog(QDialog):
             QMessageBox.critical(self, "오류", f"가구매 설정 저장 중 오류가 발생했습니다:\n{e}")
 
 
-# --- Custom Logging Handler ---
-class PyQtSignalHandler(logging.Handler):
-    """A logging handler that emits a PyQt signal."""
-    def __init__(self, signal):
-        super().__init__()
-        self.signal = signal
+# --- Report Browser Dialog ---
+class ReportBrowserDialog(QDialog):
+    """
+    리포트보관함 리포트 찾기 (리포트_색인.json으로 스토어/날짜별 최신 리포트와 백업을 바로 조회)
+    처리 중인 하위 프로세스도 색인을 고치므로 이 대화상자는 색인을 읽기만 하고 저장하지 않습니다.
+    """
+    REPORT_HEADERS = ['스토어', '날짜', '생성 시각', '형식', '백업 수']
+    VERSION_HEADERS = ['구분', '생성 시각', '형식', 'SHA-256']
+
+    def __init__(self, report_dir, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('리포트 찾기')
+        self.setFixedSize(900, 700)
+        self.setModal(True)
+
+        from modules.report_index import ReportIndex
+        self.index = ReportIndex(report_dir)
+        self.entries = []
+        self.versions = []
+
+        self.initUI()
+        self.load_entries()
+
+    def initUI(self):
+        layout = QVBoxLayout(self)
 
-    def emit(self, record):
-        msg = self.format(record)
-        self.signal.emit(msg)
+        # 제목
+        title_label = QLabel("보관된 리포트")
+        title_label.setStyleSheet("font-size: 18px; font-weight: bold; margin-bottom: 10px;")
+        layout.addWidget(title_label)
+
+        # 스토어/날짜로 최신 리포트 바로 열기
+        quick_group = QGroupBox("최신 리포트 바로 열기")
+        quick_layout = QHBoxLayout()
+        quick_layout.addWidget(QLabel("스토어:"))
+        self.quick_store = QComboBox()
+        quick_layout.addWidget(self.quick_store)
+        quick_layout.addWidget(QLabel("날짜:"))
+        self.quick_date = QDateEdit()
+        self.quick_date.setDate(QDate.currentDate().addDays(-1))
+        self.quick_date.setCalendarPopup(True)
+        quick_layout.addWidget(self.quick_date)
+        self.quick_open_button = QPushButton("열기")
+        self.quick_open_button.clicked.connect(self.open_latest)
+        quick_layout.addWidget(self.quick_open_button)
+        quick_layout.addStretch()
+        quick_group.setLayout(quick_layout)
+        layout.addWidget(quick_group)
+
+        # 목록 필터
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("스토어:"))
+        self.store_filter = QComboBox()
+        self.store_filter.currentIndexChanged.connect(self.populate_reports)
+        filter_layout.addWidget(self.store_filter)
+        filter_layout.addWidget(QLabel("날짜 검색:"))
+        self.date_filter = QLineEdit()
+        self.date_filter.setPlaceholderText("예: 2025-08")
+        self.date_filter.textChanged.connect(self.populate_reports)
+        filter_layout.addWidget(self.date_filter)
+        layout.addLayout(filter_layout)
+
+        # 리포트 목록 (스토어/날짜별 현재 리포트)
+        self.report_table = self._make_table(self.REPORT_HEADERS)
+        self.report_table.itemSelectionChanged.connect(self.populate_versions)
+        self.report_table.itemDoubleClicked.connect(lambda item: self.open_version(0))
+        layout.addWidget(self.report_table, 3)
+
+        # 선택한 리포트의 버전 (현재 + 백업)
+        layout.addWidget(QLabel("버전 (더블 클릭으로 열기)"))
+        self.version_table = self._make_table(self.VERSION_HEADERS)
+        self.version_table.itemDoubleClicked.connect(lambda item: self.open_version(item.row()))
+        layout.addWidget(self.version_table, 2)
+
+        # 버튼들
+        button_layout = QHBoxLayout()
+        self.open_button = QPushButton("선택한 버전 열기")
+        self.open_button.clicked.connect(lambda: self.open_version(max(self.version_table.currentRow(), 0)))
+        button_layout.addWidget(self.open_button)
+        self.close_button = QPushButton("닫기")
+        self.close_button.clicked.connect(self.reject)
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(button_layout)
+
+    def _make_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.verticalHeader().setVisible(False)
+        table.verticalHeader().setDefaultSectionSize(24)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        return table
 
-# --- Worker Thread ---
-class Worker(QThread):
+    def load_entries(self):
+        """색인에서 리포트 목록과 스토어 목록을 읽음"""
+        self.entries = self.index.entries()
+        stores = self.index.stores()
+        self.quick_store.clear()
+        self.quick_store.addItems(stores)
+        self.store_filter.blockSignals(True)
+        self.store_filter.clear()
+        self.store_filter.addItem("모든 스토어")
+        self.store_filter.addItems(stores)
+        self.store_filter.blockSignals(False)
+        self.populate_reports()
+
+    def populate_reports(self):
+        """필터에 맞는 리포트를 목록에 표시 (최근 날짜부터)"""
+        store = self.store_filter.currentText() if self.store_filter.currentIndex() > 0 else None
+        date_text = self.date_filter.text().strip()
+        self.visible_entries = [entry for entry in self.entries
+                                if (store is None or entry['store'] == store) and date_text in entry['date']]
+        self.report_table.setRowCount(len(self.visible_entries))
+        for row, entry in enumerate(self.visible_entries):
+            current = entry['current']
+            values = [entry['store'], entry['date'],
+                      current['generated'].replace('T', ' ') if current else '(백업만 있음)',
+                      ', '.join(current['files']) if current else '', str(len(entry['backups']))]
+            for column, value in enumerate(values):
+                self.report_table.setItem(row, column, QTableWidgetItem(value))
+        self.version_table.setRowCount(0)
+        self.versions = []
+
+    def populate_versions(self):
+        """선택한 리포트의 현재 리포트와 백업을 표시"""
+        row = self.report_table.currentRow()
+        if row < 0 or row >= len(self.visible_entries):
+            return
+        entry = self.visible_entries[row]
+        self.versions = ([('현재', entry['current'])] if entry['current'] else []) + \
+            [(f"백업 {backup['backed_up'].replace('T', ' ')}", backup) for backup in entry['backups']]
+        self.version_table.setRowCount(len(self.versions))
+        for row, (label, version) in enumerate(self.versions):
+            digest = next(iter(version['files'].values()))['sha256'][:12]
+            values = [label, version['generated'].replace('T', ' '), ', '.join(version['files']), digest]
+            for column, value in enumerate(values):
+                self.version_table.setItem(row, column, QTableWidgetItem(value))
+
+    def open_version(self, row):
+        """버전 목록의 row번째 버전 파일 열기 (엑셀 우선)"""
+        if not self.versions:
+            self.populate_versions()
+        if not 0 <= row < len(self.versions):
+            return
+        self.open_file(self.index.open_path(self.versions[row][1]))
+
+    def open_latest(self):
+        """선택한 스토어/날짜의 최신 리포트 열기 (색인에서 바로 조회)"""
+        store = self.quick_store.currentText()
+        date_str = self.quick_date.date().toString('yyyy-MM-dd')
+        entry = self.index.lookup(store, date_str) if store else None
+        if not entry or not entry['current']:
+            QMessageBox.information(self, "알림", f"{store} ({date_str}) 리포트가 없습니다.")
+            return
+        self.open_file(self.index.open_path(entry['current']))
+
+    def open_file(self, path):
+        if not path:
+            QMessageBox.warning(self, "경고", "리포트 파일을 찾을 수 없습니다.")
+            return
+        if not QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(path))):
+            QMessageBox.warning(self, "경고", f"파일을 열 수 없습니다:\n{path}")
+
+# --- Pipeline Worker (하위 프로세스) ---
+class PipelineWorker(QObject):
     """
-    Runs the file monitoring and processing logic in a separate thread.
+    자동화/작업폴더 처리/보관 리포트 재생성을 하위 프로세스에서 실행하는 워커
+    pandas/openpyxl 작업이 GUI 프로세스의 GIL을 잡지 않으므로 큰 파일을 처리하는 중에도 화면이 멈추지 않고,
+    중지 요청에 응답하지 않으면 프로세스를 안전하게 강제 종료할 수 있습니다.
+    하위 프로세스의 로그는 타이머로 큐에서 받아 루트 로거(링 버퍼/로그 파일)로 전달합니다.
     """
-    output_signal = pyqtSignal(str)
     finished_signal = pyqtSignal()
+    progress_signal = pyqtSignal(dict)
 
-    def __init__(self, download_folder_path, password=None):
-        super().__init__()
-        self.download_folder_path = download_folder_path
-        self.password = password
-        self.handler = None
-
-    def run(self):
-        """
-        Configures logging for this thread, sets the download directory,
-        and starts the file monitoring process.
-        """
-        # Configure logging to emit signals
-        self.handler = PyQtSignalHandler(self.output_signal)
-        self.handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-        logging.getLogger().addHandler(self.handler)
-        logging.getLogger().setLevel(logging.INFO)
+    def __init__(self, task, args=(), download_folder_path=None, password=None, parent=None):
+        super().__init__(parent)
+        overrides = {'DOWNLOAD_DIR': download_folder_path}
+        if password:
+            overrides['ORDER_FILE_PASSWORD'] = password
+        # 대화상자/재생성 기간 계산 등 GUI 프로세스에서도 같은 폴더를 쓰도록 현재 설정에도 반영
+        config.DOWNLOAD_DIR = download_folder_path
+        if password:
+            config.ORDER_FILE_PASSWORD = password
+        from modules.process_runner import PipelineProcess
+        self.process = PipelineProcess(task, args, config_overrides=overrides)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.poll)
+        self.terminate_timer = None
 
-        try:
-            # Dynamically import and set config
-            from modules import config
-            config.DOWNLOAD_DIR = self.download_folder_path
-            
-            # Set password if provided
-            if hasattr(self, 'password') and self.password:
-                config.ORDER_FILE_PASSWORD = self.password
-                logging.info(f"주문조회 파일 암호가 설정되었습니다.")
-            
-            # Dynamically import file_handler and start monitoring
-            from modules import file_handler
-            file_handler.start_monitoring()
+    def start(self):
+        self.process.start()
+        self.poll_timer.start(config.PROCESS_POLL_INTERVAL_MS)
 
-        except Exception as e:
-            logging.error(f"자동화 프로세스 실행 중 오류 발생: {e}")
-        finally:
-            # 안전한 정리 작업
-            try:
-                if self.handler:
-                    logging.getLogger().removeHandler(self.handler)
-            except:
-                pass  # 로깅 핸들러 제거 실패해도 계속 진행
-            
+    def isRunning(self):
+        return self.process.is_alive()
+
+    def poll(self):
+        """큐의 메시지를 받고, 하위 프로세스가 끝났으면 정리 후 finished_signal 발생"""
+        messages = self.process.drain(config.PROCESS_MAX_MESSAGES_PER_POLL)
+        progress_events = [message[1] for message in messages if message[0] == 'progress']
+        if progress_events:
+            self.progress_signal.emit(progress_events[-1])  # 한 주기에 여러 개가 오면 마지막 상태만 표시
+        if self.process.has_finished():
+            self.poll_timer.stop()
+            if self.terminate_timer:
+                self.terminate_timer.stop()
+            self.process.close()
             self.finished_signal.emit()
 
-# --- Manual Process Worker Thread ---
-class ManualProcessWorker(QThread):
-    """작업폴더의 미완료 파일들을 수동으로 처리하는 워커 스레드"""
-    output_signal = pyqtSignal(str)
-    finished_signal = pyqtSignal()
+    def stop(self, timeout_ms=None):
+        """stop.flag로 정상 종료를 요청한 뒤 timeout_ms 안에 끝나지 않으면 강제 종료 (호출 전에 stop.flag 작성)"""
+        if timeout_ms is None:
+            timeout_ms = config.PROCESS_STOP_TIMEOUT_MS
+        self.terminate_timer = QTimer(self)
+        self.terminate_timer.setSingleShot(True)
+        self.terminate_timer.timeout.connect(self.terminate)
+        self.terminate_timer.start(timeout_ms)
 
-    def __init__(self, download_folder_path, password):
-        super().__init__()
-        self.download_folder_path = download_folder_path
-        self.password = password
-        self.handler = None
-
-    def run(self):
-        # Configure logging to emit signals
-        self.handler = PyQtSignalHandler(self.output_signal)
-        self.handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-        logging.getLogger().addHandler(self.handler)
-        logging.getLogger().setLevel(logging.INFO)
+    def wait(self, timeout_ms):
+        """GUI를 막고 최대 timeout_ms 동안 종료를 기다림 (프로그램 종료 시에만 사용)"""
+        return self.process.wait(timeout_ms / 1000)
+
+    def terminate(self):
+        self.process.terminate()
 
+def warm_up_imports():
+    """리포트 생성에 필요한 무거운 모듈을 미리 불러옴 (창 표시 후 백그라운드 스레드에서 실행)"""
+    import importlib
+    for module_name in ('numpy', 'pandas', 'openpyxl', 'msoffcrypto', 'watchdog.observers', 'modules.report_generator'):
         try:
-            # Dynamically import and set config
-            from modules import config, file_handler
-            config.DOWNLOAD_DIR = self.download_folder_path
-            
-            if self.password:
-                config.ORDER_FILE_PASSWORD = self.password
-            
-            # 작업폴더 초기화
-            file_handler.initialize_folders()
-            
-            # 미완료 파일들 처리
-            file_handler.process_incomplete_files()
-            
-            # 최종 정리 수행 (전체 통합 리포트 생성 및 파일 이동)
-            file_handler.finalize_all_processing()
-            
+            importlib.import_module(module_name)
         except Exception as e:
-            logging.error(f"수동 처리 중 오류 발생: {e}")
-        finally:
-            try:
-                if self.handler:
-                    logging.getLogger().removeHandler(self.handler)
-            except:
-                pass
-            
-            self.finished_signal.emit()
+            logging.debug(f"[warm-up] {module_name} 미리 불러오기 실패: {e}")
 
 # --- Main Application UI ---
 class DesktopApp(QWidget):
@@ -614,11 +832,23 @@ class DesktopApp(QWidget):
         super().__init__()
         self.is_monitoring = False
         self.is_manual_processing = False  # 수동 처리 상태 추가
+        self.is_backfilling = False  # 보관 리포트 재생성 상태
+        self.is_exporting = False  # 스토어별 리포트 엑셀 내보내기 상태
         self.worker = None
+        self.backfill_worker = None
+        self.export_worker = None
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.stop_flag_path = os.path.join(self.base_dir, 'stop.flag')
         self.download_folder_path = ""
         self.initUI()
+        self.setup_logging()
+        if config.WARM_IMPORTS_ON_STARTUP:
+            # 창이 먼저 표시되도록 이벤트 루프가 시작된 뒤 백그라운드에서 미리 로드
+            QTimer.singleShot(0, self.start_import_warmup)
+
+    def start_import_warmup(self):
+        import threading
+        threading.Thread(target=warm_up_imports, name='import-warmup', daemon=True).start()
 
     def initUI(self):
         self.setWindowTitle('판매 데이터 자동화')
@@ -629,7 +859,7 @@ class DesktopApp(QWidget):
             QWidget { background-color: #f0f2f5; font-family: '맑은 고딕'; }
             QLabel { font-size: 14px; color: #333; }
             QLineEdit { background-color: #fff; border: 1px solid #ccc; padding: 8px; border-radius: 4px; font-size: 14px; }
-            QTextEdit { background-color: #fff; border: 1px solid #ccc; border-radius: 4px; color: #333; font-size: 13px; }
+            QPlainTextEdit { background-color: #fff; border: 1px solid #ccc; border-radius: 4px; color: #333; font-size: 13px; }
             QPushButton { background-color: #007bff; color: white; font-size: 15px; font-weight: bold; padding: 10px 15px; border-radius: 5px; border: none; }
             QPushButton:hover { background-color: #0056b3; }
             QPushButton:disabled { background-color: #999; }
@@ -704,6 +934,20 @@ class DesktopApp(QWidget):
         self.purchase_button.setStyleSheet("background-color: #17a2b8; color: white;")
         self.purchase_button.setToolTip("상품별 가구매 개수를 설정합니다")
         button_layout.addWidget(self.purchase_button)
+
+        # 스토어별 리포트 엑셀을 미루는 모드에서만 표시
+        self.export_button = QPushButton("엑셀 내보내기")
+        self.export_button.clicked.connect(self.export_reports)
+        self.export_button.setStyleSheet("background-color: #6f42c1; color: white;")
+        self.export_button.setToolTip("리포트보관함에서 엑셀이 없는 스토어별 리포트를 엑셀로 만듭니다")
+        self.export_button.setVisible(config.STORE_REPORT_XLSX != 'always')
+        button_layout.addWidget(self.export_button)
+
+        self.report_browser_button = QPushButton("리포트 찾기")
+        self.report_browser_button.clicked.connect(self.open_report_browser)
+        self.report_browser_button.setStyleSheet("background-color: #6c757d; color: white;")
+        self.report_browser_button.setToolTip("리포트보관함에서 스토어/날짜별 리포트와 백업을 찾아 엽니다")
+        button_layout.addWidget(self.report_browser_button)
         
         main_layout.addLayout(button_layout)
 
@@ -717,15 +961,39 @@ class DesktopApp(QWidget):
         status_layout.addWidget(QLabel("현재 상태:"), 0, 0)
         status_layout.addWidget(self.status_label, 0, 1)
         
+        # 진행 상황 (하위 프로세스의 진행 이벤트로 갱신)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFormat("%v/%m")
+        self.progress_detail_label = QLabel("")
+        self.progress_detail_label.setStyleSheet("color: #666;")
+        status_layout.addWidget(QLabel("진행:"), 1, 0)
+        status_layout.addWidget(self.progress_bar, 1, 1)
+        status_layout.addWidget(self.progress_detail_label, 2, 1)
+        self.reset_progress()
+        
         status_group.setLayout(status_layout)
         main_layout.addWidget(status_group)
 
         # Log Display
         main_layout.addWidget(QLabel("실행 로그"))
-        self.log_output = QTextEdit()
+        self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
+        self.log_output.setMaximumBlockCount(config.LOG_MAX_BLOCKS)  # 오래된 줄은 자동으로 삭제
         main_layout.addWidget(self.log_output)
 
+    def setup_logging(self):
+        """로그 파이프라인 구성: 루트 로거 -> 링 버퍼 -> 타이머로 일괄 출력 (+ 회전 로그 파일)"""
+        self.log_buffer = LogRingBuffer(config.LOG_BUFFER_CAPACITY)
+        self.log_handler = RingBufferHandler(self.log_buffer)
+        self.log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logging.getLogger().addHandler(self.log_handler)
+        logging.getLogger().setLevel(logging.INFO)
+        setup_file_logging()
+
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start(config.LOG_FLUSH_INTERVAL_MS)
+
     def browse_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "다운로드 폴더 선택")
         if folder:
@@ -744,7 +1012,19 @@ class DesktopApp(QWidget):
             self.update_log("[ERROR] 다운로드 폴더를 먼저 선택해주세요.")
             return
 
-        self.log_output.clear()
+        if self.is_manual_processing:
+            self.update_log("[WARNING] 작업폴더 처리 중에는 자동화를 시작할 수 없습니다.")
+            return
+
+        if self.is_backfilling:
+            self.update_log("[WARNING] 보관 리포트 재생성 중에는 자동화를 시작할 수 없습니다.")
+            return
+
+        if self.is_exporting:
+            self.update_log("[WARNING] 엑셀 내보내기 중에는 자동화를 시작할 수 없습니다.")
+            return
+
+        self.clear_log()
         
         if os.path.exists(self.stop_flag_path):
             os.remove(self.stop_flag_path)
@@ -763,9 +1043,8 @@ class DesktopApp(QWidget):
         # 암호 값 가져오기
         password = self.password_input.text().strip() if self.password_input.text().strip() else "1234"
         
-        self.worker = Worker(self.download_folder_path, password)
-        self.worker.output_signal.connect(self.update_log)
-        self.worker.finished_signal.connect(self.on_monitoring_finished)
+        self.worker = PipelineWorker('monitor', download_folder_path=self.download_folder_path, password=password)
+        self.connect_worker(self.worker, self.on_monitoring_finished)
         self.worker.start()
 
     def stop_monitoring(self):
@@ -773,7 +1052,7 @@ class DesktopApp(QWidget):
             return
         self.update_log("[INFO] 자동화 중지를 요청합니다...")
         
-        # Worker 스레드에 중지 신호 전송
+        # 하위 프로세스에 중지 신호 전송
         try:
             with open(self.stop_flag_path, 'w') as f:
                 f.write('stop')
@@ -786,24 +1065,46 @@ class DesktopApp(QWidget):
         self.status_label.setText("중지 중")
         self.status_label.setStyleSheet("color: #ffc107; font-size: 16px; font-weight: bold;")
         
-        # 타임아웃과 함께 Worker 종료 대기 (비동기)
-        if self.worker and self.worker.isRunning():
-            self.worker.terminate()  # 강제 종료 시도
-            
-            # 1초 후 강제 정리 (타이머 사용으로 UI 블로킹 방지)
-            from PyQt5.QtCore import QTimer
-            QTimer.singleShot(1000, self.force_cleanup)
+        # 정상 종료를 기다리고, 시간 안에 끝나지 않으면 프로세스 강제 종료 (종료되면 finished_signal로 정리)
+        if self.worker:
+            self.worker.stop()
+
+    def connect_worker(self, worker, finished_slot):
+        """하위 프로세스 워커의 종료/진행 신호 연결"""
+        worker.finished_signal.connect(finished_slot)
+        worker.progress_signal.connect(self.update_progress)
+        self.reset_progress()
+
+    def update_progress(self, event):
+        """진행 이벤트를 진행 표시줄과 설명 문구에 반영"""
+        self.progress_bar.setRange(0, max(event['total'], 1))
+        self.progress_bar.setValue(min(event['done'], max(event['total'], 1)))
+        self.progress_detail_label.setText(progress.format_event(event))
 
-    def force_cleanup(self):
-        """타임아웃 후 강제로 정리 작업 수행"""
-        self.update_log("[INFO] 강제 정리 작업을 수행합니다...")
-        if self.worker and self.worker.isRunning():
-            self.worker.kill()  # 완전 강제 종료
-        self.on_monitoring_finished()
+    def reset_progress(self):
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.progress_detail_label.setText("")
 
     def update_log(self, text):
-        self.log_output.append(text)
-        self.log_output.verticalScrollBar().setValue(self.log_output.verticalScrollBar().maximum())
+        """GUI에서 직접 남기는 메시지도 같은 버퍼를 거쳐 순서대로 출력"""
+        self.log_buffer.append(text)
+
+    def flush_log(self):
+        """버퍼에 쌓인 로그를 한 번에 로그 창에 추가하고 스크롤은 한 번만 이동"""
+        lines, dropped = self.log_buffer.drain()
+        if not lines:
+            return
+        if dropped:
+            lines.insert(0, f"[INFO] 로그가 너무 많아 {dropped}줄을 화면에서 생략했습니다. (전체 로그: logs/app.log)")
+        self.log_output.appendPlainText('\n'.join(lines))
+        scroll_bar = self.log_output.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+
+    def clear_log(self):
+        """로그 창과 아직 출력되지 않은 버퍼를 함께 비움"""
+        self.log_buffer.drain()
+        self.log_output.clear()
 
 
     def on_monitoring_finished(self):
@@ -853,12 +1154,20 @@ class DesktopApp(QWidget):
             self.update_log("[WARNING] 자동화 실행 중에는 수동 처리를 할 수 없습니다.")
             return
         
+        if self.is_backfilling:
+            self.update_log("[WARNING] 보관 리포트 재생성 중에는 수동 처리를 할 수 없습니다.")
+            return
+
+        if self.is_exporting:
+            self.update_log("[WARNING] 엑셀 내보내기 중에는 수동 처리를 할 수 없습니다.")
+            return
+        
         # 수동 처리 시작
         self.start_manual_process()
     
     def start_manual_process(self):
         """수동 처리 시작"""
-        self.log_output.clear()
+        self.clear_log()
         
         if os.path.exists(self.stop_flag_path):
             os.remove(self.stop_flag_path)
@@ -875,10 +1184,10 @@ class DesktopApp(QWidget):
         
         self.update_log("[INFO] 작업폴더의 미완료 파일들을 수동 처리합니다...")
         
-        # Worker 스레드로 수동 처리 실행
-        self.manual_worker = ManualProcessWorker(self.download_folder_path, self.password_input.text().strip() or "1234")
-        self.manual_worker.output_signal.connect(self.update_log)
-        self.manual_worker.finished_signal.connect(self.on_manual_process_finished)
+        # 하위 프로세스로 수동 처리 실행
+        self.manual_worker = PipelineWorker('manual', download_folder_path=self.download_folder_path,
+                                            password=self.password_input.text().strip() or "1234")
+        self.connect_worker(self.manual_worker, self.on_manual_process_finished)
         self.manual_worker.start()
     
     def stop_manual_process(self):
@@ -888,7 +1197,7 @@ class DesktopApp(QWidget):
         
         self.update_log("[INFO] 수동 처리 중지를 요청합니다...")
         
-        # Worker 스레드에 중지 신호 전송
+        # 하위 프로세스에 중지 신호 전송
         try:
             with open(self.stop_flag_path, 'w') as f:
                 f.write('stop')
@@ -902,20 +1211,9 @@ class DesktopApp(QWidget):
         self.status_label.setText("중지 중")
         self.status_label.setStyleSheet("color: #ffc107; font-size: 16px; font-weight: bold;")
         
-        # 타임아웃과 함께 Worker 종료 대기
-        if hasattr(self, 'manual_worker') and self.manual_worker and self.manual_worker.isRunning():
-            self.manual_worker.terminate()
-            
-            # 1초 후 강제 정리
-            from PyQt5.QtCore import QTimer
-            QTimer.singleShot(1000, self.force_manual_cleanup)
-
-    def force_manual_cleanup(self):
-        """수동 처리 강제 정리"""
-        self.update_log("[INFO] 수동 처리를 강제로 정리합니다...")
-        if hasattr(self, 'manual_worker') and self.manual_worker and self.manual_worker.isRunning():
-            self.manual_worker.kill()
-        self.on_manual_process_finished()
+        # 정상 종료를 기다리고, 시간 안에 끝나지 않으면 프로세스 강제 종료
+        if hasattr(self, 'manual_worker') and self.manual_worker:
+            self.manual_worker.stop()
     
     def on_manual_process_finished(self):
         """수동 처리 완료 시 호출"""
@@ -954,12 +1252,21 @@ class DesktopApp(QWidget):
             self.update_log("[WARNING] 수동 처리 중에는 리워드 설정을 할 수 없습니다.")
             return
         
+        if self.is_backfilling:
+            self.update_log("[WARNING] 보관 리포트 재생성 중에는 리워드 설정을 할 수 없습니다.")
+            return
+        
+        if self.is_exporting:
+            self.update_log("[WARNING] 엑셀 내보내기 중에는 리워드 설정을 할 수 없습니다.")
+            return
+        
         try:
             dialog = RewardManagerDialog(self)
             result = dialog.exec_()
             
             if result == QDialog.Accepted:
                 self.update_log("[INFO] 리워드 설정이 저장되었습니다.")
+                self.start_backfill(*dialog.saved_range)
             
         except Exception as e:
             self.update_log(f"[ERROR] 리워드 관리 창을 여는 중 오류 발생: {e}")
@@ -975,17 +1282,114 @@ class DesktopApp(QWidget):
             self.update_log("[WARNING] 수동 처리 중에는 가구매 설정을 할 수 없습니다.")
             return
         
+        if self.is_backfilling:
+            self.update_log("[WARNING] 보관 리포트 재생성 중에는 가구매 설정을 할 수 없습니다.")
+            return
+        
+        if self.is_exporting:
+            self.update_log("[WARNING] 엑셀 내보내기 중에는 가구매 설정을 할 수 없습니다.")
+            return
+        
         try:
             dialog = PurchaseManagerDialog(self)
             result = dialog.exec_()
             
             if result == QDialog.Accepted:
                 self.update_log("[INFO] 가구매 설정이 저장되었습니다.")
+                self.start_backfill(*dialog.saved_range)
             
         except Exception as e:
             self.update_log(f"[ERROR] 가구매 관리 창을 여는 중 오류 발생: {e}")
             QMessageBox.critical(self, "오류", f"가구매 관리 창을 여는 중 오류가 발생했습니다:\n{e}")
 
+    def open_report_browser(self):
+        """리포트 찾기 팝업창 열기 (읽기 전용이므로 처리 중에도 사용 가능)"""
+        if not self.download_folder_path:
+            self.update_log("[ERROR] 다운로드 폴더를 먼저 선택해주세요.")
+            return
+        report_dir = os.path.join(self.download_folder_path, '리포트보관함')
+        if not os.path.isdir(report_dir):
+            self.update_log("[WARNING] 리포트보관함이 아직 없습니다.")
+            return
+
+        try:
+            # 색인이 없으면 보관함을 한 번 훑어 만들므로 대기 커서 표시
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                dialog = ReportBrowserDialog(report_dir, self)
+            finally:
+                QApplication.restoreOverrideCursor()
+            dialog.exec_()
+        except Exception as e:
+            self.update_log(f"[ERROR] 리포트 찾기 창을 여는 중 오류 발생: {e}")
+            QMessageBox.critical(self, "오류", f"리포트 찾기 창을 여는 중 오류가 발생했습니다:\n{e}")
+
+    def start_backfill(self, start_date, end_date):
+        """설정이 바뀐 기간의 보관 리포트를 백그라운드에서 다시 생성"""
+        from modules import config
+        if not config.BACKFILL_AFTER_SETTINGS_SAVE:
+            return
+        if not self.download_folder_path:
+            self.update_log("[INFO] 다운로드 폴더가 선택되지 않아 보관 리포트 재생성을 건너뜁니다.")
+            return
+        if start_date > date.today().isoformat():
+            return  # 아직 리포트가 없는 미래 기간
+        if self.is_exporting:
+            # 내보내기가 읽는 parquet을 재생성이 바꾸면 이전 데이터로 만든 엑셀이 남음
+            self.update_log("[WARNING] 엑셀 내보내기 중에는 보관 리포트 재생성을 할 수 없습니다.")
+            return
+
+        if os.path.exists(self.stop_flag_path):
+            os.remove(self.stop_flag_path)
+
+        self.is_backfilling = True
+        self.update_log(f"[INFO] {start_date} ~ {end_date} 기간의 보관 리포트를 새 설정으로 다시 생성합니다...")
+        password = self.password_input.text().strip() or "1234"
+        self.backfill_worker = PipelineWorker('backfill', (start_date, end_date),
+                                              download_folder_path=self.download_folder_path, password=password)
+        self.connect_worker(self.backfill_worker, self.on_backfill_finished)
+        self.backfill_worker.start()
+
+    def on_backfill_finished(self):
+        """보관 리포트 재생성 완료 시 호출"""
+        if self.backfill_worker:
+            self.backfill_worker.deleteLater()
+            self.backfill_worker = None
+        self.is_backfilling = False
+        self.update_log("[INFO] 보관 리포트 재생성이 끝났습니다.")
+
+    def export_reports(self):
+        """리포트보관함의 parquet 중간 결과로 스토어별 리포트 엑셀을 백그라운드에서 생성"""
+        if self.is_exporting:
+            return
+        if not self.download_folder_path:
+            self.update_log("[ERROR] 다운로드 폴더를 먼저 선택해주세요.")
+            return
+        if self.is_monitoring or self.is_manual_processing or self.is_backfilling:
+            self.update_log("[WARNING] 다른 처리가 실행 중일 때는 엑셀 내보내기를 할 수 없습니다.")
+            return
+
+        if os.path.exists(self.stop_flag_path):
+            os.remove(self.stop_flag_path)
+
+        self.is_exporting = True
+        self.export_button.setEnabled(False)
+        self.export_button.setText("내보내는 중...")
+        self.update_log("[INFO] 스토어별 리포트를 엑셀로 내보냅니다...")
+        self.export_worker = PipelineWorker('export', download_folder_path=self.download_folder_path)
+        self.connect_worker(self.export_worker, self.on_export_finished)
+        self.export_worker.start()
+
+    def on_export_finished(self):
+        """엑셀 내보내기 완료 시 호출"""
+        if self.export_worker:
+            self.export_worker.deleteLater()
+            self.export_worker = None
+        self.is_exporting = False
+        self.export_button.setEnabled(True)
+        self.export_button.setText("엑셀 내보내기")
+        self.update_log("[INFO] 엑셀 내보내기가 끝났습니다.")
+
     def closeEvent(self, event):
         if self.is_monitoring or self.is_manual_processing:
             self.update_log("[INFO] 프로그램 종료 중...")
@@ -995,18 +1399,26 @@ class DesktopApp(QWidget):
                 self.stop_monitoring()
                 if self.worker and self.worker.isRunning():
                     if not self.worker.wait(2000):  # 2초 타임아웃
-                        self.worker.terminate()
-                        if not self.worker.wait(1000):  # 1초 추가 대기
-                            self.worker.kill()  # 완전 강제 종료
+                        self.worker.terminate()  # 프로세스 강제 종료
             
             # 수동 처리 중지
             if self.is_manual_processing:
                 self.stop_manual_process()
                 if hasattr(self, 'manual_worker') and self.manual_worker and self.manual_worker.isRunning():
                     if not self.manual_worker.wait(2000):  # 2초 타임아웃
-                        self.manual_worker.terminate()
-                        if not self.manual_worker.wait(1000):  # 1초 추가 대기
-                            self.manual_worker.kill()  # 완전 강제 종료
+                        self.manual_worker.terminate()  # 프로세스 강제 종료
+        
+        # 보관 리포트 재생성/엑셀 내보내기 중지 (진행 중인 리포트까지만 처리하고 종료)
+        # 둘 다 임시 파일(~backfill_, ~export_)로 작업하므로 강제 종료해도 보관 리포트는 손상되지 않음
+        for background_worker in (self.backfill_worker, self.export_worker):
+            if background_worker and background_worker.isRunning():
+                try:
+                    with open(self.stop_flag_path, 'w') as f:
+                        f.write('stop')
+                except Exception:
+                    pass
+                if not background_worker.wait(5000):
+                    background_worker.terminate()
         
         # stop.flag 파일 정리
         if os.path.exists(self.stop_flag_path):
@@ -1014,6 +1426,10 @@ class DesktopApp(QWidget):
                 os.remove(self.stop_flag_path)
             except:
                 pass  # 파일 삭제 실패해도 프로그램 종료 진행
+        
+        # 로그 파이프라인 정리
+        self.log_timer.stop()
+        logging.getLogger().removeHandler(self.log_handler)
                 
         event.accept()
 
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+콘솔 버전 진입점
+
+사용 예:
+    python main.py compact-settings     # 리워드/가구매 설정 압축
+    python main.py import-settings [--db 설정.db]        # JSON 설정을 SQLite 파일로 가져오기 (SETTINGS_BACKEND와 무관)
+    python main.py export-settings [--output-dir 폴더]   # 현재 저장소의 설정을 JSON 파일로 내보내기 (기본: 설정_내보내기 폴더)
+    python main.py backfill 다운로드폴더 2025-08-01 2025-08-31   # 보관된 리포트를 현재 설정으로 재생성
+    python main.py process 다운로드폴더                          # 다운로드 폴더/작업폴더의 파일을 한 번 처리
+    python main.py export-reports 다운로드폴더 [--date 2025-08-26] # parquet만 있는 스토어별 리포트를 엑셀로 내보내기
+    python main.py pack-sources 다운로드폴더                     # 원본_보관함의 개별 원본 파일을 월별 zip으로 일괄 전환
+    python main.py --progress-json process 다운로드폴더          # 진행 이벤트를 표준 출력에 JSON lines로 출력 (로그는 표준 에러)
+"""
+import sys
+import json
+import logging
+import argparse
+
+def compact_settings(args):
+    """리워드설정.json / 가구매설정.json 압축 (조회 결과는 그대로 유지)"""
+    from modules import settings_store
+    settings_store.compact_all_settings()
+    return 0
+
+def import_settings(args):
+    """리워드설정.json / 가구매설정.json -> SQLite 파일"""
+    from modules import settings_store
+    settings_store.import_json_settings(args.db)
+    return 0
+
+def export_settings(args):
+    """현재 저장소(또는 --db의 SQLite 파일) -> 리워드설정.json / 가구매설정.json"""
+    from modules import settings_store
+    settings_store.export_json_settings(args.output_dir, db_path=args.db)
+    return 0
+
+def backfill(args):
+    """보관된 원본으로 기간 내 리포트 재생성"""
+    from modules import config, backfill as backfill_job
+    config.DOWNLOAD_DIR = args.download_dir
+    if args.password:
+        config.ORDER_FILE_PASSWORD = args.password
+    regenerated = backfill_job.run_backfill(args.start_date, args.end_date, max_workers=args.workers)
+    return 0 if regenerated or not backfill_job.find_affected_pairs(args.start_date, args.end_date) else 1
+
+def process(args):
+    """다운로드 폴더의 기존 파일과 작업폴더의 미완료 파일을 처리하고 최종 정리 (모니터링 없이 한 번 실행)"""
+    from modules import config, file_handler
+    config.DOWNLOAD_DIR = args.download_dir
+    if args.password:
+        config.ORDER_FILE_PASSWORD = args.password
+    file_handler.initialize_folders()
+    file_handler.process_existing_files()
+    file_handler.wait_for_jobs()  # 최종 정리가 예약한 스토어별 엑셀 내보내기까지 마친 뒤 종료
+    return 0
+
+def export_reports(args):
+    """리포트보관함에서 엑셀이 없는 스토어별 리포트를 parquet 중간 결과로 엑셀로 내보내기 (STORE_REPORT_XLSX 참고)"""
+    from modules import config, report_generator
+    config.DOWNLOAD_DIR = args.download_dir
+    pairs = [(store, date) for store, date, _ in report_generator.find_unexported_store_reports()
+             if not args.date or date in args.date]
+    exported = report_generator.export_store_reports(pairs=pairs)
+    return 0 if len(exported) == len(pairs) else 1
+
+def pack_sources(args):
+    """원본_보관함의 개별 원본 파일을 월별 zip으로 옮기기 (SOURCE_ARCHIVE_FORMAT='zip'으로 전환할 때 한 번 실행)"""
+    import os
+    from modules import config, source_archive
+    config.DOWNLOAD_DIR = args.download_dir
+    if not os.path.isdir(config.get_archive_dir()):
+        logging.error(f"원본_보관함이 없습니다: {config.get_archive_dir()}")
+        return 1
+    packed = source_archive.pack_all()
+    logging.info(f"월별 zip으로 옮긴 원본 파일: {packed}개")
+    return 0
+
+def print_progress_event(event):
+    """진행 이벤트를 한 줄짜리 JSON으로 표준 출력에 기록"""
+    sys.stdout.write(json.dumps(event, ensure_ascii=False) + '\n')
+    sys.stdout.flush()
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='판매 데이터 자동화 콘솔 도구')
+    parser.add_argument('--progress-json', action='store_true', help='진행 이벤트를 표준 출력에 JSON lines로 출력')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    compact_parser = subparsers.add_parser('compact-settings', help='리워드/가구매 설정 파일의 중복·겹치는 구간을 정리')
+    compact_parser.set_defaults(func=compact_settings)
+
+    import_parser = subparsers.add_parser('import-settings', help='JSON 설정 파일을 SQLite 파일로 가져오기')
+    import_parser.add_argument('--db', default=None, help='가져올 SQLite 파일 (기본: config.SETTINGS_DB_FILE)')
+    import_parser.set_defaults(func=import_settings)
+
+    export_parser = subparsers.add_parser('export-settings', help='설정을 JSON 파일 형식으로 내보내기')
+    export_parser.add_argument('--output-dir', default=None, help='내보낼 폴더 (기본: config.SETTINGS_EXPORT_DIR, 없으면 생성)')
+    export_parser.add_argument('--db', default=None, help='현재 백엔드 대신 이 SQLite 파일에서 내보내기')
+    export_parser.set_defaults(func=export_settings)
+
+    backfill_parser = subparsers.add_parser('backfill', help='리포트보관함의 리포트를 현재 리워드/가구매 설정으로 재생성')
+    backfill_parser.add_argument('download_dir', help='다운로드 폴더 (원본_보관함, 리포트보관함이 있는 폴더)')
+    backfill_parser.add_argument('start_date', help='시작일 (YYYY-MM-DD)')
+    backfill_parser.add_argument('end_date', help='종료일 (YYYY-MM-DD)')
+    backfill_parser.add_argument('--password', default=None, help='주문조회 파일 암호 (기본: config.ORDER_FILE_PASSWORD)')
+    backfill_parser.add_argument('--workers', type=int, default=None, help='병렬 프로세스 수')
+    backfill_parser.set_defaults(func=backfill)
+
+    process_parser = subparsers.add_parser('process', help='다운로드 폴더와 작업폴더의 파일을 한 번 처리 (모니터링 없이)')
+    process_parser.add_argument('download_dir', help='다운로드 폴더')
+    process_parser.add_argument('--password', default=None, help='주문조회 파일 암호 (기본: config.ORDER_FILE_PASSWORD)')
+    process_parser.set_defaults(func=process)
+
+    export_reports_parser = subparsers.add_parser('export-reports', help='parquet만 있는 스토어별 리포트를 엑셀로 내보내기')
+    export_reports_parser.add_argument('download_dir', help='다운로드 폴더 (리포트보관함이 있는 폴더)')
+    export_reports_parser.add_argument('--date', action='append', default=None, help='내보낼 날짜 (YYYY-MM-DD, 여러 번 지정 가능)')
+    export_reports_parser.set_defaults(func=export_reports)
+
+    pack_parser = subparsers.add_parser('pack-sources', help='원본_보관함의 개별 원본 파일을 월별 zip으로 일괄 전환')
+    pack_parser.add_argument('download_dir', help='다운로드 폴더 (원본_보관함이 있는 폴더)')
+    pack_parser.set_defaults(func=pack_sources)
+
+    return parser
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+    args = build_parser().parse_args(argv)
+    if args.progress_json:
+        from modules import progress
+        progress.add_sink(print_progress_event)
+    import sqlite3
+    try:
+        return args.func(args)
+    except (ValueError, OSError, sqlite3.Error) as e:
+        logging.error(f"{args.command} 실패: {e}")
+        return 1
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
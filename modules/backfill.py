@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+보관된 리포트 재생성 (backfill)
+
+리워드/가구매 설정을 지난 날짜 범위로 저장하면 리포트보관함의 해당 날짜 리포트가 이전 설정 기준으로 남습니다.
+원본_보관함의 주문조회 원본으로 영향받는 (스토어, 날짜) 리포트를 여러 프로세스에서 병렬로 다시 만들고,
+해당 날짜의 전체 통합 리포트도 다시 취합합니다. 모든 파일은 임시 파일로 만든 뒤 os.replace로 교체하며,
+내용이 바뀐 기존 리포트는 최종 정리와 같이 _backup_YYYYMMDD_HHMMSS 이름으로 보존하고 리포트 색인에 기록합니다.
+"""
+import os
+import re
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from . import config
+from . import progress
+from . import report_output
+from . import source_archive
+
+STORE_REPORT_PATTERN = re.compile(r'^(.+)_통합_리포트_(\d{4}-\d{2}-\d{2})\.(?:xlsx|parquet|csv)$')
+TEMP_PREFIX = '~backfill_'  # '~'로 시작하는 파일은 다른 단계에서 모두 무시됨
+
+# 워커 프로세스마다 마진정보를 한 번만 읽기 위한 캐시
+_margin_cache = None
+
+def _init_worker(config_values, log_queue, log_level):
+    """워커 프로세스 초기화: 설정 적용 + 로그를 부모 프로세스의 큐로 보냄 (spawn 워커는 로그 설정을 물려받지 않음)"""
+    from .process_runner import install_queue_logging
+    config.apply_snapshot(config_values)
+    install_queue_logging(log_queue, log_level)
+
+def find_affected_pairs(start_date, end_date):
+    """원본이 보관되어 있고(개별 파일 또는 월별 zip) 리포트보관함에 리포트가 있는 (스토어, 날짜) 중 기간에 해당하는 목록"""
+    archive_dir = config.get_archive_dir()
+    report_archive_dir = config.get_report_archive_dir()
+    if not os.path.isdir(archive_dir) or not os.path.isdir(report_archive_dir):
+        return []
+
+    pairs = []
+    for store, date in source_archive.archived_orders():
+        if not (start_date <= date <= end_date):
+            continue
+        if report_output.report_exists(os.path.join(report_archive_dir, f'{store}_통합_리포트_{date}.xlsx')):
+            pairs.append((store, date))
+    return sorted(pairs, key=lambda pair: (pair[1], pair[0]))
+
+def _replace_atomically(build, final_path, backup_stamp=None):
+    """
+    build(temp_path)로 임시 파일을 만든 뒤 성공하면 final_path를 교체 (출력 형식별 파일 모두)
+    기존 리포트는 move_reports_to_archive와 같이 _backup_{backup_stamp} 이름으로 옮겨 보존하고,
+    새로 만든 모든 형식의 내용이 기존 파일과 같으면 교체/백업 없이 그대로 둡니다 (이미 내보낸 엑셀도 유지).
+    """
+    from . import content_manifest
+
+    directory, filename = os.path.split(final_path)
+    temp_path = os.path.join(directory, TEMP_PREFIX + filename)
+    temp_paths = report_output.report_paths(temp_path)
+    final_paths = report_output.report_paths(final_path)
+    backup_stamp = backup_stamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+    backup_paths = report_output.report_paths(f'{os.path.splitext(final_path)[0]}_backup_{backup_stamp}.xlsx')
+    try:
+        if not build(temp_path):
+            return False
+        built = [fmt for fmt, path in temp_paths.items() if os.path.exists(path)]
+        if not built:
+            return False
+        existing = [fmt for fmt, path in final_paths.items() if os.path.exists(path)]
+        if set(built) <= set(existing) and all(
+                content_manifest.same_content(temp_paths[fmt], final_paths[fmt]) for fmt in built):
+            return True  # 설정 변경이 이 리포트에는 영향이 없음
+
+        # 기존 형식별 파일을 모두 백업 이름으로 옮긴 뒤 교체 (이번에 만들지 않은 형식도 백업에 보존)
+        backed_up = []
+        try:
+            for fmt in existing:
+                os.replace(final_paths[fmt], backup_paths[fmt])
+                backed_up.append(fmt)
+            for fmt in built:
+                os.replace(temp_paths[fmt], final_paths[fmt])
+        except OSError:
+            # 교체하지 못했으면 백업을 되돌려 기존 리포트를 유지
+            for fmt in backed_up:
+                if not os.path.exists(final_paths[fmt]):
+                    os.replace(backup_paths[fmt], final_paths[fmt])
+            raise
+        if backed_up:
+            logging.info(f"[재생성] 기존 리포트 백업: {os.path.basename(backup_paths['xlsx'])}")
+        return True
+    finally:
+        for path in temp_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+def regenerate_store_report(store, date, backup_stamp=None):
+    """보관된 원본으로 스토어/날짜 리포트 하나를 다시 만들어 리포트보관함의 파일을 교체 (기존 파일은 backup_stamp로 백업)"""
+    global _margin_cache
+    from . import report_generator
+
+    if _margin_cache is None:
+        _margin_cache = report_generator.load_margin_catalog()
+    margin_df, rep_price_map = _margin_cache
+    if margin_df is None:
+        return store, date, False
+
+    order_file = f'{store} 스마트스토어_주문조회_{date}.xlsx'
+    order_path = os.path.join(config.get_archive_dir(), order_file)
+    # 월별 zip에 보관된 원본은 멤버 하나만 메모리로 읽어 사용
+    source = source_archive.open_source(order_file)
+    if source is None:
+        logging.error(f"[재생성] 보관된 주문조회 원본이 없습니다: {order_file}")
+        return store, date, False
+    if isinstance(source, str):
+        source = None
+    report_path = os.path.join(config.get_report_archive_dir(), f'{store}_통합_리포트_{date}.xlsx')
+    ok = _replace_atomically(
+        lambda temp_path: report_generator.build_store_report(order_path, store, date, margin_df, rep_price_map, temp_path,
+                                                              source=source),
+        report_path, backup_stamp
+    )
+    return store, date, ok
+
+def reconsolidate_date(date, backup_stamp=None):
+    """리포트보관함의 스토어별 리포트로 해당 날짜의 전체 통합 리포트를 다시 만듦 (백업 파일은 제외)"""
+    from . import report_generator
+
+    report_archive_dir = config.get_report_archive_dir()
+    daily_files = []
+    for filename in sorted(os.listdir(report_archive_dir)):
+        match = STORE_REPORT_PATTERN.match(filename)
+        if match and match.group(2) == date and match.group(1) != '전체':
+            report_path = report_output.as_report_path(os.path.join(report_archive_dir, filename))
+            if report_path not in daily_files:
+                daily_files.append(report_path)
+    if not daily_files:
+        return False
+
+    output_file = os.path.join(report_archive_dir, f'전체_통합_리포트_{date}.xlsx')
+    return _replace_atomically(
+        lambda temp_path: report_generator.consolidate_reports_for_date(date, daily_files, temp_path),
+        output_file, backup_stamp
+    )
+
+def _record_in_report_index(regenerated, reconsolidated, backup_stamp):
+    """교체한 리포트와 그 백업을 리포트 색인에 반영 (워커 프로세스가 아닌 여기서 한 번에 저장)"""
+    from . import report_index
+
+    index = report_index.ReportIndex(config.get_report_archive_dir())
+    for store, date in list(regenerated) + [('전체', date) for date in reconsolidated]:
+        index.record_backup(os.path.join(index.report_dir, report_index.report_name(store, date, backup_stamp)))
+        index.refresh(store, date)
+    index.save()
+
+def _is_stop_requested():
+    from .file_handler import STOP_FLAG_FILE
+    return os.path.exists(STOP_FLAG_FILE)
+
+def run_backfill(start_date, end_date, max_workers=None):
+    """
+    [start_date, end_date] (YYYY-MM-DD) 기간의 보관된 리포트를 현재 설정으로 다시 생성
+    (스토어, 날짜)별 리포트는 프로세스 풀에서 병렬로 만들고, 성공한 날짜의 전체 통합 리포트를 다시 취합합니다.
+    재생성한 (스토어, 날짜) 목록을 반환.
+    """
+    global _margin_cache
+    for value in (start_date, end_date):
+        datetime.strptime(value, '%Y-%m-%d')
+    _margin_cache = None  # 마진정보가 바뀌었을 수 있으므로 실행마다 다시 읽음
+
+    pairs = find_affected_pairs(start_date, end_date)
+    if not pairs:
+        logging.info(f"[재생성] {start_date} ~ {end_date} 기간에 다시 만들 보관 리포트가 없습니다.")
+        return []
+
+    # 이번 실행에서 교체하는 리포트는 모두 같은 백업 시각으로 보존 (리포트 색인에 백업으로 기록)
+    backup_stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    max_workers = max_workers or config.BACKFILL_MAX_WORKERS or min(4, os.cpu_count() or 1)
+    max_workers = min(max_workers, len(pairs))
+    logging.info(f"[재생성] {start_date} ~ {end_date}: {len(pairs)}개 리포트를 {max_workers}개 프로세스로 다시 생성합니다.")
+
+    regenerated = []
+    with progress.stage('backfill', len(pairs)) as tracker:
+        if max_workers <= 1:
+            # 하나만 처리할 때는 프로세스를 띄우지 않고 현재 스레드에서 실행 (로그도 그대로 표시됨)
+            for store, date in pairs:
+                if _is_stop_requested():
+                    logging.info("[재생성] 중지 신호 감지. 재생성을 중단합니다.")
+                    break
+                tracker.begin_item(store, date)
+                if regenerate_store_report(store, date, backup_stamp)[2]:
+                    regenerated.append((store, date))
+                tracker.advance(store, date)
+        else:
+            from .process_runner import worker_log_queue
+            with worker_log_queue() as log_queue, ProcessPoolExecutor(
+                    max_workers=max_workers, initializer=_init_worker,
+                    initargs=(config.snapshot(), log_queue, logging.getLogger().getEffectiveLevel())) as executor:
+                futures = [executor.submit(regenerate_store_report, store, date, backup_stamp) for store, date in pairs]
+                for future in as_completed(futures):
+                    try:
+                        store, date, ok = future.result()
+                    except Exception as e:
+                        logging.error(f"[재생성] 작업 실패: {e}")
+                        tracker.advance()
+                        continue
+                    if ok:
+                        regenerated.append((store, date))
+                        logging.info(f"[재생성] {store} ({date}) 리포트 교체 완료")
+                    else:
+                        logging.error(f"[재생성] {store} ({date}) 리포트 재생성 실패 - 기존 리포트를 유지합니다.")
+                    tracker.advance(store, date)
+                    if _is_stop_requested():
+                        logging.info("[재생성] 중지 신호 감지. 남은 작업을 취소합니다.")
+                        for pending in futures:
+                            pending.cancel()
+                        break
+
+    reconsolidated = []
+    for date in sorted({date for _, date in regenerated}):
+        if reconsolidate_date(date, backup_stamp):
+            reconsolidated.append(date)
+            logging.info(f"[재생성] 전체_통합_리포트_{date} 교체 완료")
+        else:
+            logging.error(f"[재생성] {date} 전체 통합 리포트 재생성 실패 - 기존 리포트를 유지합니다.")
+
+    _record_in_report_index(regenerated, reconsolidated, backup_stamp)
+
+    if regenerated and config.STORE_REPORT_XLSX == 'background' and not _is_stop_requested():
+        from . import report_generator
+        report_generator.export_store_reports(pairs=regenerated, stop_requested=_is_stop_requested)
+
+    logging.info(f"[재생성] 완료: {len(regenerated)}/{len(pairs)}개 리포트")
+    return sorted(regenerated, key=lambda pair: (pair[1], pair[0]))
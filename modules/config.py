@@ -60,6 +60,14 @@ def get_report_archive_dir():
     validated_path = validate_directory(DOWNLOAD_DIR)
     return os.path.join(validated_path, '리포트보관함')
 
+def get_content_manifest_path():
+    """내용 해시 색인 파일 경로 (content_manifest 참고)"""
+    if DOWNLOAD_DIR is None:
+        raise ValueError("DOWNLOAD_DIR has not been set in config.")
+    
+    validated_path = validate_directory(DOWNLOAD_DIR)
+    return os.path.join(validated_path, '파일색인.json')
+
 MARGIN_FILE = os.path.join(BASE_DIR, '마진정보.xlsx')
 
 # --- 암호 설정 ---
@@ -75,3 +83,141 @@ COLUMNS_TO_KEEP = [
 
 # --- 데이터 처리 설정 ---
 CANCEL_OR_REFUND_STATUSES = ['취소완료', '반품요청', '반품완료', '수거중']
+
+# --- 메모리 최적화 설정 ---
+# 집계 키 컬럼을 category 타입으로, 정수 컬럼을 작은 정수 타입으로 변환하여 메모리와 groupby 시간을 줄임
+COMPACT_DTYPES = True
+CATEGORICAL_COLUMNS = ['상품ID', '상품명', '옵션정보', '클레임상태', '스토어명']
+
+# --- 주문조회 파일 읽기 설정 ---
+# 'pandas': 파일 전체를 DataFrame으로 읽은 뒤 집계
+# 'stream': openpyxl read_only 모드로 한 행씩 읽으며 옵션별로 바로 집계 (메모리가 고유 옵션 수에 비례)
+ORDER_READ_MODE = 'pandas'
+
+# 클레임상태/수량 컬럼이 없을 때 대신 사용할 컬럼 후보
+CLAIM_STATUS_COLUMN_CANDIDATES = ['상태', '주문상태', '처리상태', '배송상태', '주문처리상태', '결제상태']
+QUANTITY_COLUMN_CANDIDATES = ['결제수량', '주문수량', '상품수량', '결제상품수량']
+
+# --- 진단(로그) 수준 설정 ---
+# 'production': 요약 로그만 출력 (샘플, 분포, 중복 검사 등 비용이 큰 진단은 계산 자체를 생략)
+# 'verbose': 컬럼 목록, 샘플 값, 클레임상태 분포 등 상세 로그 추가
+# 'debug': verbose + 중복 검사, 매칭 실패 덤프, 결과 파일 재검증, 항목별 DEBUG 로그
+DIAGNOSTICS_LEVEL = 'production'
+DIAGNOSTICS_LEVELS = ['production', 'verbose', 'debug']
+
+def diagnostics_enabled(level):
+    """현재 진단 수준이 지정한 수준 이상인지 확인"""
+    try:
+        return DIAGNOSTICS_LEVELS.index(DIAGNOSTICS_LEVEL) >= DIAGNOSTICS_LEVELS.index(level)
+    except ValueError:
+        return False
+
+def snapshot():
+    """다른 프로세스에 전달할 설정 값 (실행 중 바뀐 DOWNLOAD_DIR, 암호 등 포함)"""
+    return {name: value for name, value in globals().items()
+            if name.isupper() and isinstance(value, (str, int, float, bool, list, dict, type(None)))}
+
+def apply_snapshot(values):
+    """snapshot()으로 만든 설정 값을 현재 프로세스에 적용"""
+    globals().update(values)
+
+# --- 로그 설정 ---
+LOG_FLUSH_INTERVAL_MS = 200       # GUI 로그 창을 갱신하는 주기 (이 간격으로 모아서 한 번에 출력)
+LOG_BUFFER_CAPACITY = 5000        # 갱신 사이에 보관할 최대 로그 줄 수 (초과 시 오래된 줄부터 버림)
+LOG_MAX_BLOCKS = 5000             # 로그 창에 유지할 최대 줄 수
+LOG_DIR = os.path.join(BASE_DIR, 'logs')
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+
+# --- 설정 대화상자 검색 ---
+# 검색창 입력이 멈춘 뒤 필터링까지 대기 시간 (밀리초)
+SEARCH_DEBOUNCE_MS = 200
+
+# --- 리워드/가구매 설정 저장소 ---
+# 'json': 리워드설정.json / 가구매설정.json (기본값)
+# 'sqlite': SETTINGS_DB_FILE (WAL 모드 - GUI 저장 중에도 리포트 생성 스레드가 잠금 없이 읽음)
+#   전환 전에 `python main.py import-settings`로 기존 JSON 설정을 SETTINGS_DB_FILE로 가져오고 (백엔드와 관계없이 실행 가능),
+#   `python main.py export-settings`로 언제든 SETTINGS_EXPORT_DIR에 JSON 형식으로 내보낼 수 있습니다.
+SETTINGS_BACKEND = 'json'
+SETTINGS_DB_FILE = os.path.join(BASE_DIR, '설정.db')
+SETTINGS_EXPORT_DIR = os.path.join(BASE_DIR, '설정_내보내기')
+
+# --- 보관 리포트 재생성 (backfill) ---
+# 지난 날짜의 리워드/가구매 설정을 저장하면 리포트보관함의 해당 날짜 리포트를 원본_보관함의 원본으로 다시 생성
+BACKFILL_AFTER_SETTINGS_SAVE = True
+BACKFILL_MAX_WORKERS = None  # None이면 CPU 수에 맞춰 최대 4개 프로세스
+
+# --- 시작 속도 ---
+# pandas/numpy/watchdog 등은 처음 필요할 때 불러오므로 창이 바로 표시됩니다.
+# True이면 창 표시 직후 백그라운드에서 미리 불러와 첫 처리/설정 창 지연을 없앱니다.
+WARM_IMPORTS_ON_STARTUP = True
+
+# --- 하위 프로세스 실행 ---
+# 자동화/작업폴더 처리/보관 리포트 재생성은 GUI와 별도의 프로세스에서 실행
+PROCESS_POLL_INTERVAL_MS = 50        # 하위 프로세스 로그/상태를 받아오는 주기
+PROCESS_MAX_MESSAGES_PER_POLL = 500  # 한 번에 처리할 최대 메시지 수 (나머지는 다음 주기에)
+PROCESS_STOP_TIMEOUT_MS = 5000       # 중지 요청 후 이 시간 안에 끝나지 않으면 강제 종료
+
+# --- 진행 상황 ---
+# 단계별 과거 처리 시간 (남은 시간 추정에 사용, 없으면 자동 생성)
+PROGRESS_HISTORY_FILE = os.path.join(BASE_DIR, '처리시간_기록.json')
+
+# --- 작업 스케줄러 ---
+# 리포트 생성/최종 정리 작업을 동시에 실행할 최대 개수
+# (openpyxl/pandas 작업은 GIL을 잡으므로 기본 1개 - 작업 중복 제거와 순서 보장이 주 목적)
+SCHEDULER_MAX_WORKERS = 1
+
+# --- 엑셀 쓰기 ---
+# 'standard': 표 서식 + 전체 행 기준 열 너비 (기본값)
+# 'fast': xlsxwriter constant_memory 모드로 행 단위 기록, 열 너비는 표본/벡터화 계산,
+#         표 서식 대신 머리글 서식 + 자동 필터 (큰 리포트를 더 빠르고 적은 메모리로 기록)
+XLSX_WRITER_PROFILE = 'standard'
+XLSX_WIDTH_SAMPLE_ROWS = 1000       # fast 방식에서 열 너비 계산에 사용할 표본 행 수
+XLSX_STYLE_STORE_REPORTS = True     # False면 스토어별 리포트의 '정리된 데이터' 시트에 표 서식/열 너비를 적용하지 않음
+
+# --- 옵션별 피벗 시트 ---
+# 스토어별 리포트에 추가할 상품명 x 옵션정보 합계 시트: (시트 이름, 값 컬럼)
+# 값 컬럼은 COLUMNS_TO_KEEP의 숫자 컬럼이어야 하며, 모든 시트를 한 번의 groupby로 계산하므로 시트를 늘려도 비용이 거의 늘지 않음
+PIVOT_SHEETS = [
+    ('옵션별 판매수량', '수량'),
+    ('옵션별 판매마진', '판매마진'),
+]
+
+# --- 리포트 출력 형식 ---
+# 개별/전체 통합 리포트를 기록할 형식 목록: 'xlsx', 'parquet'(pyarrow 필요), 'csv'
+# parquet/csv는 데이터 시트만 같은 파일 이름(확장자만 다름)으로 기록하며, 리포트보관함 이동도 함께 처리됨
+# 예: ['xlsx', 'parquet'] - 엑셀과 함께 기록, ['parquet'] - 엑셀 없이 parquet만 기록
+REPORT_OUTPUT_FORMATS = ['xlsx']
+
+# --- 스토어별 리포트 엑셀 생성 시점 ---
+# 'always': 개별 리포트를 만들 때 바로 엑셀(정리된 데이터 + 옵션별 피벗)로 기록 (기본값)
+# 'background': parquet 중간 결과만 만들어 전체 통합 리포트를 먼저 완성하고, 최종 정리 후 낮은 우선순위 작업으로 엑셀 생성
+# 'on_demand': parquet 중간 결과만 만들고, 엑셀은 요청할 때 생성 (GUI '엑셀 내보내기', python main.py export-reports)
+STORE_REPORT_XLSX = 'always'
+
+# --- 개별 리포트 생성 파이프라인 ---
+# 주문조회 파일이 여러 개일 때 읽기(미리 읽기/암호 해독) - 계산 - 쓰기 단계를 겹쳐 실행
+REPORT_PIPELINE = True
+PREFETCH_FILES = 2                          # 미리 읽어 둘 최대 파일 수
+PREFETCH_MAX_BYTES = 256 * 1024 * 1024      # 미리 읽어 둔 내용(암호 해독 후)의 최대 합계 (파일 하나는 항상 허용)
+REPORT_WRITER_QUEUE_SIZE = 2                # 기록을 기다리는 리포트 최대 수 (넘으면 계산 단계가 기다림)
+
+# --- 내용 해시 기반 중복 제거 ---
+# 다운로드 폴더의 파일색인.json에 파일별 SHA-256을 기록하여
+# 작업폴더/원본_보관함에 이미 있는 파일과 내용이 같은 다운로드('(1)' 사본 등)는 처리하지 않고,
+# 보관함에 내용이 같은 파일이 있으면 이동/백업을 생략함 (False면 색인 없이 보관 시에만 직접 해시 비교)
+CONTENT_DEDUP = True
+
+# --- 원본_보관함 보관 방식 ---
+# 'folder': 기존처럼 개별 xlsx 파일로 보관 (기본값, 이미 만든 zip은 계속 읽음)
+# 'zip': 최종 정리 때 옮긴 원본 파일을 날짜 기준 월별 zip(원본_2025-08.zip)과 원본_색인.json으로 보관
+#        이전에 개별 파일로 보관한 원본은 자동으로 옮기지 않음 - `python main.py pack-sources 다운로드폴더`로 한 번 전환
+SOURCE_ARCHIVE_FORMAT = 'folder'
+
+# --- 폴더 감시 방식 ---
+# 'native': watchdog 운영체제 이벤트 (로컬 디스크)
+# 'polling': 스토어 폴더를 WATCH_POLL_INTERVAL초마다 훑어 stat 캐시(inode, 크기, 수정 시각)와 비교
+#            (SMB 공유 폴더 등 이벤트가 누락되는 네트워크 드라이브 - 파일 내용은 읽지 않음)
+# 'auto': 다운로드 폴더가 네트워크 드라이브(UNC 경로, 네트워크 드라이브 문자, cifs/nfs 마운트)면 polling
+WATCH_MODE = 'auto'
+WATCH_POLL_INTERVAL = 5.0  # 초 (새 파일은 두 주기 연속 같은 상태일 때 처리하므로 최대 약 2배 지연)
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+내용 해시(SHA-256) 기반 파일 색인
+
+다운로드 폴더 안 파일의 경로(다운로드 폴더 기준 상대 경로) -> SHA-256, 크기, 수정 시각을
+다운로드 폴더의 파일색인.json에 기록합니다.
+    수집: 작업폴더/원본_보관함에 이미 있는 파일과 내용이 같은 다운로드(예: 브라우저의 '(1)' 사본)는
+          처리를 다시 예약하지 않고 삭제 (find_duplicate - 월별 zip에 보관된 원본은 원본_색인.json의 해시와 비교)
+    보관: 보관함에 내용이 같은 파일이 있으면 이동/백업 없이 작업폴더 파일만 삭제 (same_content)
+
+크기와 수정 시각(ns)이 기록과 같으면 파일을 다시 읽지 않고 기록된 해시를 사용합니다.
+xlsx는 생성/수정 시각이 든 docProps/core.xml을 빼고 해시하므로, 같은 데이터로 다시 만든 리포트는
+문서 속성의 실제 시각이 달라도 같은 내용으로 봅니다 (hash_file).
+색인은 캐시일 뿐이므로 지워지거나 손상되어도 필요할 때 다시 계산됩니다.
+감시 스레드와 작업 스케줄러가 함께 사용하므로 모든 접근은 잠금 안에서 이루어집니다.
+"""
+import os
+import json
+import zipfile
+import hashlib
+import logging
+import tempfile
+import threading
+from . import config
+
+MANIFEST_VERSION = 2  # 2: xlsx 문서 속성(docProps/core.xml)을 뺀 해시
+HASH_CHUNK_SIZE = 1024 * 1024
+ZIP_SIGNATURE = b'PK\x03\x04'
+# 내용 비교에서 제외할 xlsx 멤버 (기록할 때마다 바뀌는 문서 생성/수정 시각)
+VOLATILE_XLSX_MEMBERS = frozenset({'docProps/core.xml'})
+
+_lock = threading.RLock()
+_manifest = None
+
+def _hash_zip_members(f):
+    """xlsx(zip)의 멤버 이름/크기와 압축을 푼 내용으로 계산한 SHA-256 (VOLATILE_XLSX_MEMBERS 제외)"""
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(f) as archive:
+        for info in sorted(archive.infolist(), key=lambda info: info.filename):
+            if info.filename in VOLATILE_XLSX_MEMBERS:
+                continue
+            digest.update(f'{info.filename}\0{info.file_size}\0'.encode('utf-8'))
+            with archive.open(info) as member:
+                for chunk in iter(lambda: member.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_stream(f):
+    """
+    파일 객체 내용의 SHA-256 (16진 문자열)
+    zip 형식(xlsx)이면 문서 생성/수정 시각을 뺀 멤버 내용으로, 그 외(암호화된 xlsx, parquet, csv)는 바이트 그대로 계산
+    """
+    if f.read(len(ZIP_SIGNATURE)) == ZIP_SIGNATURE:
+        try:
+            return _hash_zip_members(f)
+        except (zipfile.BadZipFile, EOFError):
+            pass  # 손상된 파일은 바이트 그대로 비교
+    f.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_file(path):
+    """파일 내용의 SHA-256 (hash_stream 참고)"""
+    with open(path, 'rb') as f:
+        return hash_stream(f)
+
+class ContentManifest:
+    """파일색인.json 하나 (경로 -> 해시 기록과 해시/파일명 역색인)"""
+    def __init__(self, root, manifest_path):
+        self.root = root
+        self.manifest_path = manifest_path
+        self.files = {}      # 상대 경로 -> {'sha256', 'size', 'mtime_ns'}
+        self._by_name = {}   # 파일명 -> 상대 경로 집합 (같은 이름의 후보만 해시 비교)
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != MANIFEST_VERSION:
+                return
+            for rel, record in data.get('files', {}).items():
+                self._set(rel, record)
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"파일 색인을 읽지 못해 새로 만듭니다: {e}")
+            self.files, self._by_name = {}, {}
+        self._dirty = False
+
+    def _rel(self, path):
+        return os.path.relpath(os.path.abspath(path), os.path.abspath(self.root))
+
+    def _set(self, rel, record):
+        self.files[rel] = record
+        self._by_name.setdefault(os.path.basename(rel), set()).add(rel)
+        self._dirty = True
+
+    def _drop(self, rel):
+        if self.files.pop(rel, None) is None:
+            return
+        names = self._by_name.get(os.path.basename(rel))
+        if names:
+            names.discard(rel)
+        self._dirty = True
+
+    def _valid_record(self, rel):
+        """기록이 있고 현재 파일의 크기/수정 시각이 기록과 같으면 기록을, 아니면 None"""
+        record = self.files.get(rel)
+        if record is None:
+            return None
+        try:
+            stat = os.stat(os.path.join(self.root, rel))
+        except OSError:
+            self._drop(rel)
+            return None
+        if stat.st_size != record['size'] or stat.st_mtime_ns != record['mtime_ns']:
+            return None
+        return record
+
+    def digest(self, path):
+        """파일의 SHA-256 (기록이 유효하면 다시 읽지 않음)"""
+        rel = self._rel(path)
+        record = self._valid_record(rel)
+        if record is not None:
+            return record['sha256']
+        stat = os.stat(path)
+        sha256 = hash_file(path)
+        self._set(rel, {'sha256': sha256, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+        return sha256
+
+    def find_duplicate(self, path, name):
+        """path와 내용이 같고 파일명이 name인 다른 파일의 경로 (없으면 None)"""
+        rel = self._rel(path)
+        candidates = [other for other in self._by_name.get(name, ()) if other != rel]
+        # 아직 색인에 없는 후보(이전 버전에서 옮긴 파일 등)도 작업폴더/원본_보관함에서 확인
+        for directory in (config.get_processing_dir(), config.get_archive_dir()):
+            other = self._rel(os.path.join(directory, name))
+            if other != rel and other not in candidates and os.path.exists(os.path.join(self.root, other)):
+                candidates.append(other)
+        # 월별 zip의 원본 (아직 압축하지 않은 같은 이름의 개별 파일이 있으면 그쪽이 최신)
+        archived = None
+        if not os.path.exists(os.path.join(config.get_archive_dir(), name)):
+            from . import source_archive
+            archived = source_archive.archived_record(name)
+        if not candidates and archived is None:
+            return None
+        sha256 = self.digest(path)
+        for other in candidates:
+            other_path = os.path.join(self.root, other)
+            try:
+                if self.digest(other_path) == sha256:
+                    return other_path
+            except OSError:
+                self._drop(other)
+        if archived is not None and archived['sha256'] == sha256:
+            return os.path.join(config.get_archive_dir(), archived['container'])
+        return None
+
+    def moved(self, src_path, dst_path):
+        """src_path -> dst_path 이동을 기록 (이동은 수정 시각을 유지하므로 해시를 그대로 옮김)"""
+        src, dst = self._rel(src_path), self._rel(dst_path)
+        record = self.files.get(src)
+        self._drop(src)
+        self._drop(dst)
+        if record is not None:
+            self._set(dst, record)
+            if self._valid_record(dst) is None:
+                self._drop(dst)
+
+    def forget(self, path):
+        self._drop(self._rel(path))
+
+    def prune(self):
+        """더 이상 존재하지 않는 파일의 기록 삭제"""
+        for rel in [rel for rel in self.files if not os.path.exists(os.path.join(self.root, rel))]:
+            self._drop(rel)
+
+    def save(self):
+        """변경된 경우에만 임시 파일에 쓴 뒤 os.replace로 교체"""
+        if not self._dirty:
+            return
+        fd, temp_path = tempfile.mkstemp(prefix='.파일색인_', suffix='.tmp', dir=self.root)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'files': self.files}, f, ensure_ascii=False)
+            os.replace(temp_path, self.manifest_path)
+            self._dirty = False
+        except Exception as e:
+            logging.warning(f"파일 색인 저장 실패: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+def _current():
+    """현재 다운로드 폴더의 색인 (다운로드 폴더가 바뀌면 다시 읽음)"""
+    global _manifest
+    root = config.validate_directory(config.DOWNLOAD_DIR)
+    if _manifest is None or _manifest.root != root:
+        _manifest = ContentManifest(root, config.get_content_manifest_path())
+    return _manifest
+
+def enabled():
+    return config.CONTENT_DEDUP and config.DOWNLOAD_DIR is not None
+
+def find_duplicate(path, name):
+    """수집할 파일(path)과 내용이 같은 작업폴더/원본_보관함의 파일(이름 name) 경로, 없으면 None"""
+    if not enabled():
+        return None
+    with _lock:
+        try:
+            return _current().find_duplicate(path, name)
+        except OSError as e:
+            logging.warning(f"[파일 색인] 중복 확인 실패 ({os.path.basename(path)}): {e}")
+            return None
+
+def same_content(path_a, path_b):
+    """두 파일의 내용이 같은지 (색인이 꺼져 있으면 항상 직접 해시 비교)"""
+    if not enabled():
+        return hash_file(path_a) == hash_file(path_b)
+    with _lock:
+        manifest = _current()
+        return manifest.digest(path_a) == manifest.digest(path_b)
+
+def record_move(src_path, dst_path):
+    if enabled():
+        with _lock:
+            _current().moved(src_path, dst_path)
+
+def forget(path):
+    if enabled():
+        with _lock:
+            _current().forget(path)
+
+def save(prune=False):
+    """변경 내용 저장 (prune이면 없어진 파일의 기록도 정리)"""
+    if not enabled():
+        return
+    with _lock:
+        manifest = _current()
+        if prune:
+            manifest.prune()
+        manifest.save()
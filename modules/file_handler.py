@@ -5,12 +5,77 @@ import shutil
 import time
 import logging
 import datetime
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import threading
 from . import config
-from . import report_generator
+from . import progress
+from . import report_output
+from . import content_manifest
+from . import source_archive
+from . import report_index
+from . import finalize_plan
+from .scheduler import JobScheduler, PRIORITY_REPORT, PRIORITY_FINALIZE, PRIORITY_EXPORT
+
+# watchdog과 report_generator(pandas/numpy)는 시작 속도를 위해 실제로 사용할 때 불러옵니다.
 
 STOP_FLAG_FILE = os.path.join(config.BASE_DIR, 'stop.flag')
+MAX_SOURCE_FILE_SIZE = 100 * 1024 * 1024  # 원본 파일 크기 제한
+
+# 감시 스레드/시작 스캔/작업폴더 처리가 함께 쓰는 작업 스케줄러 (처음 사용할 때 생성)
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = JobScheduler(config.SCHEDULER_MAX_WORKERS, name='pipeline')
+        return _scheduler
+
+def shutdown_scheduler(cancel_pending=False):
+    """스케줄러 종료 (cancel_pending이면 아직 시작하지 않은 작업은 취소)"""
+    global _scheduler
+    with _scheduler_lock:
+        scheduler, _scheduler = _scheduler, None
+    if scheduler is not None:
+        scheduler.shutdown(cancel_pending=cancel_pending)
+
+def _report_key(store, date):
+    """(스토어, 날짜) 리포트 작업의 스케줄러 키 - 단일 작업과 묶음 작업이 같은 키를 써서 중복 예약을 막음"""
+    return ('report', store, date)
+
+def schedule_report(store, date):
+    """(스토어, 날짜) 리포트 생성 예약 - 같은 쌍이 이미 대기 중이면(묶음 작업 포함) 합쳐짐"""
+    return get_scheduler().submit(_report_key(store, date), lambda: _check_and_process_data(store, date),
+                                  priority=PRIORITY_REPORT)
+
+FINALIZE_KEY = ('finalize',)
+
+def schedule_finalize():
+    """최종 정리 예약 - 여러 번 요청해도 한 번만 실행되고, 진행 중인 리포트 작업이 끝난 뒤 단독으로 실행"""
+    return get_scheduler().submit(FINALIZE_KEY, finalize_all_processing,
+                                  priority=PRIORITY_FINALIZE, exclusive=True)
+
+def _export_store_report(store, date, report_path):
+    if os.path.exists(STOP_FLAG_FILE):
+        return
+    from . import report_generator
+    if not os.path.exists(report_path) and report_generator.export_store_report(report_path):
+        logging.info(f"[{store}, {date}] 스토어별 리포트 엑셀 내보내기 완료")
+
+def schedule_store_report_exports():
+    """리포트보관함에서 엑셀이 없는 스토어별 리포트마다 낮은 우선순위 내보내기 작업 예약 (새 리포트 작업이 먼저 실행됨)"""
+    from . import report_generator
+    targets = report_generator.find_unexported_store_reports()
+    for store, date, report_path in targets:
+        get_scheduler().submit(('export', report_path),
+                               lambda store=store, date=date, report_path=report_path: _export_store_report(store, date, report_path),
+                               priority=PRIORITY_EXPORT)
+    if targets:
+        logging.info(f"스토어별 리포트 {len(targets)}개의 엑셀 내보내기를 예약했습니다.")
+
+def wait_for_jobs():
+    """예약된 작업이 모두 끝날 때까지 대기 (낮은 우선순위의 엑셀 내보내기 포함)"""
+    get_scheduler().wait_idle()
 
 def validate_excel_file(file_path):
     """Excel 파일 검증 (암호 보호된 파일 포함)"""
@@ -22,7 +87,7 @@ def validate_excel_file(file_path):
     
     # 파일 크기 체크 (100MB 제한)
     file_size = os.path.getsize(file_path)
-    if file_size > 100 * 1024 * 1024:
+    if file_size > MAX_SOURCE_FILE_SIZE:
         raise ValueError(f"파일 크기가 너무 큽니다 (100MB 초과): {file_path}")
     
     # 암호 보호된 파일인지 확인 (파일 헤더 체크)
@@ -37,6 +102,20 @@ def validate_excel_file(file_path):
     
     return True
 
+def parse_source_filename(store_name, filename):
+    """스토어 폴더의 원본 파일명에서 (날짜, 파일 타입, 작업폴더용 새 파일명) 추출. 해당 없으면 (None, None, None)"""
+    # 브라우저가 같은 파일을 다시 받으면 붙이는 ' (1)' 사본도 인식 (내용이 같으면 수집 시 중복으로 제외됨)
+    order_match = re.match(r"스마트스토어_주문조회_(\d{4}-\d{2}-\d{2})(?: ?\(\d+\))?\.xlsx", filename)
+    if order_match:
+        date_str = order_match.group(1)
+        return date_str, '주문', f"{store_name} 스마트스토어_주문조회_{date_str}.xlsx"
+
+    perf_match = re.match(r"상품성과_(\d{4}-\d{2}-\d{2}).*?\.xlsx", filename)
+    if perf_match:
+        date_str = perf_match.group(1)
+        return date_str, '성과', f"{store_name} 상품성과_{date_str}.xlsx"
+    return None, None, None
+
 def get_file_info(src_path):
     """파일 경로를 분석하여 스토어, 날짜, 파일 타입, 새 파일명을 반환합니다."""
     try:
@@ -47,21 +126,7 @@ def get_file_info(src_path):
         else:
             return None, None, None, None
 
-        original_filename = os.path.basename(src_path)
-        date_str, file_type, new_filename = None, None, None
-
-        order_match = re.match(r"스마트스토어_주문조회_(\d{4}-\d{2}-\d{2})\.xlsx", original_filename)
-        if order_match:
-            date_str = order_match.group(1)
-            file_type = '주문'
-            new_filename = f"{store_name} 스마트스토어_주문조회_{date_str}.xlsx"
-        
-        perf_match = re.match(r"상품성과_(\d{4}-\d{2}-\d{2}).*?\.xlsx", original_filename)
-        if perf_match:
-            date_str = perf_match.group(1)
-            file_type = '성과'
-            new_filename = f"{store_name} 상품성과_{date_str}.xlsx"
-
+        date_str, file_type, new_filename = parse_source_filename(store_name, os.path.basename(src_path))
         if date_str and file_type and new_filename:
             return store_name, date_str, file_type, new_filename
         return None, None, None, None
@@ -75,6 +140,55 @@ def get_file_info(src_path):
         logging.error(f"[get_file_info] 정보 추출 중 예상치 못한 오류: {e}")
         return None, None, None, None
 
+def _partner_filename(store, date, file_type):
+    """같은 (스토어, 날짜) 쌍의 다른 원본 파일 이름"""
+    if file_type == '주문':
+        return f"{store} 상품성과_{date}.xlsx"
+    return f"{store} 스마트스토어_주문조회_{date}.xlsx"
+
+def _skip_duplicate_download(src_path, new_filename, log_prefix):
+    """작업폴더/원본_보관함에 내용이 같은 파일이 이미 있으면 다운로드를 삭제하고 True (처리를 다시 예약하지 않음)"""
+    duplicate = content_manifest.find_duplicate(src_path, new_filename)
+    if duplicate is None:
+        return False
+    logging.info(f"{log_prefix} 내용이 같은 파일이 이미 있어 건너뜁니다: '{src_path}' "
+                 f"(= {os.path.relpath(duplicate, config.DOWNLOAD_DIR)})")
+    try:
+        os.remove(src_path)
+        content_manifest.forget(src_path)
+    except OSError as e:
+        logging.error(f"{log_prefix} 중복 파일 삭제 실패 ({src_path}): {e}")
+    return True
+
+def _move_into_processing(src_path, dest_path, store, date):
+    """원본 파일을 작업폴더로 이동 (같은 이름의 다른 내용으로 바뀌면 이전 내용으로 만든 개별 리포트 삭제)"""
+    if os.path.exists(dest_path) and not content_manifest.same_content(src_path, dest_path):
+        report_path = os.path.join(config.get_processing_dir(), f'{store}_통합_리포트_{date}.xlsx')
+        for path in report_output.existing_report_paths(report_path):
+            os.remove(path)
+            content_manifest.forget(path)
+            logging.info(f"[{store}, {date}] 원본 내용이 바뀌어 개별 리포트를 다시 생성합니다: {os.path.basename(path)}")
+    shutil.move(src_path, dest_path)
+    content_manifest.record_move(src_path, dest_path)
+
+def _restore_archived_partner(store, date, file_type):
+    """
+    짝 파일이 작업폴더에 없고 원본_보관함(개별 파일 또는 월별 zip)에 있으면 작업폴더로 복사
+    (내용이 같아 제외된 다운로드의 짝만 새로 받은 경우에도 파일 쌍이 완성되도록 - 최종 정리 때 보관함 파일과 같으면 삭제됨)
+    """
+    if not content_manifest.enabled():
+        return
+    partner = _partner_filename(store, date, file_type)
+    partner_path = os.path.join(config.get_processing_dir(), partner)
+    if os.path.exists(partner_path):
+        return
+    try:
+        if not source_archive.restore_source(partner, partner_path):
+            return
+        logging.info(f"[{store}, {date}] 짝 파일을 원본_보관함에서 복원했습니다: {partner}")
+    except OSError as e:
+        logging.error(f"[{store}, {date}] 짝 파일 복원 실패 ({partner}): {e}")
+
 def _check_and_process_data(store, date):
     """파일 쌍이 준비되었는지 확인하고 리포트 생성을 트리거합니다."""
     logging.info(f"[{store}, {date}] 파일 쌍 확인 및 데이터 처리 시작...")
@@ -90,11 +204,12 @@ def _check_and_process_data(store, date):
         individual_report = f'{store}_통합_리포트_{date}.xlsx'
         individual_report_path = os.path.join(config.get_processing_dir(), individual_report)
         
-        if os.path.exists(individual_report_path):
+        if report_output.report_exists(individual_report_path):
             logging.info(f"[{store}, {date}] 이미 리포트가 생성되어 있습니다.")
         else:
             # 개별 리포트만 생성 (파일 이동은 하지 않음)
-            processed_groups = report_generator.generate_individual_reports()
+            from . import report_generator
+            processed_groups = report_generator.generate_individual_reports(pairs=[(store, date)])
             if not processed_groups:
                 logging.error(f"[{store}, {date}] 리포트 생성에 실패했습니다.")
                 return
@@ -104,79 +219,141 @@ def _check_and_process_data(store, date):
         logging.info(f"[{store}, {date}] 아직 파일 쌍이 준비되지 않았습니다.")
 
 def process_file(src_path):
-    """감지된 파일을 처리 폴더로 옮기고, 데이터 처리를 시작합니다."""
+    """감지된 파일을 처리 폴더로 옮기고, 데이터 처리를 예약합니다."""
     logging.info(f"[process_file] 파일 처리 시작: {src_path}")
     store, date, file_type, new_filename = get_file_info(src_path)
     if not all([store, date, file_type, new_filename]):
         logging.warning(f"[process_file] 파일 정보가 올바르지 않아 무시합니다: {src_path}")
         return
 
+    if _skip_duplicate_download(src_path, new_filename, '[process_file]'):
+        content_manifest.save()
+        return
+
     dest_path = os.path.join(config.get_processing_dir(), new_filename)
     try:
         logging.info(f"[process_file] 파일 이동: '{src_path}' -> '{dest_path}'")
-        shutil.move(src_path, dest_path)
+        _move_into_processing(src_path, dest_path, store, date)
         logging.info("[process_file] 파일 이동 완료.")
-        _check_and_process_data(store, date)
+        _restore_archived_partner(store, date, file_type)
+        schedule_report(store, date)
     except Exception as e:
         logging.error(f"[process_file] 파일 이동/처리 중 오류: {e}")
+    content_manifest.save()
 
-class FileProcessorHandler(FileSystemEventHandler):
-    """파일 시스템 이벤트를 감지하여 파일 처리를 시작하는 핸들러"""
-    def on_created(self, event):
-        if not event.is_directory and event.src_path.endswith('.xlsx') and not os.path.basename(event.src_path).startswith('~$'):
-            logging.info(f"[on_created] 새 파일 감지: {event.src_path}")
-            time.sleep(1)
-            process_file(event.src_path)
+def create_event_handler():
+    """watchdog 이벤트 핸들러 생성 (watchdog은 모니터링을 시작할 때 처음 불러옴)"""
+    from watchdog.events import FileSystemEventHandler
+
+    class FileProcessorHandler(FileSystemEventHandler):
+        """파일 시스템 이벤트를 감지하여 파일 처리를 시작하는 핸들러"""
+        def on_created(self, event):
+            if not event.is_directory and event.src_path.endswith('.xlsx') and not os.path.basename(event.src_path).startswith('~$'):
+                logging.info(f"[on_created] 새 파일 감지: {event.src_path}")
+                time.sleep(1)
+                process_file(event.src_path)
+
+    return FileProcessorHandler()
+
+def create_observer():
+    """
+    설정(config.WATCH_MODE)에 맞는 폴더 감시 객체 생성 (start/stop/join)
+    'native'는 watchdog 운영체제 이벤트, 'polling'은 스토어 폴더 stat 캐시 비교 (네트워크 드라이브)
+    """
+    from . import folder_poller
+
+    mode = folder_poller.resolve_watch_mode(config.WATCH_MODE, config.DOWNLOAD_DIR)
+    if mode == 'polling':
+        managed_dirs = {os.path.basename(path) for path in
+                        (config.get_processing_dir(), config.get_archive_dir(), config.get_report_archive_dir())}
+        logging.info(f"- 감시 방식: 폴링 ({config.WATCH_POLL_INTERVAL}초 간격, 스토어 폴더 stat 비교)")
+        return folder_poller.PollingWatcher(config.DOWNLOAD_DIR, process_file, config.WATCH_POLL_INTERVAL,
+                                            excluded=managed_dirs)
+
+    from watchdog.observers import Observer
+    observer = Observer()
+    observer.schedule(create_event_handler(), config.DOWNLOAD_DIR, recursive=True)
+    return observer
+
+def scan_download_folder():
+    """
+    os.scandir로 스토어 폴더를 한 번씩만 훑어 작업폴더로 옮길 원본 파일 목록을 만듭니다.
+    반환: [(원본 경로, 스토어, 날짜, 파일 타입, 작업폴더용 파일명)] - 관리 폴더(작업폴더/보관함)는 제외
+    """
+    managed_dirs = {os.path.basename(path) for path in
+                    (config.get_processing_dir(), config.get_archive_dir(), config.get_report_archive_dir())}
+    plan = []
+    with os.scandir(config.DOWNLOAD_DIR) as store_entries:
+        for store_entry in store_entries:
+            if store_entry.name in managed_dirs or not store_entry.is_dir():
+                continue
+            with os.scandir(store_entry.path) as file_entries:
+                for entry in file_entries:
+                    if not entry.name.endswith('.xlsx') or entry.name.startswith('~') or not entry.is_file():
+                        continue
+                    date, file_type, new_filename = parse_source_filename(store_entry.name, entry.name)
+                    if not date:
+                        logging.warning(f"[기존 파일] 파일 정보가 올바르지 않아 무시합니다: {entry.path}")
+                        continue
+                    if entry.stat().st_size > MAX_SOURCE_FILE_SIZE:
+                        logging.warning(f"[기존 파일] 파일 크기가 너무 큽니다 (100MB 초과): {entry.path}")
+                        continue
+                    plan.append((entry.path, store_entry.name, date, file_type, new_filename))
+    return plan
 
 def process_existing_files():
-    """프로그램 시작 시 다운로드 폴더에 이미 있는 파일들을 처리합니다."""
+    """
+    프로그램 시작 시 다운로드 폴더에 이미 있는 파일들을 일괄 처리합니다.
+    스토어 폴더 전체를 한 번 스캔해 모든 파일을 작업폴더로 옮긴 뒤, 완성된 파일 쌍의 리포트를 한 번에 생성하고
+    최종 정리를 한 번 수행합니다.
+    """
     logging.info("===== 기존 파일 스캔 시작 ====")
     
     if not os.path.exists(config.DOWNLOAD_DIR):
         logging.warning(f"감시할 다운로드 폴더가 존재하지 않습니다: {config.DOWNLOAD_DIR}")
         return
     
-    for store_folder in os.listdir(config.DOWNLOAD_DIR):
-        store_path = os.path.join(config.DOWNLOAD_DIR, store_folder)
-        if os.path.isdir(store_path):
-            for filename in os.listdir(store_path):
-                if filename.endswith('.xlsx') and not filename.startswith('~'):
-                    file_path = os.path.join(store_path, filename)
-                    logging.info(f"[기존 파일] 처리 시도: '{file_path}'")
-                    # 개별 파일 처리 (최종 정리는 나중에 일괄 수행)
-                    process_file(file_path)
-    
-    # 2단계: 작업폴더의 미완료 처리 파일들 검사 및 처리
+    # 1단계: 스캔한 원본 파일들을 작업폴더로 일괄 이동
+    plan = scan_download_folder()
+    if plan:
+        logging.info(f"[기존 파일] {len(plan)}개 파일을 작업폴더로 이동합니다.")
+    processing_dir = config.get_processing_dir()
+    moved = []
+    with progress.stage('scan', len(plan)) as tracker:
+        for src_path, store, date, file_type, new_filename in plan:
+            try:
+                if not _skip_duplicate_download(src_path, new_filename, '[기존 파일]'):
+                    _move_into_processing(src_path, os.path.join(processing_dir, new_filename), store, date)
+                    logging.info(f"[기존 파일] 이동 완료: '{src_path}' -> '{new_filename}'")
+                    moved.append((store, date, file_type))
+            except Exception as e:
+                logging.error(f"[기존 파일] 파일 이동 중 오류 ({src_path}): {e}")
+            tracker.advance(store, date)
+    # 짝 파일 복원은 모두 옮긴 뒤에 (같이 받은 짝 파일을 보관함에서 불필요하게 복사하지 않도록)
+    for store, date, file_type in moved:
+        _restore_archived_partner(store, date, file_type)
+    content_manifest.save()
+    
+    # 2단계: 작업폴더의 완성된 파일 쌍 중 리포트가 없는 것들을 한 번에 생성
     process_incomplete_files()
     
     # 3단계: 모든 파일 처리 완료 후 최종 정리 수행 (한 번만)
-    finalize_all_processing()
+    request_finalize()
     
     logging.info("===== 기존 파일 스캔 완료 ====")
 
-def process_incomplete_files():
-    """작업폴더에 있는 미완료 처리 파일들을 검사하고 리포트 생성을 시도합니다."""
-    logging.info("--- 작업폴더 미완료 파일 검사 시작 ---")
-    
-    # 중지 신호 확인
-    if os.path.exists(STOP_FLAG_FILE):
-        logging.info("중지 신호 감지. 작업폴더 처리를 중단합니다.")
-        return
-    
-    if not os.path.exists(config.get_processing_dir()):
-        return
-    
-    # 작업폴더의 모든 엑셀 파일 스캔
-    all_files = [f for f in os.listdir(config.get_processing_dir()) if f.endswith('.xlsx') and not f.startswith('~')]
-    source_files = [f for f in all_files if '통합_리포트' not in f and '마진정보' not in f]
-    
-    if not source_files:
-        logging.info("작업폴더에 미처리 파일이 없습니다.")
-        return
+def find_pending_pairs():
+    """작업폴더에서 성과/주문 파일이 모두 있고 개별 리포트가 없는 (스토어, 날짜) 목록"""
+    listing = os.listdir(config.get_processing_dir())
+    all_files = [f for f in listing if f.endswith('.xlsx') and not f.startswith('~')]
+    # 출력 형식과 관계없이 리포트가 하나라도 있으면 생성된 것으로 봄 (.xlsx 이름 기준)
+    report_files = {report_output.as_report_path(f) for f in listing if report_output.is_report_file(f)}
     
     # 스토어별, 날짜별 파일 그룹 생성
     file_groups = {}
-    for f in source_files:
+    for f in all_files:
+        if '통합_리포트' in f or '마진정보' in f:
+            continue
         store, date, file_type = None, None, None
         if '상품성과' in f:
             parts = f.split(' 상품성과_')
@@ -188,29 +365,71 @@ def process_incomplete_files():
                 store, date, file_type = parts[0], parts[1].replace('.xlsx',''), '주문'
         
         if store and date and file_type:
-            key = (store, date)
-            if key not in file_groups: 
-                file_groups[key] = {}
-            file_groups[key][file_type] = f
-    
-    # 완전한 파일 쌍이 있는데 리포트가 없는 경우 처리
-    processed_any = False
-    for (store, date), files in file_groups.items():
-        # 중지 신호 확인
-        if os.path.exists(STOP_FLAG_FILE):
-            logging.info("중지 신호 감지. 미완료 파일 처리를 중단합니다.")
-            return
-            
-        if '성과' in files and '주문' in files:
-            individual_report = f'{store}_통합_리포트_{date}.xlsx'
-            individual_report_path = os.path.join(config.get_processing_dir(), individual_report)
-            
-            if not os.path.exists(individual_report_path):
-                logging.info(f"[미완료 처리 발견] {store} ({date}) - 리포트 생성을 재시도합니다.")
-                _check_and_process_data(store, date)
+            file_groups.setdefault((store, date), set()).add(file_type)
+    
+    return sorted(
+        ((store, date) for (store, date), file_types in file_groups.items()
+         if {'성과', '주문'} <= file_types and f'{store}_통합_리포트_{date}.xlsx' not in report_files),
+        key=lambda pair: (pair[1], pair[0])
+    )
+
+def _generate_reports(pairs):
+    """여러 (스토어, 날짜) 리포트를 한 번의 호출로 생성 (마진정보는 한 번만 읽음)"""
+    from . import report_generator
+    processed = report_generator.generate_individual_reports(
+        pairs=pairs, stop_requested=lambda: os.path.exists(STOP_FLAG_FILE))
+    processed = set(processed) if isinstance(processed, list) else set()
+    if os.path.exists(STOP_FLAG_FILE):
+        return
+    for store, date in pairs:
+        if (store, date) not in processed:
+            logging.error(f"[{store}, {date}] 리포트 생성에 실패했습니다.")
+
+def schedule_reports(pairs):
+    """여러 (스토어, 날짜) 리포트 생성을 하나의 작업으로 예약 (이미 대기/실행 중인 쌍은 (스토어, 날짜) 단위로 합쳐짐)"""
+    keys = [_report_key(store, date) for store, date in pairs]
+    if not keys:
+        return False
+    scheduled = get_scheduler().submit_many(
+        keys, lambda keys: _generate_reports([(store, date) for _, store, date in keys]), priority=PRIORITY_REPORT)
+    return bool(scheduled)
+
+def process_incomplete_files(wait=True):
+    """작업폴더에 있는 미완료 처리 파일들을 검사하고 리포트 생성을 예약합니다. (wait이면 완료까지 대기)"""
+    logging.info("--- 작업폴더 미완료 파일 검사 시작 ---")
+    
+    # 중지 신호 확인
+    if os.path.exists(STOP_FLAG_FILE):
+        logging.info("중지 신호 감지. 작업폴더 처리를 중단합니다.")
+        return
+    
+    if not os.path.exists(config.get_processing_dir()):
+        return
     
+    # 완전한 파일 쌍이 있는데 리포트가 없는 경우 한 번에 처리
+    pairs = find_pending_pairs()
+    if not pairs:
+        logging.info("작업폴더에 미처리 파일이 없습니다.")
+        return
+    
+    for store, date in pairs:
+        logging.info(f"[미완료 처리 발견] {store} ({date}) - 리포트 생성을 재시도합니다.")
+    schedule_reports(pairs)
+    
+    if wait:
+        # 이 쌍들의 리포트만 기다림 (앞선 최종 정리가 예약한 엑셀 내보내기는 기다리지 않음)
+        get_scheduler().wait_for(_report_key(store, date) for store, date in pairs)
     logging.info("--- 작업폴더 미완료 파일 검사 완료 ---")
 
+def request_finalize(wait=True):
+    """
+    스케줄러를 통해 최종 정리 실행 (대기 중인 리포트 작업이 모두 끝난 뒤 한 번만 실행)
+    wait이면 최종 정리가 끝날 때까지만 기다리고, 최종 정리가 예약한 엑셀 내보내기(PRIORITY_EXPORT)는 기다리지 않습니다.
+    """
+    schedule_finalize()
+    if wait:
+        get_scheduler().wait_for([FINALIZE_KEY])
+
 def finalize_all_processing():
     """모든 개별 처리 완료 후 전체 통합 리포트 생성 및 파일 정리를 일괄 수행합니다."""
     # 중지 신호 확인
@@ -224,36 +443,39 @@ def finalize_all_processing():
     if not os.path.exists(processing_dir):
         return
     
-    # 원본 파일이나 개별 리포트가 있는지 확인
-    source_files = [f for f in os.listdir(processing_dir) 
-                   if f.endswith('.xlsx') and '통합_리포트' not in f and not f.startswith('~')]
-    report_files = [f for f in os.listdir(processing_dir) 
-                   if f.endswith('.xlsx') and '통합_리포트' in f and not f.startswith('~')]
+    # 작업폴더를 한 번만 읽어 원본 파일/개별 리포트/전체 통합 리포트로 분류하고 모든 단계에 넘김
+    plan = finalize_plan.FinalizePlan.scan(processing_dir)
     
-    if not source_files and not report_files:
+    if plan.is_empty():
         logging.info("정리할 파일이 없습니다.")
         return
     
     logging.info("=== 최종 정리 작업 시작 ===")
     
     # 1단계: 전체 통합 리포트 생성 (개별 리포트가 있는 경우에만)
-    if report_files:
+    if plan.reports:
         logging.info("1단계: 전체 통합 리포트 생성 중...")
-        report_generator.consolidate_daily_reports()
+        from . import report_generator
+        report_generator.consolidate_daily_reports(plan)
     
     # 2단계: 모든 원본 파일들을 원본_보관함으로 이동
-    if source_files:
+    if plan.sources:
         logging.info("2단계: 원본 파일들을 원본_보관함으로 이동 중...")
-        move_source_files_to_archive()
+        move_source_files_to_archive(plan)
     
     # 3단계: 모든 리포트 파일들을 리포트보관함으로 이동
     logging.info("3단계: 리포트 파일들을 리포트보관함으로 이동 중...")
-    move_reports_to_archive()
+    move_reports_to_archive(plan)
     
+    content_manifest.save(prune=True)
     logging.info("=== 최종 정리 작업 완료 ===")
 
-def move_source_files_to_archive():
-    """작업폴더의 모든 원본 파일들(상품성과, 주문조회)을 원본_보관함으로 이동합니다."""
+    # 스토어별 리포트 엑셀은 전체 통합 리포트가 나온 뒤 낮은 우선순위로 만듦
+    if config.STORE_REPORT_XLSX == 'background':
+        schedule_store_report_exports()
+
+def move_source_files_to_archive(plan=None):
+    """작업폴더의 모든 원본 파일들(상품성과, 주문조회)을 원본_보관함으로 이동합니다. (plan: 최종 정리의 작업폴더 스냅샷)"""
     processing_dir = config.get_processing_dir()
     archive_dir = config.get_archive_dir()
     
@@ -261,70 +483,118 @@ def move_source_files_to_archive():
         return
     
     # 원본 파일들 찾기 (통합_리포트가 아닌 파일들)
-    source_files = [f for f in os.listdir(processing_dir) 
-                   if f.endswith('.xlsx') and '통합_리포트' not in f and not f.startswith('~')]
+    plan = plan or finalize_plan.FinalizePlan.scan(processing_dir)
+    source_entries = plan.sources
     
-    if not source_files:
+    if not source_entries:
         logging.info("이동할 원본 파일이 없습니다.")
         return
     
-    logging.info(f"--- 원본 파일들을 원본_보관함으로 이동 시작 ({len(source_files)}개 파일) ---")
-    
-    for source_file in source_files:
-        try:
-            src_path = os.path.join(processing_dir, source_file)
-            dst_path = os.path.join(archive_dir, source_file)
-            shutil.move(src_path, dst_path)
-            logging.info(f"원본 파일 이동 완료: {source_file}")
-        except Exception as e:
-            logging.error(f"원본 파일 이동 실패 ({source_file}): {e}")
+    logging.info(f"--- 원본 파일들을 원본_보관함으로 이동 시작 ({len(source_entries)}개 파일) ---")
+    archived = []
+    
+    with progress.stage('archive_sources', len(source_entries)) as tracker:
+        for entry in source_entries:
+            source_file = entry.name
+            try:
+                src_path = entry.path
+                dst_path = os.path.join(archive_dir, source_file)
+                if plan.exists(archive_dir, source_file) and content_manifest.same_content(src_path, dst_path):
+                    # 보관함에 같은 내용이 이미 있음 (복원한 짝 파일, 다시 받은 파일 등)
+                    os.remove(src_path)
+                    content_manifest.forget(src_path)
+                    logging.info(f"원본_보관함에 같은 파일이 있어 이동 생략: {source_file}")
+                else:
+                    shutil.move(src_path, dst_path)
+                    content_manifest.record_move(src_path, dst_path)
+                    plan.added(archive_dir, source_file)
+                    archived.append(source_file)
+                    logging.info(f"원본 파일 이동 완료: {source_file}")
+                plan.remove(entry)
+            except Exception as e:
+                logging.error(f"원본 파일 이동 실패 ({source_file}): {e}")
+            tracker.advance()
     
     logging.info("--- 원본 파일 이동 완료 ---")
 
-def move_reports_to_archive():
-    """작업폴더의 리포트 파일들을 리포트보관함으로 이동합니다."""
+    # 설정이 'zip'이면 이번에 옮긴 원본만 월별 zip으로 압축 보관 (기존 개별 파일 전환은 pack-sources 명령)
+    source_archive.pack_archive(archived)
+
+def move_reports_to_archive(plan=None):
+    """작업폴더의 리포트 파일들을 리포트보관함으로 이동합니다. (plan: 최종 정리의 작업폴더 스냅샷)"""
     processing_dir = config.get_processing_dir()
     report_archive_dir = config.get_report_archive_dir()
     
     if not os.path.exists(processing_dir):
         return
     
-    # 리포트 파일들 찾기 (통합_리포트로 시작하는 파일들)
-    report_files = [f for f in os.listdir(processing_dir) 
-                   if f.endswith('.xlsx') and '통합_리포트' in f and not f.startswith('~')]
+    # 리포트 파일들 찾기 (통합_리포트가 들어간 모든 출력 형식의 파일들)
+    plan = plan or finalize_plan.FinalizePlan.scan(processing_dir)
+    report_entries = plan.reports
     
-    if not report_files:
+    if not report_entries:
         return
     
-    logging.info(f"--- 리포트 파일들을 리포트보관함으로 이동 시작 ({len(report_files)}개 파일) ---")
-    
-    for report_file in report_files:
-        try:
-            src_path = os.path.join(processing_dir, report_file)
-            dst_path = os.path.join(report_archive_dir, report_file)
-            
-            # 이미 같은 이름의 파일이 존재하는 경우에만 백업 (과도한 백업 방지)
-            if os.path.exists(dst_path):
-                # 파일 크기나 수정 시간이 다른 경우에만 백업
-                src_stat = os.path.getsize(src_path)
-                dst_stat = os.path.getsize(dst_path)
-                
-                if src_stat != dst_stat:  # 크기가 다르면 새로운 데이터
+    logging.info(f"--- 리포트 파일들을 리포트보관함으로 이동 시작 ({len(report_entries)}개 파일) ---")
+    report_files = {entry.name for entry in report_entries}
+    report_names = sorted({os.path.basename(entry.report_path) for entry in report_entries})
+    index = report_index.ReportIndex(report_archive_dir)
+
+    # 새로 옮기는 리포트에 없는 형식의 보관 파일은 이전 데이터이므로 삭제
+    # (예: 엑셀을 미루는 모드에서 parquet만 다시 만든 경우 예전에 내보낸 엑셀)
+    for report_name in report_names:
+        for stale_path in plan.existing_report_paths(report_archive_dir, report_name):
+            stale_name = os.path.basename(stale_path)
+            if stale_name not in report_files:
+                try:
+                    os.remove(stale_path)
+                    content_manifest.forget(stale_path)
+                    plan.removed(report_archive_dir, stale_name)
+                    logging.info(f"이전 형식 리포트 삭제: {stale_name}")
+                except OSError as e:
+                    logging.error(f"이전 형식 리포트 삭제 실패 ({stale_name}): {e}")
+    
+    with progress.stage('archive_reports', len(report_entries)) as tracker:
+        for entry in report_entries:
+            report_file = entry.name
+            try:
+                src_path = entry.path
+                dst_path = os.path.join(report_archive_dir, report_file)
+        
+                # 이미 같은 이름의 파일이 존재하는 경우에만 백업 (과도한 백업 방지)
+                if plan.exists(report_archive_dir, report_file):
+                    if content_manifest.same_content(src_path, dst_path):
+                        # 내용(SHA-256)이 같으면 이동/백업 없이 작업폴더 파일만 삭제
+                        os.remove(src_path)
+                        content_manifest.forget(src_path)
+                        plan.remove(entry)
+                        logging.info(f"동일한 리포트가 이미 보관되어 있어 이동 생략: {report_file}")
+                        tracker.advance()
+                        continue
+                    # 내용이 다르면 새로운 데이터 (크기가 같아도)
                     timestamp = datetime.datetime.now().strftime("_%Y%m%d_%H%M%S")
                     name, ext = os.path.splitext(report_file)
                     backup_name = f"{name}_backup{timestamp}{ext}"
                     backup_path = os.path.join(report_archive_dir, backup_name)
                     shutil.move(dst_path, backup_path)
+                    content_manifest.record_move(dst_path, backup_path)
+                    plan.added(report_archive_dir, backup_name)
+                    index.record_backup(backup_path)
                     logging.info(f"기존 리포트 백업: {backup_name}")
-                else:
-                    # 같은 크기면 덮어쓰기 (백업하지 않음)
-                    os.remove(dst_path)
-                    logging.info(f"동일한 리포트 덮어쓰기: {report_file}")
-            
-            shutil.move(src_path, dst_path)
-            logging.info(f"리포트 이동 완료: {report_file}")
-        except Exception as e:
-            logging.error(f"리포트 이동 실패 ({report_file}): {e}")
+        
+                shutil.move(src_path, dst_path)
+                content_manifest.record_move(src_path, dst_path)
+                plan.added(report_archive_dir, report_file)
+                plan.remove(entry)
+                logging.info(f"리포트 이동 완료: {report_file}")
+            except Exception as e:
+                logging.error(f"리포트 이동 실패 ({report_file}): {e}")
+            tracker.advance()
+
+    # 리포트 색인 갱신 (옮긴 리포트의 형식/해시/생성 시각)
+    for report_name in report_names:
+        index.record_archived(os.path.join(report_archive_dir, report_name))
+    index.save()
     
     logging.info("--- 리포트 파일 이동 완료 ---")
 
@@ -347,9 +617,7 @@ def start_monitoring():
     logging.info(f"- 감시 대상: {config.DOWNLOAD_DIR} (하위 폴더 포함)")
     logging.info("- 파일을 각 스토어 폴더에 넣으면 처리가 시작됩니다.")
     
-    event_handler = FileProcessorHandler()
-    observer = Observer()
-    observer.schedule(event_handler, config.DOWNLOAD_DIR, recursive=True)
+    observer = create_observer()
     observer.start()
 
     try:
@@ -361,6 +629,7 @@ def start_monitoring():
     finally:
         observer.stop()
         observer.join() # 스레드가 완전히 종료될 때까지 대기
+        shutdown_scheduler(cancel_pending=True)  # 실행 중인 작업은 마무리하고 대기 작업은 취소
         if os.path.exists(STOP_FLAG_FILE):
             os.remove(STOP_FLAG_FILE)
         logging.info("\n===== 모니터링이 정상적으로 종료되었습니다. =====")
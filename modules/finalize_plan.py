@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+최종 정리 계획 (작업폴더 스냅샷)
+
+finalize_all_processing이 작업폴더를 os.scandir로 한 번만 읽고, 파일을 종류별로 한 번 분류해
+전체 통합 리포트 생성 -> 원본 이동 -> 리포트 이동 단계에 그대로 넘깁니다.
+    source:       원본 파일 (상품성과/주문조회 등 통합_리포트가 아닌 .xlsx)
+    store_report: 스토어별 리포트 (출력 형식별 파일)
+    consolidated: 전체 통합 리포트 (1단계에서 만든 파일은 add_report로 추가)
+보관함 쪽 존재 확인도 폴더마다 한 번 읽은 이름 목록(names)으로 하고, 이동할 때마다 목록을 맞춥니다.
+네트워크 드라이브에서는 폴더 목록/파일 확인 한 번이 느리므로 단계마다 다시 읽지 않습니다.
+
+스냅샷 이후 작업폴더에 들어온 파일은 이번 정리에서 건드리지 않고 다음 정리 때 처리됩니다.
+"""
+import os
+import re
+import logging
+from . import report_output
+
+REPORT_NAME_PATTERN = re.compile(r'^(.+)_통합_리포트_(\d{4}-\d{2}-\d{2})\.(xlsx|parquet|csv)$', re.IGNORECASE)
+CONSOLIDATED_STORE = '전체'
+
+class FileEntry:
+    """작업폴더 파일 하나: 이름, 경로, 종류, 스토어, 날짜, 크기 (리포트는 스토어/날짜를 알 수 없으면 None)"""
+    __slots__ = ('name', 'path', 'kind', 'store', 'date', 'size')
+
+    def __init__(self, name, path, kind, store=None, date=None, size=0):
+        self.name = name
+        self.path = path
+        self.kind = kind
+        self.store = store
+        self.date = date
+        self.size = size
+
+    @property
+    def report_path(self):
+        """리포트 경로 (.xlsx 기준 - report_output 참고)"""
+        return report_output.as_report_path(self.path)
+
+def classify(name):
+    """파일명 -> (종류, 스토어, 날짜). 정리 대상이 아니면 None"""
+    if name.startswith('~'):
+        return None
+    if report_output.is_report_file(name):
+        match = REPORT_NAME_PATTERN.match(name)
+        store, date = (match.group(1), match.group(2)) if match else (None, None)
+        return ('consolidated' if name.startswith(f'{CONSOLIDATED_STORE}_') else 'store_report'), store, date
+    if name.endswith('.xlsx') and '통합_리포트' not in name:
+        return 'source', None, None
+    return None
+
+def _scan_names(directory):
+    """폴더의 파일 이름 집합 (폴더가 없으면 빈 집합)"""
+    try:
+        with os.scandir(directory) as it:
+            return {entry.name for entry in it}
+    except FileNotFoundError:
+        return set()
+
+class FinalizePlan:
+    """작업폴더 스냅샷과 종류별 분류 결과"""
+    def __init__(self, processing_dir):
+        self.processing_dir = processing_dir
+        self.entries = []     # 작업폴더의 정리 대상 파일 (FileEntry, 이름순)
+        self._names = {}      # 폴더 경로 -> 이름 집합 (보관함 존재 확인용)
+
+    @classmethod
+    def scan(cls, processing_dir):
+        """작업폴더를 한 번 읽어 계획을 만듦 (폴더가 없으면 빈 계획)"""
+        plan = cls(processing_dir)
+        try:
+            with os.scandir(processing_dir) as it:
+                dir_entries = sorted(it, key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return plan
+        for dir_entry in dir_entries:
+            classified = classify(dir_entry.name)
+            if classified is None:
+                continue
+            try:
+                if not dir_entry.is_file():
+                    continue
+                size = dir_entry.stat().st_size  # Windows는 scandir 결과에 포함되어 추가 조회 없음
+            except OSError as e:
+                logging.warning(f"작업폴더 파일 정보를 읽을 수 없습니다 ({dir_entry.name}): {e}")
+                continue
+            kind, store, date = classified
+            plan.entries.append(FileEntry(dir_entry.name, dir_entry.path, kind, store, date, size))
+        return plan
+
+    # --- 분류 결과 ---
+    def of_kind(self, *kinds):
+        return [entry for entry in self.entries if entry.kind in kinds]
+
+    @property
+    def sources(self):
+        return self.of_kind('source')
+
+    @property
+    def reports(self):
+        """모든 리포트 파일 (스토어별 + 전체 통합, 형식별 파일 각각)"""
+        return self.of_kind('store_report', 'consolidated')
+
+    def store_reports_by_date(self):
+        """날짜 -> 그 날짜 스토어별 리포트 경로(.xlsx 기준) 목록과 형식별 파일 크기 합계"""
+        by_date = {}
+        for entry in self.of_kind('store_report'):
+            if entry.date is None:
+                continue
+            report_paths, size = by_date.get(entry.date, ([], 0))
+            if entry.report_path not in report_paths:
+                report_paths.append(entry.report_path)
+            by_date[entry.date] = (report_paths, size + entry.size)
+        return {date: (sorted(paths), size) for date, (paths, size) in sorted(by_date.items())}
+
+    def is_empty(self):
+        return not self.entries
+
+    def add_report(self, report_path):
+        """정리 중에 새로 만든 리포트(전체 통합 리포트)의 형식별 파일을 계획에 추가"""
+        for path in report_output.report_paths(report_path).values():
+            name = os.path.basename(path)
+            classified = classify(name)
+            if classified is None or any(entry.name == name for entry in self.entries):
+                continue
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            kind, store, date = classified
+            self.entries.append(FileEntry(name, path, kind, store, date, size))
+
+    def remove(self, entry):
+        """이동/삭제한 파일을 계획에서 뺌"""
+        if entry in self.entries:
+            self.entries.remove(entry)
+
+    # --- 보관함 이름 목록 ---
+    def names(self, directory):
+        """폴더의 이름 집합 (정리 중 처음 요청할 때 한 번만 읽음)"""
+        if directory not in self._names:
+            self._names[directory] = _scan_names(directory)
+        return self._names[directory]
+
+    def exists(self, directory, name):
+        return name in self.names(directory)
+
+    def existing_report_paths(self, directory, report_name):
+        """폴더에 있는 리포트(.xlsx 이름 기준)의 형식별 파일 경로 (report_output.existing_report_paths와 같음)"""
+        names = self.names(directory)
+        return [path for path in report_output.report_paths(os.path.join(directory, report_name)).values()
+                if os.path.basename(path) in names]
+
+    def added(self, directory, name):
+        self.names(directory).add(name)
+
+    def removed(self, directory, name):
+        self.names(directory).discard(name)
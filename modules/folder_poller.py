@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+폴링 방식 폴더 감시 (네트워크 드라이브용)
+
+SMB 공유 폴더 등에서는 watchdog의 운영체제 이벤트가 누락될 수 있어, 다운로드 폴더의 스토어 폴더를
+config.WATCH_POLL_INTERVAL초마다 os.scandir로 훑고 스토어 폴더별 stat 캐시(inode, 크기, 수정 시각)와 비교합니다.
+    - 새 파일이나 바뀐 파일은 두 번 연속 같은 stat으로 보일 때(다운로드가 끝났을 때) 한 번만 처리 함수로 넘김
+    - 파일 내용은 읽지 않고 폴더 목록만 읽으므로 전체 재스캔(process_existing_files)보다 훨씬 가벼움
+    - 관리 폴더(작업폴더/보관함)는 훑지 않음 (watchdog PollingObserver는 하위 폴더 전체를 stat함)
+    - 폴더를 읽지 못하면(네트워크 끊김) 캐시를 유지한 채 다음 주기에 다시 시도
+
+watchdog Observer와 같은 start/stop/join으로 사용합니다.
+"""
+import os
+import logging
+import threading
+
+WATCH_MODES = ('auto', 'native', 'polling')
+NETWORK_FILESYSTEMS = ('cifs', 'smb3', 'smbfs', 'nfs', 'nfs4', 'fuse.sshfs', '9p')
+
+def _stat_key(entry):
+    """
+    디렉터리 항목의 (inode, 크기, 수정 시각 ns)
+    scandir 결과에 포함된 값만 사용 (POSIX는 inode, Windows는 stat이 추가 조회 없음 - Windows의 inode는 0으로 둠)
+    """
+    stat = entry.stat()
+    inode = entry.inode() if os.name != 'nt' else 0
+    return inode, stat.st_size, stat.st_mtime_ns
+
+def is_network_path(path):
+    """다운로드 폴더가 네트워크 드라이브(UNC 경로, 네트워크 드라이브 문자, cifs/nfs 마운트)에 있는지"""
+    path = os.path.abspath(path)
+    if os.name == 'nt':
+        if path.startswith('\\\\'):
+            return True
+        try:
+            import ctypes
+            DRIVE_REMOTE = 4
+            return ctypes.windll.kernel32.GetDriveTypeW(os.path.splitdrive(path)[0] + '\\') == DRIVE_REMOTE
+        except (AttributeError, OSError):
+            return False
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8') as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return False
+    # 경로를 포함하는 가장 긴 마운트 지점의 파일 시스템 종류
+    best, fstype = '', ''
+    for mount_point, mount_fstype in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) and len(mount_point) > len(best):
+            best, fstype = mount_point, mount_fstype
+    return fstype in NETWORK_FILESYSTEMS
+
+def resolve_watch_mode(mode, path):
+    """설정값(auto/native/polling) -> 실제 감시 방식 ('native' 또는 'polling')"""
+    if mode not in WATCH_MODES:
+        logging.warning(f"알 수 없는 WATCH_MODE 값 '{mode}' - 'native'로 처리합니다.")
+        return 'native'
+    if mode == 'auto':
+        return 'polling' if is_network_path(path) else 'native'
+    return mode
+
+class StoreFolderCache:
+    """스토어 폴더 하나의 stat 캐시"""
+    __slots__ = ('files', 'reported')
+
+    def __init__(self):
+        self.files = {}     # 파일명 -> 직전 주기의 stat
+        self.reported = {}  # 파일명 -> 처리 함수로 넘길 때의 stat (같은 상태로 다시 넘기지 않음)
+
+    def update(self, current, prime=False):
+        """
+        이번 주기의 {파일명: stat}으로 캐시를 갱신하고 처리할 파일명 목록을 반환
+        직전 주기와 stat이 같고(쓰기가 끝남) 아직 그 상태로 넘기지 않은 파일만 처리 대상
+        prime이면 지금 있는 파일을 모두 이미 넘긴 것으로 기록 (시작 시 기존 파일 스캔이 처리한 뒤)
+        """
+        ready = []
+        for name, key in current.items():
+            if prime:
+                self.reported[name] = key
+            elif self.files.get(name) == key and self.reported.get(name) != key:
+                self.reported[name] = key
+                ready.append(name)
+        self.files = current
+        self.reported = {name: key for name, key in self.reported.items() if name in current}
+        return sorted(ready)
+
+class PollingWatcher:
+    """다운로드 폴더의 스토어 폴더를 주기적으로 비교해 새/변경 파일을 callback(경로)으로 넘기는 감시 스레드"""
+    def __init__(self, root, callback, interval, excluded=()):
+        self.root = root
+        self.callback = callback
+        self.interval = max(0.5, float(interval))
+        self.excluded = set(excluded)
+        self.caches = {}  # 스토어 폴더 이름 -> StoreFolderCache
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='folder-poller', daemon=True)
+        self._unreachable = False
+
+    @staticmethod
+    def is_candidate(name):
+        return name.endswith('.xlsx') and not name.startswith('~')
+
+    def _scan_store(self, path):
+        current = {}
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if not self.is_candidate(entry.name):
+                    continue
+                try:
+                    if entry.is_file():
+                        current[entry.name] = _stat_key(entry)
+                except OSError:
+                    continue  # 훑는 사이에 옮겨진 파일
+        return current
+
+    def poll(self, prime=False):
+        """한 주기: 스토어 폴더를 훑어 처리할 파일 경로 목록을 반환 (폴더를 읽지 못하면 빈 목록)"""
+        try:
+            with os.scandir(self.root) as entries:
+                stores = [(entry.name, entry.path) for entry in entries
+                          if entry.name not in self.excluded and entry.is_dir()]
+        except OSError as e:
+            if not self._unreachable:
+                logging.warning(f"[폴링 감시] 다운로드 폴더를 읽을 수 없습니다 (다음 주기에 다시 시도): {e}")
+                self._unreachable = True
+            return []
+        if self._unreachable:
+            logging.info("[폴링 감시] 다운로드 폴더에 다시 연결되었습니다.")
+            self._unreachable = False
+
+        ready = []
+        present = set()
+        for store, path in sorted(stores):
+            present.add(store)
+            try:
+                current = self._scan_store(path)
+            except OSError as e:
+                logging.warning(f"[폴링 감시] '{store}' 폴더를 읽을 수 없습니다: {e}")
+                continue
+            # 감시 중에 새로 만든 스토어 폴더는 처음부터 새 파일로 취급 (prime은 시작 시점 폴더에만)
+            cache = self.caches.setdefault(store, StoreFolderCache())
+            ready.extend(os.path.join(path, name) for name in cache.update(current, prime))
+        for store in [store for store in self.caches if store not in present]:
+            del self.caches[store]
+        return ready
+
+    def _run(self):
+        self.poll(prime=True)
+        while not self._stop_event.wait(self.interval):
+            for path in self.poll():
+                if self._stop_event.is_set():
+                    return
+                logging.info(f"[폴링 감시] 새 파일 감지: {path}")
+                try:
+                    self.callback(path)
+                except Exception as e:
+                    logging.error(f"[폴링 감시] 파일 처리 중 오류 ({path}): {e}")
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
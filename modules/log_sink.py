@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import os
+import logging
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from . import config
+
+LOG_FORMAT = '%(asctime)s - %(message)s'
+FILE_LOG_FORMAT = '%(asctime)s - %(levelname)s - %(threadName)s - %(message)s'
+
+class LogRingBuffer:
+    """여러 스레드가 로그 줄을 쌓고 GUI 타이머가 한 번에 가져가는 고정 크기 버퍼 (스레드 안전)"""
+    def __init__(self, capacity):
+        self._lines = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def append(self, line):
+        with self._lock:
+            if len(self._lines) == self._lines.maxlen:
+                self._dropped += 1  # 가장 오래된 줄이 밀려남
+            self._lines.append(line)
+
+    def drain(self):
+        """쌓인 줄을 모두 꺼내고 (줄 목록, 버려진 줄 수)를 반환"""
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            dropped, self._dropped = self._dropped, 0
+        return lines, dropped
+
+class RingBufferHandler(logging.Handler):
+    """로그 레코드를 포맷하여 LogRingBuffer에 넣는 핸들러 (GUI 스레드와 직접 통신하지 않음)"""
+    def __init__(self, buffer):
+        super().__init__()
+        self.buffer = buffer
+
+    def emit(self, record):
+        try:
+            self.buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+def setup_file_logging():
+    """logs 폴더에 회전 로그 파일 핸들러를 루트 로거에 등록 (이미 등록되어 있으면 기존 핸들러 반환)"""
+    root = logging.getLogger()
+    for handler in root.handlers:
+        if isinstance(handler, RotatingFileHandler):
+            return handler
+
+    try:
+        os.makedirs(config.LOG_DIR, exist_ok=True)
+        handler = RotatingFileHandler(
+            os.path.join(config.LOG_DIR, 'app.log'),
+            maxBytes=config.LOG_FILE_MAX_BYTES,
+            backupCount=config.LOG_FILE_BACKUP_COUNT,
+            encoding='utf-8'
+        )
+    except OSError as e:
+        logging.warning(f"로그 파일을 열 수 없습니다: {e}")
+        return None
+
+    handler.setFormatter(logging.Formatter(FILE_LOG_FORMAT))
+    root.addHandler(handler)
+    return handler
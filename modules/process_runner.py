@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+파이프라인 하위 프로세스 실행
+
+GUI 프로세스의 스레드에서 pandas/openpyxl 작업을 돌리면 GIL 경쟁으로 화면이 멈추고,
+스레드는 안전하게 강제 종료할 수 없습니다. 자동화/작업폴더 처리/보관 리포트 재생성을
+별도 프로세스에서 실행하고 로그는 큐로 받아 GUI 프로세스의 로거로 다시 보냅니다.
+중지는 stop.flag로 정상 종료를 요청한 뒤, 응답이 없으면 프로세스를 종료(terminate)합니다.
+
+큐 메시지: ('log', LogRecord) / ('progress', 진행 이벤트 - progress 모듈 참고) / ('exit', 성공 여부)
+"""
+import os
+import queue
+import logging
+import logging.handlers
+import threading
+import multiprocessing
+import multiprocessing.connection
+import contextlib
+from . import config
+from . import progress
+
+def _run_monitor():
+    from . import file_handler
+    file_handler.start_monitoring()
+
+def _run_manual():
+    from . import file_handler
+    # 작업폴더 초기화 -> 미완료 파일들 처리 -> 최종 정리 (전체 통합 리포트 생성 및 파일 이동) -> 예약된 엑셀 내보내기
+    file_handler.initialize_folders()
+    file_handler.process_incomplete_files()
+    file_handler.request_finalize()
+    file_handler.wait_for_jobs()
+
+def _run_backfill(start_date, end_date):
+    from . import backfill
+    backfill.run_backfill(start_date, end_date)
+
+def _run_export():
+    from . import report_generator
+    from .file_handler import STOP_FLAG_FILE
+    report_generator.export_store_reports(stop_requested=lambda: os.path.exists(STOP_FLAG_FILE))
+
+# 작업 이름 -> (실행 함수, 오류 로그 문구)
+TASKS = {
+    'monitor': (_run_monitor, "자동화 프로세스 실행 중 오류 발생"),
+    'manual': (_run_manual, "수동 처리 중 오류 발생"),
+    'backfill': (_run_backfill, "보관 리포트 재생성 중 오류 발생"),
+    'export': (_run_export, "리포트 엑셀 내보내기 중 오류 발생"),
+}
+
+# 이 프로세스가 파이프라인 하위 프로세스이면 GUI 프로세스로 로그를 보내는 큐 (_child_main에서 설정)
+_log_queue = None
+
+class _QueueLogHandler(logging.handlers.QueueHandler):
+    """로그 레코드를 ('log', record) 메시지로 큐에 넣는 핸들러"""
+    def enqueue(self, record):
+        self.queue.put_nowait(('log', record))
+
+class _LogMessageListener(logging.handlers.QueueListener):
+    """('log', record) 메시지를 받아 현재 프로세스의 루트 로거로 전달 (CLI에서 워커 프로세스 로그 수신)"""
+    def prepare(self, message):
+        return message[1]
+
+class _RootLoggerForwarder:
+    def handle(self, record):
+        logging.getLogger().handle(record)
+
+def install_queue_logging(message_queue, level):
+    """루트 로거의 핸들러를 모두 빼고 로그를 ('log', record) 메시지로 message_queue에 보내도록 설정"""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_QueueLogHandler(message_queue))
+    root.setLevel(level)
+
+@contextlib.contextmanager
+def worker_log_queue():
+    """
+    프로세스 풀 워커가 로그를 보낼 큐 (install_queue_logging에 전달)
+    파이프라인 하위 프로세스 안이면 GUI 프로세스로 가는 큐를 그대로 쓰고, 그 외(CLI)에는 Manager 큐로 받아
+    현재 프로세스의 루트 로거(콘솔/로그 파일)로 전달합니다.
+    """
+    if _log_queue is not None:
+        yield _log_queue
+        return
+    with multiprocessing.Manager() as manager:
+        message_queue = manager.Queue()
+        listener = _LogMessageListener(message_queue, _RootLoggerForwarder())
+        listener.start()
+        try:
+            yield message_queue
+        finally:
+            listener.stop()
+
+def _exit_with_parent():
+    """GUI 프로세스가 비정상 종료되면 하위 프로세스도 함께 종료 (감시 루프가 남지 않도록)"""
+    parent = multiprocessing.parent_process()
+    if parent is None:
+        return
+
+    def wait_parent():
+        multiprocessing.connection.wait([parent.sentinel])
+        os._exit(1)
+
+    threading.Thread(target=wait_parent, name='parent-watch', daemon=True).start()
+
+def _child_main(task, args, config_values, message_queue):
+    """하위 프로세스 진입점: 설정 적용 -> 로그를 큐로 연결 -> 작업 실행 -> 종료 메시지"""
+    global _log_queue
+    config.apply_snapshot(config_values)
+
+    install_queue_logging(message_queue, logging.DEBUG if config.diagnostics_enabled('debug') else logging.INFO)
+    _log_queue = message_queue
+    progress.add_sink(lambda event: message_queue.put_nowait(('progress', event)))
+    _exit_with_parent()
+
+    func, error_message = TASKS[task]
+    ok = False
+    try:
+        func(*args)
+        ok = True
+    except Exception as e:
+        logging.error(f"{error_message}: {e}")
+    finally:
+        message_queue.put(('exit', ok))
+        message_queue.close()
+        message_queue.join_thread()
+
+class PipelineProcess:
+    """
+    TASKS의 작업 하나를 하위 프로세스로 실행하고 큐 메시지를 전달받는 핸들
+    GUI 스레드에서 drain()을 주기적으로 호출하면 하위 프로세스의 로그가 현재 프로세스의 로거로 전달됩니다.
+    """
+    def __init__(self, task, args=(), config_overrides=None):
+        if task not in TASKS:
+            raise ValueError(f"알 수 없는 작업입니다: {task}")
+        self.task = task
+        self.args = tuple(args)
+        self.config_overrides = dict(config_overrides or {})
+        self.process = None
+        self.queue = None
+        self.exit_ok = None  # 하위 프로세스가 보낸 성공 여부 (강제 종료되면 None으로 남음)
+
+    def start(self):
+        # Windows/PyInstaller와 같은 방식으로 동작하도록 항상 spawn 사용 (GUI 스레드 상태를 fork하지 않음)
+        context = multiprocessing.get_context('spawn')
+        config_values = config.snapshot()
+        config_values.update(self.config_overrides)
+        self.queue = context.Queue()
+        self.process = context.Process(
+            target=_child_main, args=(self.task, self.args, config_values, self.queue),
+            name=f'pipeline-{self.task}'
+        )
+        self.process.start()
+
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def drain(self, max_messages=None):
+        """
+        큐에 쌓인 메시지를 가져와 로그는 현재 프로세스의 로거로 보내고, 그 외 메시지 목록을 반환
+        max_messages만큼 처리하면 나머지는 다음 호출로 미룹니다 (GUI 이벤트 루프를 오래 잡지 않도록).
+        """
+        if self.queue is None:
+            return []
+        messages = []
+        handled = 0
+        while max_messages is None or handled < max_messages:
+            try:
+                message = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            except (EOFError, OSError, ValueError):
+                break  # 강제 종료로 큐가 끊긴 경우
+            handled += 1
+            kind = message[0]
+            if kind == 'log':
+                logging.getLogger().handle(message[1])
+            else:
+                if kind == 'exit':
+                    self.exit_ok = message[1]
+                messages.append(message)
+        return messages
+
+    def has_finished(self):
+        """하위 프로세스가 끝났고 남은 메시지도 모두 받았는지"""
+        if self.process is None or self.process.is_alive():
+            return False
+        if self.exit_ok is None:
+            self.drain()  # 종료 직전에 보낸 메시지가 남아 있을 수 있음
+        return True
+
+    def wait(self, timeout=None):
+        """메시지를 받으면서 하위 프로세스 종료를 최대 timeout초 기다림. 종료되었으면 True"""
+        if self.process is None:
+            return True
+        interval = 0.05
+        remaining = timeout
+        while self.process.is_alive():
+            self.drain()
+            if remaining is not None:
+                if remaining <= 0:
+                    return False
+                remaining -= interval
+            self.process.join(interval)
+        self.drain()
+        return True
+
+    def terminate(self):
+        """정상 종료 요청에 응답하지 않는 하위 프로세스를 강제 종료"""
+        if self.is_alive():
+            logging.warning(f"[{self.task}] 하위 프로세스가 응답하지 않아 강제 종료합니다.")
+            self.process.terminate()
+            self.process.join(1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join(1)
+
+    def close(self):
+        """종료된 프로세스와 큐 자원 정리"""
+        if self.queue is not None:
+            self.queue.close()
+            self.queue.cancel_join_thread()
+            self.queue = None
+        if self.process is not None and not self.process.is_alive():
+            self.process.close()
+            self.process = None
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+파이프라인 진행 이벤트
+
+각 처리 단계가 stage()로 진행 상황을 알리면 등록된 수신자(GUI 진행 표시줄, CLI JSON lines 등)에
+이벤트 딕셔너리를 전달합니다. 수신자가 없으면 아무 일도 하지 않습니다.
+
+이벤트 형식:
+    {'type': 'progress', 'stage': 'reports', 'label': '개별 리포트 생성',
+     'store': '스토어A', 'date': '2025-08-26', 'done': 3, 'total': 7,
+     'rows': 120000, 'bytes': 52428800, 'elapsed': 12.4, 'eta': 16.5, 'finished': False}
+
+남은 시간(eta, 초)은 단계별 과거 단위 처리 시간(config.PROGRESS_HISTORY_FILE)과
+이번 실행의 평균을 함께 사용해 추정합니다. 추정할 근거가 없으면 None입니다.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from . import config
+
+STAGE_LABELS = {
+    'scan': '다운로드 폴더 스캔',
+    'reports': '개별 리포트 생성',
+    'consolidate': '전체 통합 리포트 생성',
+    'archive_sources': '원본 파일 보관',
+    'archive_reports': '리포트 파일 보관',
+    'pack_sources': '원본 압축 보관',
+    'backfill': '보관 리포트 재생성',
+    'export': '리포트 엑셀 내보내기',
+}
+
+# 과거 기록을 이번 실행 평균보다 얼마나 믿을지 (처리한 단위 수가 이 값보다 많아지면 이번 실행 평균 위주)
+HISTORY_WEIGHT = 2
+# 단계 종료 시 과거 기록 갱신 비율 (지수 이동 평균)
+HISTORY_SMOOTHING = 0.3
+
+_sinks = []
+_local = threading.local()
+_history_lock = threading.Lock()
+
+def add_sink(sink):
+    """이벤트 수신자(event 딕셔너리를 받는 함수) 등록"""
+    if sink not in _sinks:
+        _sinks.append(sink)
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+def _emit(event):
+    for sink in list(_sinks):
+        try:
+            sink(event)
+        except Exception as e:
+            logging.debug(f"[progress] 이벤트 전달 실패: {e}")
+
+def _load_history():
+    try:
+        with open(config.PROGRESS_HISTORY_FILE, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+        return history if isinstance(history, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_history(history):
+    path = config.PROGRESS_HISTORY_FILE
+    temp_path = path + '.tmp'
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(history, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logging.debug(f"[progress] 처리 시간 기록 저장 실패: {e}")
+
+def _record_stage_time(stage, seconds_per_unit):
+    """단계의 단위(파일/날짜)당 처리 시간을 과거 기록에 반영"""
+    with _history_lock:
+        history = _load_history()
+        previous = history.get(stage)
+        if isinstance(previous, (int, float)) and previous > 0:
+            seconds_per_unit = previous + HISTORY_SMOOTHING * (seconds_per_unit - previous)
+        history[stage] = round(seconds_per_unit, 4)
+        _save_history(history)
+
+class StageProgress:
+    """한 단계의 진행 상황 (stage()가 만들어 돌려줌)"""
+    def __init__(self, stage, total):
+        self.stage = stage
+        self.total = total
+        self.done = 0
+        self.rows = 0
+        self.bytes_read = 0
+        self.store = None
+        self.date = None
+        self.started = time.monotonic()
+        history = _load_history().get(stage) if _sinks else None
+        self.historical_per_unit = history if isinstance(history, (int, float)) and history > 0 else None
+
+    def eta(self):
+        """남은 시간 추정 (초)"""
+        remaining = max(self.total - self.done, 0)
+        if remaining == 0:
+            return 0.0
+        elapsed = time.monotonic() - self.started
+        if self.done and self.historical_per_unit:
+            per_unit = (elapsed + self.historical_per_unit * HISTORY_WEIGHT) / (self.done + HISTORY_WEIGHT)
+        elif self.done:
+            per_unit = elapsed / self.done
+        elif self.historical_per_unit:
+            per_unit = self.historical_per_unit
+        else:
+            return None
+        return round(per_unit * remaining, 1)
+
+    def event(self, finished=False):
+        return {
+            'type': 'progress', 'stage': self.stage, 'label': STAGE_LABELS.get(self.stage, self.stage),
+            'store': self.store, 'date': self.date, 'done': self.done, 'total': self.total,
+            'rows': self.rows, 'bytes': self.bytes_read,
+            'elapsed': round(time.monotonic() - self.started, 1),
+            'eta': 0.0 if finished else self.eta(), 'finished': finished,
+        }
+
+    def begin_item(self, store=None, date=None):
+        """처리를 시작한 항목 표시 (done은 그대로)"""
+        self.store, self.date = store, date
+        if _sinks:
+            _emit(self.event())
+
+    def advance(self, store=None, date=None, bytes_read=0, count=1):
+        """항목 처리 완료"""
+        self.done += count
+        self.bytes_read += bytes_read
+        if store is not None or date is not None:
+            self.store, self.date = store, date
+        if _sinks:
+            _emit(self.event())
+
+    def add_rows(self, count):
+        self.rows += count
+
+    def finish(self):
+        elapsed = time.monotonic() - self.started
+        if self.done and _sinks:
+            _record_stage_time(self.stage, elapsed / self.done)
+        if _sinks:
+            _emit(self.event(finished=True))
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+@contextmanager
+def stage(name, total):
+    """
+    단계 진행 추적: with progress.stage('reports', len(files)) as tracker: ... tracker.advance(...)
+    단계 안에서 호출한 add_rows()는 가장 안쪽의 진행 중인 단계에 더해집니다.
+    """
+    tracker = StageProgress(name, total)
+    stack = _stack()
+    stack.append(tracker)
+    if _sinks:
+        _emit(tracker.event())
+    try:
+        yield tracker
+    finally:
+        stack.remove(tracker)
+        tracker.finish()
+
+def add_rows(count):
+    """현재 진행 중인 단계에 처리한 행 수 추가 (진행 중인 단계가 없으면 무시)"""
+    stack = _stack()
+    if stack:
+        stack[-1].add_rows(count)
+
+def format_event(event):
+    """진행 이벤트를 한 줄 문자열로 (예: '개별 리포트 생성 3/7 - 스토어A 2025-08-26 (12,000행, 5.2MB), 남은 시간 약 16초')"""
+    text = f"{event['label']} {event['done']}/{event['total']}"
+    target = ' '.join(str(part) for part in (event.get('store'), event.get('date')) if part)
+    if target:
+        text += f" - {target}"
+    amounts = []
+    if event.get('rows'):
+        amounts.append(f"{event['rows']:,}행")
+    if event.get('bytes'):
+        amounts.append(f"{event['bytes'] / (1024 * 1024):.1f}MB")
+    if amounts:
+        text += f" ({', '.join(amounts)})"
+    eta = event.get('eta')
+    if not event.get('finished') and eta:
+        minutes, seconds = divmod(int(round(eta)), 60)
+        text += f", 남은 시간 약 {minutes}분 {seconds}초" if minutes else f", 남은 시간 약 {seconds}초"
+    return text
@@ -2,34 +2,97 @@
 import pandas as pd
 import numpy as np
 import os
-import glob
 import re
 import logging
 import io
 import json
-from datetime import datetime
+import contextlib
 from . import config
+from . import settings_store
+from . import progress
+from . import xlsx_writer
+from . import report_output
 
 def normalize_product_id(value):
     """상품ID를 정규화 - 문자열과 숫자 타입 모두 처리 (문자열 내 .0 포함)"""
     if pd.isna(value):
         return ''
-    
-    # 먼저 문자열로 변환하고 공백 제거
+    return settings_store.normalize_product_id(value)
+
+def build_category_dtype(*value_groups):
+    """여러 값 목록을 합쳐 정렬된 공유 카테고리 사전(CategoricalDtype)을 생성"""
+    values = pd.unique(np.concatenate([np.asarray(v, dtype=object) for v in value_groups]))
+    categories = pd.Index(values).dropna()
+    try:
+        # 카테고리를 정렬해 두어야 groupby/sort_values 결과가 문자열 정렬 순서와 같아짐
+        categories = categories.sort_values()
+    except TypeError:
+        pass  # 문자열/숫자가 섞여 정렬할 수 없는 경우 등장 순서 유지
+    return pd.CategoricalDtype(categories=categories)
+
+def compact_frame(df, category_dtypes=None):
+    """집계 키 컬럼은 category로, 정수 컬럼은 가장 작은 정수 타입으로 변환"""
+    if not config.COMPACT_DTYPES:
+        return df
+
+    category_dtypes = category_dtypes or {}
+    for col in config.CATEGORICAL_COLUMNS:
+        if col not in df.columns:
+            continue
+        if col in category_dtypes:
+            # 병합할 프레임끼리 같은 카테고리 사전을 공유해야 병합 후에도 category가 유지됨
+            df[col] = df[col].astype(category_dtypes[col])
+        elif not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+def normalize_option_info(value):
+    """옵션정보 정규화 - '단일', '기본옵션', '선택안함' 등을 빈 문자열로 통일"""
+    if pd.isna(value) or value == '' or str(value).strip() == '':
+        return ''
     value_str = str(value).strip()
+    if value_str.lower() in ['단일', '기본옵션', '선택안함', 'null', 'none', '없음']:
+        return ''
+    return value_str
 
+def decrypt_excel(file_path, password):
+    """암호로 보호된 Excel 파일(경로 또는 미리 읽은 BytesIO)을 메모리에서 해독하여 BytesIO로 반환 (msoffcrypto-tool 필요)"""
     try:
-        # 문자열을 float으로 변환 시도 (예: "12345.0" 처리)
-        float_val = float(value_str)
-        # float이 정수이면 .0을 제거하고 문자열로 변환
-        if float_val.is_integer():
-            return str(int(float_val))
-        # 소수점이 있는 float이면 그대로 문자열로 변환
+        import msoffcrypto
+        
+        if hasattr(file_path, 'read'):
+            file_path.seek(0)
+            file_context = contextlib.nullcontext(file_path)
         else:
-            return str(float_val)
-    except (ValueError, TypeError):
-        # float 변환에 실패하면 (순수 문자열 ID), 원본 문자열 반환
-        return value_str
+            file_context = open(file_path, 'rb')
+        with file_context as file:
+            office_file = msoffcrypto.OfficeFile(file)
+            office_file.load_key(password=password)
+            
+            # 메모리에서 해독된 파일 처리 (최신 버전 호환)
+            decrypted = io.BytesIO()
+            try:
+                # 최신 버전: decrypt 메서드 사용
+                office_file.decrypt(decrypted)
+            except AttributeError:
+                # 이전 버전: save 메서드 사용
+                office_file.save(decrypted)
+            
+        decrypted.seek(0)
+        return decrypted
+            
+    except ImportError:
+        logging.error("msoffcrypto-tool이 설치되지 않았습니다.")
+        logging.error("해결 방법: pip install msoffcrypto-tool")
+        logging.error("또는 Excel에서 파일을 열어 암호를 제거한 후 저장하세요.")
+        raise ImportError("msoffcrypto-tool 라이브러리가 필요합니다. 'pip install msoffcrypto-tool'로 설치하세요.")
+    except Exception as decrypt_error:
+        logging.error(f"암호 해독 실패: {decrypt_error}")
+        logging.error("암호가 올바른지 확인하거나 Excel에서 수동으로 암호를 제거해보세요.")
+        raise decrypt_error
 
 def read_protected_excel(file_path, password=None, **kwargs):
     """
@@ -44,189 +107,341 @@ def read_protected_excel(file_path, password=None, **kwargs):
             logging.error(f"암호 보호된 파일이지만 암호가 제공되지 않았습니다: {file_path}")
             raise e
         
-        # msoffcrypto-tool 사용 시도
-        try:
-            import msoffcrypto
-            
-            with open(file_path, 'rb') as file:
-                office_file = msoffcrypto.OfficeFile(file)
-                office_file.load_key(password=password)
-                
-                # 메모리에서 해독된 파일 처리 (최신 버전 호환)
-                decrypted = io.BytesIO()
-                try:
-                    # 최신 버전: decrypt 메서드 사용
-                    office_file.decrypt(decrypted)
-                except AttributeError:
-                    # 이전 버전: save 메서드 사용
-                    office_file.save(decrypted)
-                
-                decrypted.seek(0)
-                return pd.read_excel(decrypted, engine='openpyxl', **kwargs)
-                
-        except ImportError:
-            logging.error("msoffcrypto-tool이 설치되지 않았습니다.")
-            logging.error("해결 방법: pip install msoffcrypto-tool")
-            logging.error("또는 Excel에서 파일을 열어 암호를 제거한 후 저장하세요.")
-            raise ImportError("msoffcrypto-tool 라이브러리가 필요합니다. 'pip install msoffcrypto-tool'로 설치하세요.")
-        except Exception as decrypt_error:
-            logging.error(f"암호 해독 실패: {decrypt_error}")
-            logging.error("암호가 올바른지 확인하거나 Excel에서 수동으로 암호를 제거해보세요.")
-            raise decrypt_error
+        return pd.read_excel(decrypt_excel(file_path, password), engine='openpyxl', **kwargs)
+
+def iter_protected_excel_rows(file_path, password=None):
+    """
+    Excel 파일 첫 시트의 행을 openpyxl read_only 모드로 하나씩 반환하는 제너레이터
+    암호로 보호된 파일은 메모리에서 해독한 바이트로 읽음 (첫 행은 헤더)
+    """
+    from openpyxl import load_workbook
 
-def get_reward_for_date_and_product(product_id, date_str):
-    """날짜와 상품ID에 해당하는 리워드 값 조회 (안전한 버전)"""
     try:
-        reward_file = os.path.join(config.BASE_DIR, '리워드설정.json')
-        
-        # 파일 존재 확인
-        if not os.path.exists(reward_file):
-            return 0
-        
-        # 파일 크기 확인 (빈 파일 체크)
-        if os.path.getsize(reward_file) == 0:
-            return 0
-        
-        # JSON 파일 읽기
-        with open(reward_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # 데이터 구조 검증
-        if not isinstance(data, dict) or 'rewards' not in data:
-            return 0
-        
-        rewards_list = data.get('rewards', [])
-        if not isinstance(rewards_list, list):
-            return 0
-        
-        # 날짜 파싱 (여러 형식 지원)
-        target_date = None
-        for date_format in ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y/%m/%d']:
-            try:
-                target_date = datetime.strptime(date_str, date_format).date()
-                break
-            except ValueError:
-                continue
-        
-        if target_date is None:
-            logging.warning(f"날짜 형식을 파싱할 수 없습니다: {date_str}")
-            return 0
-        
-        # 해당 상품과 날짜에 맞는 리워드 찾기
-        for reward_entry in rewards_list:
-            try:
-                # 필수 키 존재 확인
-                if not all(k in reward_entry for k in ['start_date', 'end_date', 'product_id', 'reward']):
-                    continue
-                
-                start_date = datetime.strptime(reward_entry['start_date'], '%Y-%m-%d').date()
-                end_date = datetime.strptime(reward_entry['end_date'], '%Y-%m-%d').date()
-                
-                # 상품ID 정규화하여 비교 (JSON의 .0도 제거)
-                normalized_entry_id = normalize_product_id(reward_entry['product_id'])
-                normalized_target_id = normalize_product_id(product_id)
-                
-                logging.debug(f"리워드 비교: JSON ID='{normalized_entry_id}' vs 타겟 ID='{normalized_target_id}'")
-                
-                if (start_date <= target_date <= end_date and 
-                    normalized_entry_id == normalized_target_id):
-                    reward_value = reward_entry['reward']
-                    # 리워드 값이 숫자인지 확인
-                    if isinstance(reward_value, (int, float)) and reward_value >= 0:
-                        return int(reward_value)
-            except (ValueError, KeyError, TypeError) as e:
-                # 개별 엔트리 파싱 실패는 로그만 남기고 계속 진행
-                continue
-        
-        return 0  # 설정이 없으면 0
-        
-    except FileNotFoundError:
-        return 0
-    except json.JSONDecodeError as e:
-        logging.warning(f"JSON 파일 형식 오류: {e}")
-        return 0
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
     except Exception as e:
-        logging.warning(f"리워드 조회 중 예상치 못한 오류: {e}")
-        return 0
+        if password is None:
+            logging.error(f"암호 보호된 파일이지만 암호가 제공되지 않았습니다: {file_path}")
+            raise e
+        workbook = load_workbook(decrypt_excel(file_path, password), read_only=True, data_only=True)
 
-def get_purchase_count_for_date_and_product(product_id, date_str):
-    """날짜와 상품ID에 해당하는 가구매 개수 조회 (리워드 방식과 동일)"""
     try:
-        purchase_file = os.path.join(config.BASE_DIR, '가구매설정.json')
-        
-        # 파일 존재 확인
-        if not os.path.exists(purchase_file):
-            return 0
-        
-        # 파일 크기 확인 (빈 파일 체크)
-        if os.path.getsize(purchase_file) == 0:
-            return 0
-        
-        # JSON 파일 읽기
-        with open(purchase_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # 데이터 구조 검증
-        if not isinstance(data, dict) or 'purchases' not in data:
-            return 0
-        
-        purchases_list = data.get('purchases', [])
-        if not isinstance(purchases_list, list):
-            return 0
-        
-        # 날짜 파싱 (여러 형식 지원)
-        target_date = None
-        for date_format in ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y/%m/%d']:
-            try:
-                target_date = datetime.strptime(date_str, date_format).date()
-                break
-            except ValueError:
-                continue
-        
-        if target_date is None:
-            logging.warning(f"가구매 개수 조회: 날짜 형식을 파싱할 수 없습니다: {date_str}")
-            return 0
-        
-        # 해당 상품과 날짜에 맞는 가구매 개수 찾기
-        for purchase_entry in purchases_list:
-            try:
-                # 필수 키 존재 확인
-                if not all(k in purchase_entry for k in ['start_date', 'end_date', 'product_id', 'purchase_count']):
-                    continue
-                
-                start_date = datetime.strptime(purchase_entry['start_date'], '%Y-%m-%d').date()
-                end_date = datetime.strptime(purchase_entry['end_date'], '%Y-%m-%d').date()
-                
-                # 상품ID 정규화하여 비교
-                normalized_entry_id = normalize_product_id(purchase_entry['product_id'])
-                normalized_target_id = normalize_product_id(product_id)
-                
-                if (start_date <= target_date <= end_date and 
-                    normalized_entry_id == normalized_target_id):
-                    purchase_count = purchase_entry['purchase_count']
-                    # 가구매 개수가 숫자인지 확인
-                    if isinstance(purchase_count, (int, float)) and purchase_count >= 0:
-                        return int(purchase_count)
-            except (ValueError, KeyError, TypeError) as e:
-                # 개별 엔트리 파싱 실패는 로그만 남기고 계속 진행
-                continue
-        
-        return 0  # 설정이 없으면 0
-        
-    except FileNotFoundError:
-        return 0
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+def load_rules_for_date(store, date_str, label):
+    """
+    날짜에 적용되는 모든 상품의 설정을 한 번에 조회 -> {정규화된 상품ID: 값}
+    저장소를 읽을 수 없으면 경고만 남기고 빈 사전 반환 (설정 없음 = 0)
+    """
+    try:
+        return store.rules_for_date(date_str)
     except json.JSONDecodeError as e:
-        logging.warning(f"가구매 설정 JSON 파일 형식 오류: {e}")
-        return 0
+        logging.warning(f"{label} JSON 파일 형식 오류: {e}")
+    except ValueError as e:
+        logging.warning(f"{label} 조회: {e}")
     except Exception as e:
-        logging.warning(f"가구매 개수 조회 중 예상치 못한 오류: {e}")
-        return 0
+        logging.warning(f"{label} 조회 중 예상치 못한 오류: {e}")
+    return {}
 
-def generate_individual_reports():
-    """개별 스토어의 주문조회 파일을 기반으로 옵션별 통합 리포트를 생성합니다."""
-    logging.info("--- 1단계: 주문조회 기반 개별 통합 리포트 생성 시작 ---")
-    
-    # 마진정보 파일 로드 및 검증
+def apply_rep_option_rules(normalized_ids, rep_option_mask, rules):
+    """정규화된 상품ID 시리즈에 날짜별 설정 사전을 매핑 - 대표옵션 행에만 적용하고 나머지는 0"""
+    values = normalized_ids.map(rules).fillna(0).astype('int64')
+    return values.where(rep_option_mask, 0)
+
+def get_reward_for_date_and_product(product_id, date_str):
+    """날짜와 상품ID에 해당하는 리워드 값 조회 (여러 상품을 조회할 때는 load_rules_for_date 사용)"""
+    rules = load_rules_for_date(settings_store.reward_store(), date_str, '리워드 설정')
+    return rules.get(normalize_product_id(product_id), 0)
+
+def get_purchase_count_for_date_and_product(product_id, date_str):
+    """날짜와 상품ID에 해당하는 가구매 개수 조회 (여러 상품을 조회할 때는 load_rules_for_date 사용)"""
+    rules = load_rules_for_date(settings_store.purchase_store(), date_str, '가구매 설정')
+    return rules.get(normalize_product_id(product_id), 0)
+
+def aggregate_order_options(order_df, group_cols, report_duplicates=False):
+    """
+    옵션별 수량/환불수량/결제수/환불건수를 한 번의 groupby로 집계하는 커널
+    추가 groupby나 병합 없이 모든 지표를 같은 그룹 키로 계산합니다.
+    report_duplicates=True일 때만 비용이 큰 중복 조합 검사를 수행합니다.
+    """
+    cancel_mask = order_df['클레임상태'].isin(config.CANCEL_OR_REFUND_STATUSES)
+    order_df['환불수량'] = order_df['수량'].where(cancel_mask, 0)
+
+    aggregations = {
+        '수량': ('수량', 'sum'),          # 옵션별 총 판매수량
+        '환불수량': ('환불수량', 'sum')    # 옵션별 총 환불수량
+    }
+    has_order_no = '상품주문번호' in order_df.columns
+    if has_order_no:
+        # 환불 상태가 아닌 행은 NaN으로 두어 nunique에서 제외
+        order_df['환불주문번호'] = order_df['상품주문번호'].where(cancel_mask)
+        aggregations['결제수'] = ('상품주문번호', 'nunique')     # 결제수 (상품주문번호 개수)
+        aggregations['환불건수'] = ('환불주문번호', 'nunique')   # 환불건수 (환불 상태인 주문번호 개수)
+
+    if report_duplicates:
+        duplicates = order_df.duplicated(group_cols).sum()
+        if duplicates > 0:
+            logging.warning(f"주문조회 데이터에 중복된 상품ID-옵션정보 조합이 {duplicates}개 있습니다.")
+
+    option_summary = order_df.groupby(group_cols, as_index=False, observed=True).agg(**aggregations)
+    if not has_order_no:
+        option_summary['결제수'] = 0
+        option_summary['환불건수'] = 0
+    return option_summary
+
+def summarize_order_frame(order_df, store, date, margin_df):
+    """주문조회 DataFrame을 (상품ID, 옵션정보)별 수량/환불수량/결제수/환불건수 집계표로 변환 (실패 시 None)"""
+    # 파일이 비어있는지 확인
+    if order_df.empty:
+        logging.error(f"-> {store}({date}) 주문조회 파일이 비어있습니다.")
+        return None
+
+    logging.info("-> %s(%s) 주문조회 파일 로드 완료: %d행", store, date, len(order_df))
+    if config.diagnostics_enabled('verbose'):
+        logging.info("-> %s(%s) 주문조회 파일 컬럼: %s", store, date, list(order_df.columns))
+
+    # 상품번호 -> 상품ID 변환 (컬럼이 있는 경우에만)
+    if '상품번호' in order_df.columns:
+        order_df = order_df.rename(columns={'상품번호': '상품ID'})
+
+    # 필수 컬럼 존재 확인
+    required_cols = ['상품ID']
+    missing_cols = [col for col in required_cols if col not in order_df.columns]
+    if missing_cols:
+        logging.error(f"-> {store}({date}) 필수 컬럼 누락: {missing_cols}")
+        return None
+
+    # 상품ID 데이터 타입 정규화 (마진정보와 동일한 방식)
+    order_df['상품ID'] = order_df['상품ID'].apply(normalize_product_id)
+
+    # 옵션정보 정규화
+    if '옵션정보' not in order_df.columns:
+        order_df['옵션정보'] = ''
+    else:
+        order_df['옵션정보'] = order_df['옵션정보'].apply(normalize_option_info)
+
+    if config.diagnostics_enabled('verbose'):
+        logging.info("-> %s(%s) 옵션정보 정규화 후 샘플: %s", store, date, order_df['옵션정보'].head(5).tolist())
+
+    # 클레임상태 컬럼 확인 및 환불 관련 처리
+    if '클레임상태' not in order_df.columns:
+        # 다른 가능한 컬럼명들 확인
+        status_col = None
+        for col in config.CLAIM_STATUS_COLUMN_CANDIDATES:
+            if col in order_df.columns:
+                status_col = col
+                break
+
+        if status_col:
+            logging.info(f"-> {store}({date}) '{status_col}' 컬럼을 클레임상태로 사용합니다.")
+            order_df['클레임상태'] = order_df[status_col]
+        else:
+            logging.warning(f"-> {store}({date}) 클레임상태 컬럼을 찾을 수 없습니다.")
+            order_df['클레임상태'] = '정상'
+
+    # 수량 컬럼 확인
+    if '수량' not in order_df.columns:
+        quantity_col = None
+        for col in config.QUANTITY_COLUMN_CANDIDATES:
+            if col in order_df.columns:
+                quantity_col = col
+                break
+
+        if quantity_col:
+            logging.info(f"-> {store}({date}) '{quantity_col}' 컬럼을 수량으로 사용합니다.")
+            order_df['수량'] = order_df[quantity_col]
+        else:
+            logging.warning(f"-> {store}({date}) 수량 컬럼을 찾을 수 없습니다. 기본값 1 사용")
+            order_df['수량'] = 1
+
+    # 수량을 숫자형으로 변환
+    order_df['수량'] = pd.to_numeric(order_df['수량'], errors='coerce').fillna(1)
+
+    # 클레임상태 분포 확인 (진단용 - production 수준에서는 계산하지 않음)
+    if config.diagnostics_enabled('verbose'):
+        status_counts = order_df['클레임상태'].value_counts()
+        logging.info("-> %s(%s) 클레임상태 분포: %s", store, date, status_counts.to_dict())
+
+    # 마진정보를 기준으로 한 공유 카테고리 사전으로 키 컬럼 압축 (병합 시 category 유지)
+    key_dtypes = {
+        '상품ID': build_category_dtype(margin_df['상품ID'], order_df['상품ID']),
+        '옵션정보': build_category_dtype(margin_df['옵션정보'], order_df['옵션정보'])
+    }
+    order_df = compact_frame(order_df, key_dtypes)
+
+    # 옵션별 집계 (핵심 로직!) - 상품명도 함께 집계
+    logging.info(f"-> {store}({date}) 옵션별 데이터 집계 시작...")
+
+    # 상품명 컬럼 확인
+    if '상품명' in order_df.columns:
+        group_cols = ['상품ID', '상품명', '옵션정보']
+    else:
+        group_cols = ['상품ID', '옵션정보']
+        logging.warning(f"-> {store}({date}) 주문조회 파일에 상품명 컬럼이 없습니다.")
+
+    option_summary = aggregate_order_options(order_df, group_cols,
+                                             report_duplicates=config.diagnostics_enabled('debug'))
+
+    # 환불수량 계산 결과
+    logging.info("-> %s(%s) 총 환불수량: %s, 환불건수: %s", store, date,
+                 option_summary['환불수량'].sum(), option_summary['환불건수'].sum())
+    logging.info("-> %s(%s) 옵션별 집계 완료: %d개 옵션", store, date, len(option_summary))
+
+    return option_summary
+
+def _row_value(row, index):
+    """행 튜플에서 인덱스 위치의 값 반환 (컬럼이 없거나 행이 짧으면 None)"""
+    if index is None or index >= len(row):
+        return None
+    return row[index]
+
+def _to_quantity(value):
+    """수량 값을 숫자로 변환 - 변환할 수 없으면 pandas 경로와 동일하게 1 사용"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return 1 if value != value else value  # NaN 처리
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 1
+
+def stream_order_summary(order_path, store, date, margin_df, password=None):
+    """
+    주문조회 파일을 openpyxl read_only 모드로 한 행씩 읽으면서 옵션별로 집계합니다.
+    전체 DataFrame을 만들지 않으므로 메모리 사용량이 주문 행 수가 아닌 고유 옵션 수에 비례합니다.
+    """
+    rows = iter_protected_excel_rows(order_path, password=password)
+    header = next(rows, None)
+    if header is None:
+        logging.error(f"-> {store}({date}) 주문조회 파일이 비어있습니다.")
+        return None
+
+    # 컬럼명 -> 위치 (중복 컬럼은 pandas와 동일하게 첫 번째 컬럼 사용)
+    columns = {}
+    for index, name in enumerate(header):
+        if name is not None:
+            columns.setdefault(str(name), index)
+    if config.diagnostics_enabled('verbose'):
+        logging.info("-> %s(%s) 주문조회 파일 컬럼: %s", store, date, list(columns))
+
+    id_index = columns.get('상품ID', columns.get('상품번호'))
+    if id_index is None:
+        logging.error(f"-> {store}({date}) 필수 컬럼 누락: ['상품ID']")
+        return None
+
+    name_index = columns.get('상품명')
+    option_index = columns.get('옵션정보')
+    order_no_index = columns.get('상품주문번호')
+    if name_index is None:
+        logging.warning(f"-> {store}({date}) 주문조회 파일에 상품명 컬럼이 없습니다.")
+
+    status_index = columns.get('클레임상태')
+    if status_index is None:
+        status_col = next((col for col in config.CLAIM_STATUS_COLUMN_CANDIDATES if col in columns), None)
+        if status_col:
+            logging.info(f"-> {store}({date}) '{status_col}' 컬럼을 클레임상태로 사용합니다.")
+            status_index = columns[status_col]
+        else:
+            logging.warning(f"-> {store}({date}) 클레임상태 컬럼을 찾을 수 없습니다.")
+
+    quantity_index = columns.get('수량')
+    has_quantity = quantity_index is not None
+    if not has_quantity:
+        quantity_col = next((col for col in config.QUANTITY_COLUMN_CANDIDATES if col in columns), None)
+        if quantity_col:
+            logging.info(f"-> {store}({date}) '{quantity_col}' 컬럼을 수량으로 사용합니다.")
+            quantity_index = columns[quantity_col]
+            has_quantity = True
+        else:
+            logging.warning(f"-> {store}({date}) 수량 컬럼을 찾을 수 없습니다. 기본값 1 사용")
+
+    cancel_statuses = set(config.CANCEL_OR_REFUND_STATUSES)
+    count_statuses = config.diagnostics_enabled('verbose')
+    # (상품ID, [상품명,] 옵션정보) -> [수량 합계, 환불수량 합계, 상품주문번호 집합, 환불 상품주문번호 집합]
+    summary = {}
+    status_counts = {}
+    row_count = 0
+
+    for row in rows:
+        if all(value is None for value in row):
+            continue  # 빈 행
+        row_count += 1
+
+        status = _row_value(row, status_index) if status_index is not None else '정상'
+        if count_statuses and status is not None:
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+        if name_index is not None:
+            name = _row_value(row, name_index)
+            if name is None:
+                continue  # pandas groupby와 동일하게 상품명이 빈 행은 집계에서 제외
+            key = (normalize_product_id(_row_value(row, id_index)), name,
+                   normalize_option_info(_row_value(row, option_index)))
+        else:
+            key = (normalize_product_id(_row_value(row, id_index)),
+                   normalize_option_info(_row_value(row, option_index)))
+
+        quantity = _to_quantity(_row_value(row, quantity_index)) if has_quantity else 1
+        is_refund = status in cancel_statuses
+
+        entry = summary.get(key)
+        if entry is None:
+            entry = summary[key] = [0, 0, set(), set()]
+        entry[0] += quantity
+        order_no = _row_value(row, order_no_index)
+        if order_no is not None:
+            entry[2].add(order_no)
+        if is_refund:
+            entry[1] += quantity
+            if order_no is not None:
+                entry[3].add(order_no)
+
+    if row_count == 0:
+        logging.error(f"-> {store}({date}) 주문조회 파일이 비어있습니다.")
+        return None
+
+    logging.info("-> %s(%s) 주문조회 파일 스트리밍 완료: %d행", store, date, row_count)
+    progress.add_rows(row_count)
+    if count_statuses:
+        logging.info("-> %s(%s) 클레임상태 분포: %s", store, date, status_counts)
+
+    group_cols = ['상품ID', '상품명', '옵션정보'] if name_index is not None else ['상품ID', '옵션정보']
+    records = [key + (quantity, refund_quantity, len(order_nos), len(refund_order_nos))
+               for key, (quantity, refund_quantity, order_nos, refund_order_nos) in summary.items()]
+    option_summary = pd.DataFrame.from_records(records, columns=group_cols + ['수량', '환불수량', '결제수', '환불건수'])
+
+    # 마진정보를 기준으로 한 공유 카테고리 사전으로 키 컬럼 압축 (병합 시 category 유지)
+    key_dtypes = {
+        '상품ID': build_category_dtype(margin_df['상품ID'], option_summary['상품ID']),
+        '옵션정보': build_category_dtype(margin_df['옵션정보'], option_summary['옵션정보'])
+    }
+    option_summary = compact_frame(option_summary, key_dtypes)
+    option_summary = option_summary.sort_values(group_cols).reset_index(drop=True)
+
+    # 환불수량 계산 결과
+    logging.info("-> %s(%s) 총 환불수량: %s, 환불건수: %s", store, date,
+                 option_summary['환불수량'].sum(), option_summary['환불건수'].sum())
+    logging.info("-> %s(%s) 옵션별 집계 완료: %d개 옵션", store, date, len(option_summary))
+    return option_summary
+
+def summarize_order_file(order_path, store, date, margin_df):
+    """
+    주문조회 파일을 옵션별 집계표로 변환 (config.ORDER_READ_MODE에 따라 pandas 또는 스트리밍 방식)
+    order_path 대신 미리 읽어 둔 파일 내용(BytesIO)을 줄 수도 있습니다.
+    """
+    if config.ORDER_READ_MODE == 'stream':
+        return stream_order_summary(order_path, store, date, margin_df, password=config.ORDER_FILE_PASSWORD)
+
+    order_df = read_protected_excel(order_path, password=config.ORDER_FILE_PASSWORD)
+    progress.add_rows(len(order_df))
+    return summarize_order_frame(order_df, store, date, margin_df)
+
+def load_margin_catalog():
+    """
+    마진정보 파일을 읽어 상품ID/옵션정보를 정규화하고 중복을 제거
+    (margin_df, 대표옵션 판매가 사전)을 반환하고, 실패하면 (None, None)
+    """
     try:
         margin_df = pd.read_excel(config.MARGIN_FILE, engine='openpyxl')
         logging.info(f"'{os.path.basename(config.MARGIN_FILE)}' 파일을 성공적으로 불러왔습니다.")
@@ -282,17 +497,291 @@ def generate_individual_reports():
         else:
             margin_df['옵션정보'] = margin_df['옵션정보'].apply(normalize_option_info)
             
+        # 마진정보 중복 검증 (파일마다 반복하지 않도록 로드 시 한 번만 수행)
+        margin_duplicates = margin_df.duplicated(['상품ID', '옵션정보']).sum()
+        if margin_duplicates > 0:
+            logging.warning(f"마진정보에 중복된 상품ID-옵션정보 조합이 {margin_duplicates}개 있습니다.")
+            # 첫 번째 값만 유지
+            margin_df = margin_df.drop_duplicates(['상품ID', '옵션정보'], keep='first')
+            logging.info(f"중복 제거 후 마진정보 행 수: {len(margin_df)}")
+            
     except FileNotFoundError:
         logging.error(f"마진정보 파일을 찾을 수 없습니다: {config.MARGIN_FILE}")
-        return []
+        return None, None
     except PermissionError:
         logging.error(f"마진정보 파일에 접근할 수 없습니다: {config.MARGIN_FILE}")
-        return []
+        return None, None
     except ValueError as e:
         logging.error(f"마진정보 파일 데이터 검증 실패: {e}")
-        return []
+        return None, None
     except Exception as e:
         logging.error(f"마진정보 파일 읽기 중 예상치 못한 오류: {e}")
+        return None, None
+
+    return margin_df, rep_price_map
+
+def build_option_pivots(df, pivot_sheets):
+    """
+    상품명 x 옵션정보 합계 피벗들을 한 번의 groupby + unstack으로 계산 (pd.pivot_table을 값마다 호출하지 않음)
+    pivot_sheets: [(시트 이름, 값 컬럼), ...] -> [(시트 이름, 피벗 DataFrame), ...]
+    """
+    sheets = []
+    for sheet_name, value_col in pivot_sheets:
+        if value_col in df.columns:
+            sheets.append((sheet_name, value_col))
+        else:
+            logging.warning(f"-> 피벗 시트 '{sheet_name}'의 값 컬럼 '{value_col}'이(가) 없어 건너뜁니다.")
+    if not sheets:
+        return []
+
+    if df.empty:
+        empty = pd.DataFrame(index=pd.Index([], name='상품명'), columns=pd.Index([], name='옵션정보'))
+        return [(sheet_name, empty.copy()) for sheet_name, _ in sheets]
+
+    value_cols = list(dict.fromkeys(value_col for _, value_col in sheets))
+    summed = df.groupby(['상품명', '옵션정보'], observed=True)[value_cols].sum()
+    wide = summed.unstack('옵션정보', fill_value=0)
+    pivots = []
+    for sheet_name, value_col in sheets:
+        # wide[value_col]은 옵션정보가 모두 빈 문자열이면 Series로 줄어들므로 xs 사용
+        pivot = wide.xs(value_col, axis=1, level=0)
+        pivot.columns.name = '옵션정보'
+        pivots.append((sheet_name, pivot))
+    return pivots
+
+def store_report_sheets(sorted_df, pivots):
+    """스토어별 리포트 엑셀 시트 구성: 정리된 데이터 + 옵션별 피벗 시트들"""
+    return [
+        xlsx_writer.Sheet('정리된 데이터', sorted_df, styled=config.XLSX_STYLE_STORE_REPORTS),
+    ] + [xlsx_writer.Sheet(sheet_name, pivot, index=True) for sheet_name, pivot in pivots]
+
+def write_store_report(output_path, sheets, formats):
+    """스토어별 리포트 기록 및 결과 로그. 성공 여부를 반환"""
+    if report_output.write_report(output_path, sheets, formats=formats):
+        for path in report_output.existing_report_paths(output_path):
+            logging.info(f"-> '{os.path.basename(path)}' 생성 완료: (파일 크기: {os.path.getsize(path):,} bytes)")
+        return True
+    logging.error(f"-> 파일 생성 실패: {output_path}")
+    return False
+
+def build_store_report(order_path, store, date, margin_df, rep_price_map, output_path, source=None, writer=None):
+    """
+    주문조회 파일 하나로 스토어/날짜별 통합 리포트(output_path)를 생성
+    작업폴더 처리와 보관함 재생성(backfill)이 함께 사용합니다. 성공 여부를 반환.
+    source: 미리 읽어 둔 주문조회 파일 내용 (없으면 order_path에서 읽음)
+    writer: report_pipeline.ReportWriter를 주면 기록은 쓰기 단계로 넘기고 계산 성공 여부를 반환
+    """
+    logging.info(f"- {store} ({date}) 주문조회 기반 데이터 처리 시작...")
+
+    try:
+        # 주문조회 파일 읽기 및 옵션별 집계 (암호 보호될 수 있음)
+        option_summary = summarize_order_file(source if source is not None else order_path, store, date, margin_df)
+        if option_summary is None:
+            return False
+
+        # 판매가는 마진정보 파일에서만 가져옴 (주문조회 파일에는 판매가 컬럼이 없음)
+        # 병합 전 데이터 확인 (진단용)
+        if config.diagnostics_enabled('verbose'):
+            logging.info("-> %s(%s) 병합 전 주문조회 상품ID 샘플: %s", store, date, option_summary['상품ID'].head(3).tolist())
+            logging.info("-> %s(%s) 병합 전 주문조회 옵션정보 샘플: %s", store, date, option_summary['옵션정보'].head(3).tolist())
+            logging.info("-> %s(%s) 병합 전 마진정보 상품ID 샘플: %s", store, date, margin_df['상품ID'].head(3).tolist())
+            logging.info("-> %s(%s) 병합 전 마진정보 옵션정보 샘플: %s", store, date, margin_df['옵션정보'].head(3).tolist())
+
+        # 마진정보와 안전한 병합 with 검증
+        logging.info("-> %s(%s) 마진정보와 병합 시작...", store, date)
+
+        # 마진정보에서 상품명 컬럼 제거 (주문조회의 상품명 유지)
+        margin_cols_to_use = [col for col in margin_df.columns if col != '상품명']
+        key_dtypes = {col: option_summary[col].dtype for col in ['상품ID', '옵션정보']}
+        margin_df_clean = compact_frame(margin_df[margin_cols_to_use].copy(), key_dtypes)
+
+        try:
+            # 안전한 병합 with validation (상품명은 주문조회에서만 사용)
+            final_df = pd.merge(
+                option_summary, 
+                margin_df_clean, 
+                on=['상품ID', '옵션정보'], 
+                how='left',
+                validate='many_to_one'  # 마진정보의 각 상품-옵션은 고유해야 함
+            )
+        except pd.errors.MergeError as e:
+            logging.error(f"-> {store}({date}) 병합 검증 실패: {e}")
+            # validation 없이 재시도
+            final_df = pd.merge(option_summary, margin_df_clean, on=['상품ID', '옵션정보'], how='left')
+
+        # 병합 결과 확인
+        merged_count = len(final_df)
+        margin_matched = final_df['마진율'].notna().sum()
+        logging.info(f"-> {store}({date}) 병합 완료: {merged_count}행, 마진 매칭 {margin_matched}행")
+
+        # 매칭 실패한 경우 디버깅 정보 및 변드을 통한 대안 매칭 시도
+        if margin_matched == 0:
+            logging.warning("-> %s(%s) 마진정보 매칭 실패!", store, date)
+            if config.diagnostics_enabled('debug'):
+                logging.warning("   주문조회 고유 상품ID: %s", option_summary['상품ID'].unique()[:5])
+                logging.warning("   마진정보 고유 상품ID: %s", margin_df['상품ID'].unique()[:5])
+                logging.warning("   주문조회 고유 옵션정보: %s", option_summary['옵션정보'].unique()[:5])
+                logging.warning("   마진정보 고유 옵션정보: %s", margin_df['옵션정보'].unique()[:5])
+
+            # 상품ID만으로 대안 매칭 시도 (옵션 무시)
+            logging.info(f"-> {store}({date}) 옵션정보 없이 상품ID만으로 대안 매칭 시도...")
+
+            # 빈 옵션정보만 필터링하여 대안 매칭 (상품명도 제외)
+            margin_df_no_option = margin_df_clean[margin_df_clean['옵션정보'] == ''].copy()
+            if len(margin_df_no_option) > 0:
+                # 옵션정보와 상품명 모두 제외
+                alt_cols = margin_df_no_option.columns.difference(['옵션정보', '상품명'])
+                final_df_alt = pd.merge(
+                    option_summary, 
+                    margin_df_no_option[alt_cols], 
+                    on='상품ID', 
+                    how='left'
+                )
+                alt_matched = final_df_alt['마진율'].notna().sum()
+                if alt_matched > 0:
+                    logging.info(f"-> {store}({date}) 대안 매칭 성공: {alt_matched}개 상품 매칭")
+                    # 옵션정보 컬럼 다시 추가
+                    final_df_alt['옵션정보'] = option_summary['옵션정보']
+                    final_df = final_df_alt
+                    margin_matched = alt_matched
+
+        # 기본값 설정 및 데이터 타입 검증
+        numeric_columns = ['마진율', '판매가', '개당 가구매 비용']
+        for col in numeric_columns:
+            if col in final_df.columns:
+                # 숫자 타입을 강제로 변환
+                final_df[col] = pd.to_numeric(final_df[col], errors='coerce')
+
+        final_df.fillna({
+            '마진율': 0.0, 
+            '판매가': 0.0,  # 마진정보의 판매가
+            '개당 가구매 비용': 0.0, 
+            '대표옵션': False
+        }, inplace=True)
+
+        # 상품명 확인 (마진정보에서 상품명을 제외했으므로 주문조회의 상품명이 유지됨)
+        if config.diagnostics_enabled('verbose'):
+            logging.info("-> %s(%s) 상품명 확인 - 현재 컬럼: %s", store, date, list(final_df.columns))
+
+        if '상품명' not in final_df.columns:
+            logging.error(f"-> {store}({date}) 상품명 컬럼을 찾을 수 없습니다!")
+            # 응급 처치: 상품ID를 상품명으로 사용
+            final_df['상품명'] = final_df['상품ID']
+            logging.warning(f"-> {store}({date}) 임시로 상품ID를 상품명으로 사용합니다.")
+        elif config.diagnostics_enabled('verbose'):
+            logging.info("-> %s(%s) 상품명 유지 완료 - 샘플: %s", store, date, final_df['상품명'].head(2).tolist())
+
+        # 기본 계산 필드들
+        final_df['결제금액'] = final_df['수량'] * final_df['판매가']
+        final_df['환불금액'] = final_df['환불수량'] * final_df['판매가'] 
+        final_df['매출'] = final_df['결제금액'] - final_df['환불금액']
+
+        # 대표판매가 (가구매 금액 계산용)
+        final_df['대표판매가'] = final_df['상품ID'].map(rep_price_map).fillna(0)
+
+        # 가구매 개수 적용 (대표옵션에만, GUI에서 설정한 값)
+        # 설정은 날짜별로 한 번에 조회하고 상품ID 사전 매핑으로 적용
+        rep_option_mask = final_df['대표옵션'] == True
+        normalized_ids = final_df['상품ID'].astype(object).map(normalize_product_id)
+        purchase_rules = load_rules_for_date(settings_store.purchase_store(), date, '가구매 설정')
+        final_df['가구매 개수'] = apply_rep_option_rules(normalized_ids, rep_option_mask, purchase_rules)
+        for product_id in final_df.loc[rep_option_mask & (final_df['가구매 개수'] > 0), '상품ID'].unique():
+            logging.info("-> %s(%s) 상품 %s 가구매 개수: %s", store, date, product_id,
+                         purchase_rules[normalize_product_id(product_id)])
+
+        # 추가 계산 필드들
+        final_df['가구매 수량'] = final_df['가구매 개수']
+        final_df['개당 가구매 금액'] = final_df['대표판매가']
+        final_df['가구매 금액'] = final_df['개당 가구매 금액'] * final_df['가구매 수량']
+        final_df['순매출'] = final_df['매출'] - final_df['가구매 금액']
+        final_df['가구매 비용'] = final_df['개당 가구매 비용'] * final_df['가구매 수량']
+
+        # 리워드 적용 (대표옵션에만)
+        reward_rules = load_rules_for_date(settings_store.reward_store(), date, '리워드 설정')
+        final_df['리워드'] = apply_rep_option_rules(normalized_ids, rep_option_mask, reward_rules)
+        for product_id in final_df.loc[rep_option_mask & (final_df['리워드'] > 0), '상품ID'].unique():
+            logging.info("-> %s(%s) 상품 %s 리워드: %s원", store, date, product_id,
+                         reward_rules[normalize_product_id(product_id)])
+
+        # 안전한 나누기 함수 정의
+        def safe_divide(numerator, denominator, fill_value=0.0):
+            """안전한 나누기 - 0 나누기와 NaN 처리"""
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = np.where(
+                    (denominator == 0) | pd.isna(denominator),
+                    fill_value,
+                    numerator / denominator
+                )
+            return result
+
+        # 판매마진 및 비율 계산 (안전한 방식)
+        final_df['판매마진'] = final_df['순매출'] * final_df['마진율']
+
+        # 광고비율 = (리워드 + 가구매 비용) / 순매출
+        final_df['광고비율'] = safe_divide(
+            final_df['리워드'] + final_df['가구매 비용'],
+            final_df['순매출'],
+            fill_value=0.0  # 순매출이 0이면 광고비율은 0%
+        )
+
+        final_df['이윤율'] = final_df['마진율'] - final_df['광고비율']
+        final_df['순이익'] = final_df['판매마진'] - final_df['가구매 비용'] - final_df['리워드']
+
+        # 퍼센트 값 변환
+        final_df['마진율'] = (final_df['마진율'] * 100).round(1)
+        final_df['광고비율'] = (final_df['광고비율'] * 100).round(1)
+        final_df['이윤율'] = (final_df['이윤율'] * 100).round(1)
+
+        # 최종 컬럼 정리
+        final_columns = [col for col in config.COLUMNS_TO_KEEP if col in final_df.columns]
+        sorted_df = final_df[final_columns].sort_values(by=['상품명', '옵션정보'])
+
+        # 데이터 요약 로깅
+        logging.info(f"-> {store}({date}) 최종 데이터 요약:")
+        logging.info(f"   - 총 옵션 수: {len(sorted_df)}")
+        logging.info(f"   - 총 판매수량: {sorted_df['수량'].sum()}")
+        logging.info(f"   - 총 환불수량: {sorted_df['환불수량'].sum()}")
+        logging.info(f"   - 총 매출: {sorted_df['매출'].sum():,.0f}원")
+        logging.info(f"   - 총 판매마진: {sorted_df['판매마진'].sum():,.0f}원")
+
+        # 엑셀 파일 생성
+        pivots = build_option_pivots(sorted_df, config.PIVOT_SHEETS) if 'xlsx' in report_output.store_report_formats() else []
+
+        # 표 서식 적용 (스토어별 리포트는 전체 통합 리포트의 중간 결과이므로 설정으로 생략 가능)
+        # (STORE_REPORT_XLSX가 'always'가 아니면 엑셀 없이 parquet 중간 결과만 기록 - export_store_reports 참고)
+        sheets = store_report_sheets(sorted_df, pivots)
+        if writer is not None:
+            writer.submit(store, date, output_path, sheets, report_output.store_report_formats())
+            return True
+        return write_store_report(output_path, sheets, report_output.store_report_formats())
+
+    except Exception as e:
+        logging.error(f"-> {store}({date}) 처리 중 오류 발생: {e}")
+        import traceback
+        logging.error(f"-> {store}({date}) 상세 오류: {traceback.format_exc()}")
+        return False
+    finally:
+        # 메모리 정리
+        try:
+            if 'option_summary' in locals():
+                del option_summary
+            if 'final_df' in locals():
+                del final_df
+            if 'sorted_df' in locals():
+                del sorted_df
+        except:
+            pass
+
+def generate_individual_reports(pairs=None, stop_requested=None):
+    """
+    개별 스토어의 주문조회 파일을 기반으로 옵션별 통합 리포트를 생성합니다.
+    pairs((스토어, 날짜) 목록)를 주면 해당 주문조회 파일만 처리하고,
+    stop_requested()가 True를 반환하면 남은 파일은 건너뜁니다.
+    """
+    logging.info("--- 1단계: 주문조회 기반 개별 통합 리포트 생성 시작 ---")
+    
+    margin_df, rep_price_map = load_margin_catalog()
+    if margin_df is None:
         return []
 
     # 처리 가능한 파일들 찾기
@@ -301,6 +790,9 @@ def generate_individual_reports():
 
     # 주문조회 파일만 필터링
     order_files = [f for f in source_files if '스마트스토어_주문조회' in f]
+    if pairs is not None:
+        wanted = {f'{store} 스마트스토어_주문조회_{date}.xlsx' for store, date in pairs}
+        order_files = [f for f in order_files if f in wanted]
     
     if not order_files:
         logging.info("처리할 주문조회 파일이 없습니다.")
@@ -309,492 +801,243 @@ def generate_individual_reports():
     logging.info(f"총 {len(order_files)}개의 주문조회 파일에 대한 리포트를 생성합니다.")
     processed_groups = []
     
-    for order_file in order_files:
-        # 파일명에서 스토어명과 날짜 추출
-        if '스마트스토어_주문조회' in order_file:
+    with progress.stage('reports', len(order_files)) as tracker:
+        targets = []
+        for order_file in order_files:
+            # 파일명에서 스토어명과 날짜 추출
             parts = order_file.split(' 스마트스토어_주문조회_')
-            if len(parts) == 2:
-                store = parts[0]
-                date = parts[1].replace('.xlsx', '')
-            else:
-                continue
-        else:
-            continue
-            
-        output_filename = f'{store}_통합_리포트_{date}.xlsx'
-        output_path = os.path.join(config.get_processing_dir(), output_filename)
-        
-        # 이미 리포트가 존재하는지 확인
-        if os.path.exists(output_path):
-            logging.info(f"- {store} ({date}) 이미 리포트가 생성되어 있습니다.")
-            processed_groups.append((store, date))
-            continue
-            
-        logging.info(f"- {store} ({date}) 주문조회 기반 데이터 처리 시작...")
-        
-        try:
-            # 주문조회 파일 읽기 (암호 보호될 수 있음)
-            order_path = os.path.join(config.get_processing_dir(), order_file)
-            order_df = read_protected_excel(order_path, password=config.ORDER_FILE_PASSWORD)
-            
-            # 파일이 비어있는지 확인
-            if order_df.empty:
-                logging.error(f"-> {store}({date}) 주문조회 파일이 비어있습니다: {order_file}")
+            if len(parts) != 2:
+                tracker.advance()
                 continue
-            
-            logging.info(f"-> {store}({date}) 주문조회 파일 로드 완료: {len(order_df)}행")
-            logging.info(f"-> {store}({date}) 주문조회 파일 컬럼: {list(order_df.columns)}")
-            
-            # 상품번호 -> 상품ID 변환 (컬럼이 있는 경우에만)
-            if '상품번호' in order_df.columns:
-                order_df = order_df.rename(columns={'상품번호': '상품ID'})
-            
-            # 필수 컬럼 존재 확인
-            required_cols = ['상품ID']
-            missing_cols = [col for col in required_cols if col not in order_df.columns]
-            if missing_cols:
-                logging.error(f"-> {store}({date}) 필수 컬럼 누락: {missing_cols}")
-                continue
-            
-            # 상품ID 데이터 타입 정규화 (마진정보와 동일한 방식)
-            order_df['상품ID'] = order_df['상품ID'].apply(normalize_product_id)
-            
-            # 옵션정보 정규화 
-            def normalize_option_info(value):
-                if pd.isna(value) or value == '' or str(value).strip() == '':
-                    return ''
-                value_str = str(value).strip()
-                # '단일', '기본옵션', '선택안함' 등을 빈 문자열로 통일
-                if value_str.lower() in ['단일', '기본옵션', '선택안함', 'null', 'none', '없음']:
-                    return ''
-                return value_str
-            
-            if '옵션정보' not in order_df.columns:
-                order_df['옵션정보'] = ''
-            else:
-                order_df['옵션정보'] = order_df['옵션정보'].apply(normalize_option_info)
-            
-            logging.info(f"-> {store}({date}) 옵션정보 정규화 후 샘플: {order_df['옵션정보'].head(5).tolist()}")
-            
-            # 클레임상태 컬럼 확인 및 환불 관련 처리
-            if '클레임상태' not in order_df.columns:
-                # 다른 가능한 컬럼명들 확인
-                possible_status_cols = ['상태', '주문상태', '처리상태', '배송상태', '주문처리상태', '결제상태']
-                status_col = None
-                for col in possible_status_cols:
-                    if col in order_df.columns:
-                        status_col = col
-                        break
-                
-                if status_col:
-                    logging.info(f"-> {store}({date}) '{status_col}' 컬럼을 클레임상태로 사용합니다.")
-                    order_df['클레임상태'] = order_df[status_col]
-                else:
-                    logging.warning(f"-> {store}({date}) 클레임상태 컬럼을 찾을 수 없습니다.")
-                    order_df['클레임상태'] = '정상'
-            
-            # 수량 컬럼 확인
-            if '수량' not in order_df.columns:
-                possible_quantity_cols = ['결제수량', '주문수량', '상품수량', '결제상품수량']
-                quantity_col = None
-                for col in possible_quantity_cols:
-                    if col in order_df.columns:
-                        quantity_col = col
-                        break
-                
-                if quantity_col:
-                    logging.info(f"-> {store}({date}) '{quantity_col}' 컬럼을 수량으로 사용합니다.")
-                    order_df['수량'] = order_df[quantity_col]
-                else:
-                    logging.warning(f"-> {store}({date}) 수량 컬럼을 찾을 수 없습니다. 기본값 1 사용")
-                    order_df['수량'] = 1
-            
-            # 수량을 숫자형으로 변환
-            order_df['수량'] = pd.to_numeric(order_df['수량'], errors='coerce').fillna(1)
-            
-            # 클레임상태 분포 확인
-            status_counts = order_df['클레임상태'].value_counts()
-            logging.info(f"-> {store}({date}) 클레임상태 분포: {status_counts.to_dict()}")
-            
-            # 환불수량 계산
-            cancel_mask = order_df['클레임상태'].isin(config.CANCEL_OR_REFUND_STATUSES)
-            order_df['환불수량'] = order_df['수량'].where(cancel_mask, 0)
-            
-            # 환불수량 계산 결과
-            total_refund_quantity = order_df['환불수량'].sum()
-            refund_rows = (order_df['환불수량'] > 0).sum()
-            logging.info(f"-> {store}({date}) 총 환불수량: {total_refund_quantity}, 환불 행 수: {refund_rows}")
-            
-            # 옵션별 집계 (핵심 로직!) - 상품명도 함께 집계
-            logging.info(f"-> {store}({date}) 옵션별 데이터 집계 시작...")
-            
-            # 상품명 컬럼 확인
-            if '상품명' in order_df.columns:
-                group_cols = ['상품ID', '상품명', '옵션정보']
-                agg_dict = {
-                    '수량': 'sum',           # 옵션별 총 판매수량
-                    '환불수량': 'sum'        # 옵션별 총 환불수량
-                }
-            else:
-                group_cols = ['상품ID', '옵션정보'] 
-                agg_dict = {
-                    '수량': 'sum',           # 옵션별 총 판매수량
-                    '환불수량': 'sum'        # 옵션별 총 환불수량
-                }
-                logging.warning(f"-> {store}({date}) 주문조회 파일에 상품명 컬럼이 없습니다.")
-            
-            # 중복 데이터 검증
-            duplicates = order_df.duplicated(group_cols).sum()
-            if duplicates > 0:
-                logging.warning(f"-> {store}({date}) 주문조회 데이터에 중복된 상품ID-옵션정보 조합이 {duplicates}개 있습니다.")
-            
-            option_summary = order_df.groupby(group_cols, as_index=False).agg(agg_dict)
-            
-            logging.info(f"-> {store}({date}) 옵션별 집계 완료: {len(option_summary)}개 옵션")
-            
-            # 판매가는 마진정보 파일에서만 가져옴 (주문조회 파일에는 판매가 컬럼이 없음)
-            logging.info(f"-> {store}({date}) 판매가는 마진정보 파일에서 가져옵니다.")
-            
-            # 병합 전 데이터 확인
-            logging.info(f"-> {store}({date}) 병합 전 주문조회 상품ID 샘플: {option_summary['상품ID'].head(3).tolist()}")
-            logging.info(f"-> {store}({date}) 병합 전 주문조회 옵션정보 샘플: {option_summary['옵션정보'].head(3).tolist()}")
-            logging.info(f"-> {store}({date}) 병합 전 마진정보 상품ID 샘플: {margin_df['상품ID'].head(3).tolist()}")
-            logging.info(f"-> {store}({date}) 병합 전 마진정보 옵션정보 샘플: {margin_df['옵션정보'].head(3).tolist()}")
-            
-            # 마진정보와 안전한 병합 with 검증
-            logging.info(f"-> {store}({date}) 마진정보와 병합 시작...")
-            
-            # 병합 전 마진정보 중복 검증
-            margin_duplicates = margin_df.duplicated(['상품ID', '옵션정보']).sum()
-            if margin_duplicates > 0:
-                logging.warning(f"-> {store}({date}) 마진정보에 중복된 상품ID-옵션정보 조합이 {margin_duplicates}개 있습니다.")
-                # 첫 번째 값만 유지
-                margin_df = margin_df.drop_duplicates(['상품ID', '옵션정보'], keep='first')
-                logging.info(f"-> {store}({date}) 중복 제거 후 마진정보 행 수: {len(margin_df)}")
-            
-            # 마진정보에서 상품명 컬럼 제거 (주문조회의 상품명 유지)
-            margin_cols_to_use = [col for col in margin_df.columns if col != '상품명']
-            margin_df_clean = margin_df[margin_cols_to_use].copy()
-            
-            try:
-                # 안전한 병합 with validation (상품명은 주문조회에서만 사용)
-                final_df = pd.merge(
-                    option_summary, 
-                    margin_df_clean, 
-                    on=['상품ID', '옵션정보'], 
-                    how='left',
-                    validate='many_to_one'  # 마진정보의 각 상품-옵션은 고유해야 함
-                )
-            except pd.errors.MergeError as e:
-                logging.error(f"-> {store}({date}) 병합 검증 실패: {e}")
-                # validation 없이 재시도
-                final_df = pd.merge(option_summary, margin_df_clean, on=['상품ID', '옵션정보'], how='left')
-            
-            # 병합 결과 확인
-            merged_count = len(final_df)
-            margin_matched = final_df['마진율'].notna().sum()
-            logging.info(f"-> {store}({date}) 병합 완료: {merged_count}행, 마진 매칭 {margin_matched}행")
-            
-            # 매칭 실패한 경우 디버깅 정보 및 변드을 통한 대안 매칭 시도
-            if margin_matched == 0:
-                logging.warning(f"-> {store}({date}) 마진정보 매칭 실패! 디버깅 정보:")
-                logging.warning(f"   주문조회 고유 상품ID: {option_summary['상품ID'].unique()[:5]}")
-                logging.warning(f"   마진정보 고유 상품ID: {margin_df['상품ID'].unique()[:5]}")
-                logging.warning(f"   주문조회 고유 옵션정보: {option_summary['옵션정보'].unique()[:5]}")
-                logging.warning(f"   마진정보 고유 옵션정보: {margin_df['옵션정보'].unique()[:5]}")
+            store = parts[0]
+            date = parts[1].replace('.xlsx', '')
                 
-                # 상품ID만으로 대안 매칭 시도 (옵션 무시)
-                logging.info(f"-> {store}({date}) 옵션정보 없이 상품ID만으로 대안 매칭 시도...")
-                
-                # 빈 옵션정보만 필터링하여 대안 매칭 (상품명도 제외)
-                margin_df_no_option = margin_df[margin_df['옵션정보'] == ''].copy()
-                if len(margin_df_no_option) > 0:
-                    # 옵션정보와 상품명 모두 제외
-                    alt_cols = margin_df_no_option.columns.difference(['옵션정보', '상품명'])
-                    final_df_alt = pd.merge(
-                        option_summary, 
-                        margin_df_no_option[alt_cols], 
-                        on='상품ID', 
-                        how='left'
-                    )
-                    alt_matched = final_df_alt['마진율'].notna().sum()
-                    if alt_matched > 0:
-                        logging.info(f"-> {store}({date}) 대안 매칭 성공: {alt_matched}개 상품 매칭")
-                        # 옵션정보 컬럼 다시 추가
-                        final_df_alt['옵션정보'] = option_summary['옵션정보']
-                        final_df = final_df_alt
-                        margin_matched = alt_matched
-            
-            # 기본값 설정 및 데이터 타입 검증
-            numeric_columns = ['마진율', '판매가', '개당 가구매 비용']
-            for col in numeric_columns:
-                if col in final_df.columns:
-                    # 숫자 타입을 강제로 변환
-                    final_df[col] = pd.to_numeric(final_df[col], errors='coerce')
-            
-            final_df.fillna({
-                '마진율': 0.0, 
-                '판매가': 0.0,  # 마진정보의 판매가
-                '개당 가구매 비용': 0.0, 
-                '대표옵션': False
-            }, inplace=True)
-            
-            # 상품명 확인 (마진정보에서 상품명을 제외했으므로 주문조회의 상품명이 유지됨)
-            logging.info(f"-> {store}({date}) 상품명 확인 - 현재 컬럼: {list(final_df.columns)}")
-            
-            if '상품명' not in final_df.columns:
-                logging.error(f"-> {store}({date}) 상품명 컬럼을 찾을 수 없습니다!")
-                # 응급 처치: 상품ID를 상품명으로 사용
-                final_df['상품명'] = final_df['상품ID']
-                logging.warning(f"-> {store}({date}) 임시로 상품ID를 상품명으로 사용합니다.")
-            else:
-                logging.info(f"-> {store}({date}) 상품명 유지 완료 - 샘플: {final_df['상품명'].head(2).tolist()}")
-            
-            # 기본 계산 필드들
-            final_df['결제금액'] = final_df['수량'] * final_df['판매가']
-            final_df['환불금액'] = final_df['환불수량'] * final_df['판매가'] 
-            final_df['매출'] = final_df['결제금액'] - final_df['환불금액']
-            
-            # 대표판매가 (가구매 금액 계산용)
-            final_df['대표판매가'] = final_df['상품ID'].map(rep_price_map).fillna(0)
-            
-            # 가구매 개수 적용 (대표옵션에만, GUI에서 설정한 값)
-            final_df['가구매 개수'] = 0  # 기본값
-            rep_option_mask = final_df['대표옵션'] == True
-            
-            if rep_option_mask.sum() > 0:
-                for product_id in final_df.loc[rep_option_mask, '상품ID'].unique():
-                    purchase_count = get_purchase_count_for_date_and_product(product_id, date)
-                    final_df.loc[(final_df['상품ID'] == product_id) & rep_option_mask, '가구매 개수'] = purchase_count
-                    if purchase_count > 0:
-                        logging.info(f"-> {store}({date}) 상품 {product_id} 가구매 개수: {purchase_count}")
-            
-            # 추가 계산 필드들
-            final_df['가구매 수량'] = final_df['가구매 개수']
-            final_df['개당 가구매 금액'] = final_df['대표판매가']
-            final_df['가구매 금액'] = final_df['개당 가구매 금액'] * final_df['가구매 수량']
-            final_df['순매출'] = final_df['매출'] - final_df['가구매 금액']
-            final_df['가구매 비용'] = final_df['개당 가구매 비용'] * final_df['가구매 수량']
-            
-            # 리워드 적용 (대표옵션에만)
-            final_df['리워드'] = 0
-            if rep_option_mask.sum() > 0:
-                for product_id in final_df.loc[rep_option_mask, '상품ID'].unique():
-                    reward_value = get_reward_for_date_and_product(product_id, date)
-                    final_df.loc[(final_df['상품ID'] == product_id) & rep_option_mask, '리워드'] = reward_value
-                    if reward_value > 0:
-                        logging.info(f"-> {store}({date}) 상품 {product_id} 리워드: {reward_value}원")
-            
-            # 안전한 나누기 함수 정의
-            def safe_divide(numerator, denominator, fill_value=0.0):
-                """안전한 나누기 - 0 나누기와 NaN 처리"""
-                with np.errstate(divide='ignore', invalid='ignore'):
-                    result = np.where(
-                        (denominator == 0) | pd.isna(denominator),
-                        fill_value,
-                        numerator / denominator
-                    )
-                return result
-            
-            # 판매마진 및 비율 계산 (안전한 방식)
-            final_df['판매마진'] = final_df['순매출'] * final_df['마진율']
-            
-            # 광고비율 = (리워드 + 가구매 비용) / 순매출
-            final_df['광고비율'] = safe_divide(
-                final_df['리워드'] + final_df['가구매 비용'],
-                final_df['순매출'],
-                fill_value=0.0  # 순매출이 0이면 광고비율은 0%
-            )
-            
-            final_df['이윤율'] = final_df['마진율'] - final_df['광고비율']
-            final_df['순이익'] = final_df['판매마진'] - final_df['가구매 비용'] - final_df['리워드']
-            
-            # 퍼센트 값 변환
-            final_df['마진율'] = (final_df['마진율'] * 100).round(1)
-            final_df['광고비율'] = (final_df['광고비율'] * 100).round(1)
-            final_df['이윤율'] = (final_df['이윤율'] * 100).round(1)
-            
-            # 결제수, 환불건수 계산 (주문조회 기반)
-            if '상품주문번호' in order_df.columns:
-                # 결제수 (상품주문번호 개수)
-                order_count = order_df.groupby(['상품ID', '옵션정보'])['상품주문번호'].nunique().reset_index()
-                order_count.rename(columns={'상품주문번호': '결제수'}, inplace=True)
-                final_df = pd.merge(final_df, order_count, on=['상품ID', '옵션정보'], how='left')
-                final_df['결제수'] = final_df['결제수'].fillna(0)
-                
-                # 환불건수 (환불 상태인 주문번호 개수)  
-                cancel_orders = order_df[order_df['클레임상태'].isin(config.CANCEL_OR_REFUND_STATUSES)]
-                if not cancel_orders.empty:
-                    refund_count = cancel_orders.groupby(['상품ID', '옵션정보'])['상품주문번호'].nunique().reset_index()
-                    refund_count.rename(columns={'상품주문번호': '환불건수'}, inplace=True)
-                    final_df = pd.merge(final_df, refund_count, on=['상품ID', '옵션정보'], how='left')
-                    final_df['환불건수'] = final_df['환불건수'].fillna(0)
-                else:
-                    final_df['환불건수'] = 0
-            else:
-                final_df['결제수'] = 0
-                final_df['환불건수'] = 0
-                
-            # 최종 컬럼 정리
-            final_columns = [col for col in config.COLUMNS_TO_KEEP if col in final_df.columns]
-            sorted_df = final_df[final_columns].sort_values(by=['상품명', '옵션정보'])
-            
-            # 데이터 요약 로깅
-            logging.info(f"-> {store}({date}) 최종 데이터 요약:")
-            logging.info(f"   - 총 옵션 수: {len(sorted_df)}")
-            logging.info(f"   - 총 판매수량: {sorted_df['수량'].sum()}")
-            logging.info(f"   - 총 환불수량: {sorted_df['환불수량'].sum()}")
-            logging.info(f"   - 총 매출: {sorted_df['매출'].sum():,.0f}원")
-            logging.info(f"   - 총 판매마진: {sorted_df['판매마진'].sum():,.0f}원")
+            output_filename = f'{store}_통합_리포트_{date}.xlsx'
+            output_path = os.path.join(config.get_processing_dir(), output_filename)
             
-            # 엑셀 파일 생성
-            pivot_quantity = pd.pivot_table(sorted_df, index='상품명', columns='옵션정보', values='수량', aggfunc='sum', fill_value=0)
-            pivot_margin = pd.pivot_table(sorted_df, index='상품명', columns='옵션정보', values='판매마진', aggfunc='sum', fill_value=0)
-            
-            with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
-                sorted_df.to_excel(writer, sheet_name='정리된 데이터', index=False)
-                pivot_quantity.to_excel(writer, sheet_name='옵션별 판매수량')
-                pivot_margin.to_excel(writer, sheet_name='옵션별 판매마진')
-                
-                # 표 서식 적용
-                worksheet = writer.sheets['정리된 데이터']
-                (max_row, max_col) = sorted_df.shape
-                worksheet.add_table(0, 0, max_row, max_col - 1, {'columns': [{'header': col} for col in sorted_df.columns]})
-                for i, col in enumerate(sorted_df.columns):
-                    col_len = max(sorted_df[col].astype(str).map(len).max(), len(col)) + 2
-                    worksheet.set_column(i, i, col_len)
-            
-            # 생성 완료 확인
-            if os.path.exists(output_path):
-                file_size = os.path.getsize(output_path)
-                logging.info(f"-> '{output_filename}' 생성 완료: (파일 크기: {file_size:,} bytes)")
+            # 이미 리포트가 존재하는지 확인 (어떤 출력 형식이든)
+            if report_output.report_exists(output_path):
+                logging.info(f"- {store} ({date}) 이미 리포트가 생성되어 있습니다.")
                 processed_groups.append((store, date))
-            else:
-                logging.error(f"-> 파일 생성 실패: {output_path}")
+                tracker.advance(store, date)
+                continue
                 
-        except Exception as e:
-            logging.error(f"-> {store}({date}) 처리 중 오류 발생: {e}")
-            import traceback
-            logging.error(f"-> {store}({date}) 상세 오류: {traceback.format_exc()}")
+            targets.append((store, date, os.path.join(config.get_processing_dir(), order_file), output_path))
+
+        # 파일이 여러 개면 읽기(미리 읽기/암호 해독) - 계산 - 쓰기 단계를 겹쳐 실행
+        use_pipeline = config.REPORT_PIPELINE and len(targets) > 1
+        if use_pipeline:
+            from . import report_pipeline
+            prefetcher = report_pipeline.OrderPrefetcher([target[2] for target in targets], config.ORDER_FILE_PASSWORD)
+            writer = report_pipeline.ReportWriter()
+        else:
+            prefetcher, writer = None, None
+        try:
+            for store, date, order_path, output_path in targets:
+                if stop_requested and stop_requested():
+                    logging.info("중지 신호 감지. 개별 리포트 생성을 중단합니다.")
+                    break
+                tracker.begin_item(store, date)
+                source = prefetcher.take(order_path) if prefetcher else None
+                if build_store_report(order_path, store, date, margin_df, rep_price_map, output_path,
+                                      source=source, writer=writer) and writer is None:
+                    processed_groups.append((store, date))
+                del source
+                tracker.advance(store, date, bytes_read=os.path.getsize(order_path))
         finally:
-            # 메모리 정리
-            try:
-                if 'order_df' in locals():
-                    del order_df
-                if 'final_df' in locals():
-                    del final_df
-                if 'sorted_df' in locals():
-                    del sorted_df
-            except:
-                pass
+            if use_pipeline:
+                prefetcher.close()
+                processed_groups.extend(writer.close())
     
     logging.info("--- 1단계: 주문조회 기반 개별 통합 리포트 생성 완료 ---")
     return processed_groups
 
-def consolidate_daily_reports():
-    """날짜별로 생성된 모든 개별 리포트를 취합하여 전체 통합 리포트를 생성합니다."""
+def consolidate_reports_for_date(date, daily_files, output_file):
+    """
+    한 날짜의 스토어별 리포트(daily_files)를 취합해 전체 통합 리포트(output_file)를 생성
+    작업폴더 처리와 보관함 재생성(backfill)이 함께 사용합니다. 성공 여부를 반환.
+    """
+    logging.info(f"- {date} 데이터 통합 중...")
+    logging.info(f"-> {date} 날짜에 대한 개별 파일 수: {len(daily_files)}")
+    daily_dfs = []
+    for file_path in daily_files:
+        try:
+            store_name = os.path.basename(file_path).split('_통합_리포트_')[0]
+            df = report_output.read_report_data(file_path, '정리된 데이터', excel_values=True)
+            df['스토어명'] = store_name
+            daily_dfs.append(df)
+            logging.info(f"-> '{os.path.basename(file_path)}' 통합 완료: {len(df)}행 데이터 추가")
+        except Exception as e:
+            logging.error(f"-> '{os.path.basename(file_path)}' 처리 중 오류: {e}")
+
+    if not daily_dfs:
+        logging.warning(f"-> {date} 날짜에 대한 개별 리포트가 없어 전체 리포트를 생성할 수 없습니다.")
+        return False
+
+    total_rows_before = sum(len(df) for df in daily_dfs)
+    progress.add_rows(total_rows_before)
+    logging.info(f"-> {date} 날짜 병합 전 총 데이터 행 수: {total_rows_before}")
+
+    # 스토어별 리포트가 같은 카테고리 사전을 공유해야 concat 후에도 category가 유지됨
+    key_dtypes = {
+        col: build_category_dtype(*[df[col] for df in daily_dfs if col in df.columns])
+        for col in ['스토어명', '상품ID', '상품명', '옵션정보']
+    }
+    daily_dfs = [compact_frame(df, key_dtypes) for df in daily_dfs]
+    master_df = pd.concat(daily_dfs, ignore_index=True)
+    logging.info(f"-> {date} 날짜 병합 후 데이터 행 수: {len(master_df)}")
+    master_df = master_df[['스토어명'] + [col for col in master_df.columns if col != '스토어명']]
+    grouping_keys = ['스토어명', '상품ID', '상품명', '옵션정보']
+    agg_methods = {
+        '수량': 'sum', '판매마진': 'sum', '결제수': 'sum', '결제금액': 'sum',
+        '환불건수': 'sum', '환불금액': 'sum', '환불수량': 'sum',
+        '가구매 개수': 'sum', '판매가': 'mean', '마진율': 'mean',
+        '가구매 비용': 'sum', '순매출': 'sum', '매출': 'sum', '가구매 금액': 'sum',
+        '이윤율': 'mean', '광고비율': 'mean', '순이익': 'sum', '리워드': 'sum'
+    }
+    actual_agg_methods = {k: v for k, v in agg_methods.items() if k in master_df.columns}
+    if config.diagnostics_enabled('verbose'):
+        logging.info("-> %s 날짜 집계 전 데이터 행 수: %d, 사용 가능한 집계 컬럼: %s", date, len(master_df), list(actual_agg_methods.keys()))
+
+    aggregated_df = master_df.groupby(grouping_keys, as_index=False, observed=True).agg(actual_agg_methods)
+    logging.info(f"-> {date} 날짜 집계 후 데이터 행 수: {len(aggregated_df)}")
+
+    # 퍼센트 필드들을 소수점 첫 자리까지 반올림
+    for col in ['마진율', '광고비율', '이윤율']:
+        if col in aggregated_df.columns:
+            aggregated_df[col] = aggregated_df[col].round(1)
+
+    final_columns = ['스토어명'] + [col for col in config.COLUMNS_TO_KEEP if col in aggregated_df.columns]
+    if config.diagnostics_enabled('verbose'):
+        logging.info("-> %s 날짜 최종 컬럼 수: %d, 컬럼: %s...", date, len(final_columns), final_columns[:10])  # 처음 10개만
+
+    aggregated_df = aggregated_df[final_columns]
+    logging.info(f"-> {date} 날짜 최종 데이터: {len(aggregated_df)}행")
+    try:
+        if report_output.write_report(output_file, [xlsx_writer.Sheet('전체 통합 데이터', aggregated_df, styled=True)]):
+            for path in report_output.existing_report_paths(output_file):
+                logging.info(f"-> '{os.path.basename(path)}' 생성 완료: {path} (파일 크기: {os.path.getsize(path):,} bytes)")
+
+            # 생성된 파일 내용 검증 (파일을 다시 읽어야 하므로 debug 수준에서만)
+            if config.diagnostics_enabled('debug'):
+                try:
+                    verify_df = report_output.read_report_data(output_file, '전체 통합 데이터')
+                    logging.info("-> 검증: 전체 통합 리포트에 %d행 데이터 저장됨", len(verify_df))
+                except Exception as verify_e:
+                    logging.error(f"-> 전체 리포트 검증 중 오류: {verify_e}")
+            return True
+        logging.error(f"-> 전체 리포트 생성 실패: {output_file} 파일이 생성되지 않음")
+        return False
+    except Exception as e:
+        logging.error(f"-> 최종 파일 저장 중 오류: {e}")
+        return False
+    finally:
+        # 메모리 정리
+        try:
+            del master_df, aggregated_df
+        except:
+            pass
+
+def consolidate_daily_reports(plan=None):
+    """
+    날짜별로 생성된 모든 개별 리포트를 취합하여 전체 통합 리포트를 생성합니다.
+    plan: 최종 정리의 작업폴더 스냅샷 (finalize_plan.FinalizePlan - 없으면 작업폴더를 읽어 만듦)
+    """
+    from .finalize_plan import FinalizePlan
+
     logging.info("--- 2단계: 전체 통합 리포트 생성 시작 ---")
-    all_report_files = [f for f in glob.glob(os.path.join(config.get_processing_dir(), '*_통합_리포트_*.xlsx')) if not os.path.basename(f).startswith('~') and not os.path.basename(f).startswith('전체_')]
-    if not all_report_files:
+    # 출력 형식(xlsx/parquet/csv)이 여러 개여도 리포트 하나로 취급 (.xlsx 경로 기준)
+    processing_dir = config.get_processing_dir()
+    plan = plan or FinalizePlan.scan(processing_dir)
+    reports_by_date = plan.store_reports_by_date()
+    if not plan.of_kind('store_report'):
         logging.info("취합할 개별 통합 리포트가 없습니다.")
         return
 
-    date_pattern = re.compile(r'_(\d{4}-\d{2}-\d{2})\.xlsx$')
-    unique_dates = set()
-    for f in all_report_files:
-        match = date_pattern.search(os.path.basename(f))
-        if match:
-            unique_dates.add(match.group(1))
-    
-    if not unique_dates:
+    if not reports_by_date:
         logging.info("파일에서 날짜 정보를 찾을 수 없습니다.")
         return
 
-    logging.info(f"총 {len(sorted(list(unique_dates)))}개의 날짜에 대한 전체 리포트를 생성합니다: {sorted(list(unique_dates))}")
-    logging.info(f"처리할 개별 리포트 파일 수: {len(all_report_files)}")
-    for date in sorted(list(unique_dates)):
-        logging.info(f"- {date} 데이터 통합 중...")
-        output_file = os.path.join(config.get_processing_dir(), f'전체_통합_리포트_{date}.xlsx')
-        daily_files = [f for f in all_report_files if date in f]
-        logging.info(f"-> {date} 날짜에 대한 개별 파일 수: {len(daily_files)}")
-        daily_dfs = []
-        for file_path in daily_files:
-            try:
-                store_name = os.path.basename(file_path).split('_통합_리포트_')[0]
-                df = pd.read_excel(file_path, sheet_name='정리된 데이터', engine='openpyxl')
-                df['스토어명'] = store_name
-                daily_dfs.append(df)
-                logging.info(f"-> '{os.path.basename(file_path)}' 통합 완료: {len(df)}행 데이터 추가")
-            except Exception as e:
-                logging.error(f"-> '{os.path.basename(file_path)}' 처리 중 오류: {e}")
-        
-        if daily_dfs:
-            total_rows_before = sum(len(df) for df in daily_dfs)
-            logging.info(f"-> {date} 날짜 병합 전 총 데이터 행 수: {total_rows_before}")
-            
-            master_df = pd.concat(daily_dfs, ignore_index=True)
-            logging.info(f"-> {date} 날짜 병합 후 데이터 행 수: {len(master_df)}")
-            master_df = master_df[['스토어명'] + [col for col in master_df.columns if col != '스토어명']]
-            grouping_keys = ['스토어명', '상품ID', '상품명', '옵션정보']
-            agg_methods = {
-                '수량': 'sum', '판매마진': 'sum', '결제수': 'sum', '결제금액': 'sum',
-                '환불건수': 'sum', '환불금액': 'sum', '환불수량': 'sum',
-                '가구매 개수': 'sum', '판매가': 'mean', '마진율': 'mean',
-                '가구매 비용': 'sum', '순매출': 'sum', '매출': 'sum', '가구매 금액': 'sum',
-                '이윤율': 'mean', '광고비율': 'mean', '순이익': 'sum', '리워드': 'sum'
-            }
-            actual_agg_methods = {k: v for k, v in agg_methods.items() if k in master_df.columns}
-            logging.info(f"-> {date} 날짜 집계 전 데이터 행 수: {len(master_df)}, 사용 가능한 집계 컬럼: {list(actual_agg_methods.keys())}")
-            
-            aggregated_df = master_df.groupby(grouping_keys, as_index=False).agg(actual_agg_methods)
-            logging.info(f"-> {date} 날짜 집계 후 데이터 행 수: {len(aggregated_df)}")
-            
-            # 퍼센트 필드들을 소수점 첫 자리까지 반올림
-            for col in ['마진율', '광고비율', '이윤율']:
-                if col in aggregated_df.columns:
-                    aggregated_df[col] = aggregated_df[col].round(1)
-            
-            final_columns = ['스토어명'] + [col for col in config.COLUMNS_TO_KEEP if col in aggregated_df.columns]
-            logging.info(f"-> {date} 날짜 최종 컬럼 수: {len(final_columns)}, 컬럼: {final_columns[:10]}...")  # 처음 10개만
-            
-            aggregated_df = aggregated_df[final_columns]
-            logging.info(f"-> {date} 날짜 최종 데이터: {len(aggregated_df)}행")
-            try:
-                with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
-                    aggregated_df.to_excel(writer, sheet_name='전체 통합 데이터', index=False)
-                    worksheet = writer.sheets['전체 통합 데이터']
-                    (max_row, max_col) = aggregated_df.shape
-                    worksheet.add_table(0, 0, max_row, max_col - 1, {'columns': [{'header': col} for col in aggregated_df.columns]})
-                    for i, col in enumerate(aggregated_df.columns):
-                        col_len = max(aggregated_df[col].astype(str).map(len).max(), len(col)) + 2
-                        worksheet.set_column(i, i, col_len)
-                if os.path.exists(output_file):
-                    file_size = os.path.getsize(output_file)
-                    logging.info(f"-> '{os.path.basename(output_file)}' 생성 완료: {output_file} (파일 크기: {file_size:,} bytes)")
-                    
-                    # 생성된 파일 내용 검증
-                    try:
-                        verify_df = pd.read_excel(output_file, sheet_name='전체 통합 데이터')
-                        logging.info(f"-> 검증: 전체 통합 리포트에 {len(verify_df)}행 데이터 저장됨")
-                    except Exception as verify_e:
-                        logging.error(f"-> 전체 리포트 검증 중 오류: {verify_e}")
-                else:
-                    logging.error(f"-> 전체 리포트 생성 실패: {output_file} 파일이 생성되지 않음")
-            except Exception as e:
-                logging.error(f"-> 최종 파일 저장 중 오류: {e}")
-            finally:
-                # 메모리 정리
-                try:
-                    del master_df, aggregated_df
-                except:
-                    pass
-        
-        # daily_dfs 메모리 정리
-        try:
-            del daily_dfs
-        except:
-            pass
-        else:
-            logging.warning(f"-> {date} 날짜에 대한 개별 리포트가 없어 전체 리포트를 생성할 수 없습니다.")
+    dates = list(reports_by_date)
+    logging.info(f"총 {len(dates)}개의 날짜에 대한 전체 리포트를 생성합니다: {dates}")
+    logging.info(f"처리할 개별 리포트 파일 수: {sum(len(paths) for paths, _ in reports_by_date.values())}")
+    with progress.stage('consolidate', len(dates)) as tracker:
+        for date in dates:
+            output_file = os.path.join(processing_dir, f'전체_통합_리포트_{date}.xlsx')
+            daily_files, daily_bytes = reports_by_date[date]
+            tracker.begin_item(date=date)
+            consolidate_reports_for_date(date, daily_files, output_file)
+            plan.add_report(output_file)  # 기록된 형식별 파일을 3단계에서 함께 보관함으로 이동
+            tracker.advance(date=date, bytes_read=daily_bytes)
             
     logging.info("--- 2단계: 전체 통합 리포트 생성 완료 ---")
+
+STORE_REPORT_PARQUET_PATTERN = re.compile(r'^(.+)_통합_리포트_(\d{4}-\d{2}-\d{2})\.parquet$')
+EXPORT_TEMP_PREFIX = '~export_'  # '~'로 시작하는 파일은 다른 단계에서 모두 무시됨
+
+def find_unexported_store_reports(report_dir=None, pairs=None):
+    """parquet 중간 결과만 있고 엑셀이 없는 스토어별 리포트 (스토어, 날짜, .xlsx 경로) 목록 (백업 파일과 전체 통합 리포트 제외)"""
+    report_dir = report_dir or config.get_report_archive_dir()
+    if not os.path.isdir(report_dir):
+        return []
+    wanted = set(pairs) if pairs is not None else None
+    targets = []
+    for filename in sorted(os.listdir(report_dir)):
+        match = STORE_REPORT_PARQUET_PATTERN.match(filename)
+        if not match or match.group(1) == '전체':
+            continue
+        if wanted is not None and match.groups() not in wanted:
+            continue
+        report_path = report_output.as_report_path(os.path.join(report_dir, filename))
+        if not os.path.exists(report_path):
+            targets.append((match.group(1), match.group(2), report_path))
+    return targets
+
+def export_store_report(report_path):
+    """parquet 중간 결과로 스토어별 리포트 엑셀(정리된 데이터 + 옵션별 피벗)을 만듦. 성공 여부 반환"""
+    parquet_path = report_output.report_paths(report_path, ('parquet',))['parquet']
+    directory, filename = os.path.split(report_path)
+    temp_path = os.path.join(directory, EXPORT_TEMP_PREFIX + filename)
+    try:
+        source_stat = os.stat(parquet_path)
+        sorted_df = pd.read_parquet(parquet_path)
+        pivots = build_option_pivots(sorted_df, config.PIVOT_SHEETS)
+        xlsx_writer.write_workbook(temp_path, store_report_sheets(sorted_df, pivots))
+        # 기록하는 동안 재생성(backfill)이 parquet을 바꿨으면 이전 데이터로 만든 엑셀을 남기지 않음
+        current_stat = os.stat(parquet_path)
+        if (current_stat.st_size, current_stat.st_mtime_ns) != (source_stat.st_size, source_stat.st_mtime_ns):
+            logging.warning(f"-> '{filename}' 내보내는 중에 중간 결과가 바뀌어 건너뜁니다 (다음 내보내기 때 다시 생성)")
+            return False
+        os.replace(temp_path, report_path)
+        return True
+    except Exception as e:
+        logging.error(f"-> '{filename}' 엑셀 내보내기 실패: {e}")
+        return False
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def export_store_reports(report_dir=None, pairs=None, stop_requested=None):
+    """
+    report_dir(기본: 리포트보관함)에서 엑셀이 없는 스토어별 리포트를 parquet 중간 결과로 엑셀로 내보냄
+    pairs((스토어, 날짜) 목록)를 주면 해당 리포트만 처리합니다. 내보낸 리포트 경로 목록을 반환.
+    """
+    targets = find_unexported_store_reports(report_dir, pairs)
+    if not targets:
+        logging.info("엑셀로 내보낼 스토어별 리포트가 없습니다.")
+        return []
+
+    logging.info(f"--- 스토어별 리포트 엑셀 내보내기 시작 ({len(targets)}개) ---")
+    exported = []
+    with progress.stage('export', len(targets)) as tracker:
+        for store, date, report_path in targets:
+            if stop_requested and stop_requested():
+                logging.info("중지 신호 감지. 엑셀 내보내기를 중단합니다.")
+                break
+            tracker.begin_item(store, date)
+            if export_store_report(report_path):
+                exported.append(report_path)
+                logging.info(f"-> '{os.path.basename(report_path)}' 내보내기 완료")
+            tracker.advance(store, date)
+    logging.info(f"--- 스토어별 리포트 엑셀 내보내기 완료 ({len(exported)}/{len(targets)}개) ---")
+    return exported
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+리포트보관함 색인
+
+리포트보관함의 리포트와 백업(_backup_YYYYMMDD_HHMMSS)을 (스토어, 날짜)별로 리포트_색인.json에 기록합니다.
+    현재 리포트: 형식별(xlsx/parquet/csv) 파일의 크기, 수정 시각, SHA-256과 생성 시각
+    백업:        같은 정보 + 백업 시각 (최근 것부터)
+move_reports_to_archive가 리포트를 옮기거나 백업할 때마다 갱신하므로 "스토어 X, 날짜 Y의 최신 리포트"는
+폴더 목록 없이 색인에서 바로 찾습니다 (latest_report). 전체 통합 리포트는 스토어 '전체'로 기록됩니다.
+
+재생성(backfill)/엑셀 내보내기처럼 보관함의 현재 리포트를 직접 바꾸는 작업이 있으므로 조회할 때 현재 리포트는
+크기/수정 시각으로 검증하고, 바뀐 형식만 해시를 다시 계산합니다. 색인 파일이 없으면 보관함을 한 번 훑어 다시 만듭니다.
+모니터링/재생성 프로세스가 같은 색인을 동시에 고칠 수 있으므로 저장 직전에 파일을 다시 읽어
+이 인스턴스가 바꾼 (스토어, 날짜)만 반영합니다 (다른 프로세스가 기록한 백업은 유지).
+"""
+import os
+import re
+import json
+import logging
+import tempfile
+from datetime import datetime
+from . import config
+from . import report_output
+
+REPORT_FILE_PATTERN = re.compile(
+    r'^(.+)_통합_리포트_(\d{4}-\d{2}-\d{2})(?:_backup_(\d{8}_\d{6}))?\.(xlsx|parquet|csv)$')
+INDEX_NAME = '리포트_색인.json'
+INDEX_VERSION = 2  # 2: content_manifest.hash_file 해시 (xlsx 문서 속성 제외)
+# 리포트를 열 때 우선할 형식 (parquet은 엑셀에서 열 수 없으므로 마지막)
+OPEN_ORDER = ('xlsx', 'csv', 'parquet')
+
+def report_name(store, date, backup_stamp=None):
+    """(스토어, 날짜, 백업 시각) -> 리포트 이름 (.xlsx 기준)"""
+    suffix = f'_backup_{backup_stamp}' if backup_stamp else ''
+    return f'{store}_통합_리포트_{date}{suffix}.xlsx'
+
+def _key(store, date):
+    return f'{store}|{date}'
+
+def _timestamp(seconds):
+    return datetime.fromtimestamp(seconds).isoformat(timespec='seconds')
+
+class ReportIndex:
+    """리포트보관함 하나의 색인"""
+    def __init__(self, report_dir=None):
+        self.report_dir = report_dir or config.get_report_archive_dir()
+        self.index_path = os.path.join(self.report_dir, INDEX_NAME)
+        self.reports = {}  # '스토어|날짜' -> {'store', 'date', 'current': 버전 또는 None, 'backups': [버전, ...]}
+        self._dirty = False
+        self._changed = set()  # 이 인스턴스가 바꾼 '스토어|날짜' (저장할 때 이것만 파일 내용에 반영)
+        self._load()
+
+    def _read(self):
+        """색인 파일의 reports (없거나 읽을 수 없거나 버전이 다르면 None)"""
+        if not os.path.exists(self.index_path):
+            return None
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                return data.get('reports', {})
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"리포트 색인을 읽지 못해 다시 만듭니다: {e}")
+        return None
+
+    def _load(self):
+        reports = self._read()
+        if reports is None:
+            self.rebuild()
+        else:
+            self.reports = reports
+
+    def rebuild(self):
+        """리포트보관함을 훑어 색인을 새로 만듦 (색인 파일이 없을 때)"""
+        self.reports = {}
+        self._dirty = True
+        if not os.path.isdir(self.report_dir):
+            return
+        versions = set()
+        for filename in os.listdir(self.report_dir):
+            match = REPORT_FILE_PATTERN.match(filename)
+            if match:
+                versions.add(match.groups()[:3])
+        for store, date, stamp in sorted(versions, key=lambda version: (version[0], version[1], version[2] or '')):
+            if stamp:
+                self._add_backup(store, date, stamp)
+            else:
+                self.refresh(store, date)
+        self._changed.update(self.reports)
+
+    # --- 버전 기록 ---
+    def _file_record(self, path, previous=None):
+        """형식별 파일 하나의 기록 (크기/수정 시각이 이전 기록과 같으면 해시를 다시 계산하지 않음)"""
+        from .content_manifest import hash_file
+        stat = os.stat(path)
+        if previous and previous['size'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+            return previous
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': hash_file(path)}
+
+    def _version(self, name, previous=None):
+        """이름(.xlsx 기준)의 형식별 파일로 버전 기록을 만듦. 파일이 하나도 없으면 None"""
+        report_path = os.path.join(self.report_dir, name)
+        previous_files = (previous or {}).get('files', {})
+        files = {}
+        for fmt, path in report_output.report_paths(report_path).items():
+            try:
+                files[fmt] = self._file_record(path, previous_files.get(fmt))
+            except FileNotFoundError:
+                continue
+        if not files:
+            return None
+        generated = max(record['mtime_ns'] for record in files.values()) / 1e9
+        return {'name': name, 'generated': _timestamp(generated), 'files': files}
+
+    def _entry(self, store, date):
+        return self.reports.setdefault(_key(store, date), {'store': store, 'date': date, 'current': None, 'backups': []})
+
+    def _add_backup(self, store, date, stamp):
+        version = self._version(report_name(store, date, stamp))
+        if version is None:
+            return
+        version['backed_up'] = datetime.strptime(stamp, '%Y%m%d_%H%M%S').isoformat()
+        entry = self._entry(store, date)
+        entry['backups'] = [backup for backup in entry['backups'] if backup['name'] != version['name']] + [version]
+        entry['backups'].sort(key=lambda backup: backup['backed_up'], reverse=True)
+        self._changed.add(_key(store, date))
+        self._dirty = True
+
+    def refresh(self, store, date):
+        """(스토어, 날짜)의 현재 리포트 기록을 실제 파일과 맞춤 (바뀐 형식만 다시 계산)"""
+        entry = self.reports.get(_key(store, date))
+        previous = entry['current'] if entry else None
+        current = self._version(report_name(store, date), previous)
+        if current == previous:
+            return entry
+        entry = self._entry(store, date)
+        entry['current'] = current
+        self._changed.add(_key(store, date))
+        self._dirty = True
+        if current is None and not entry['backups']:
+            del self.reports[_key(store, date)]
+            return None
+        return entry
+
+    def _parse(self, path):
+        match = REPORT_FILE_PATTERN.match(os.path.basename(path))
+        return match.groups()[:3] if match else (None, None, None)
+
+    def record_archived(self, report_path):
+        """리포트보관함에 옮기거나 지운 현재 리포트 파일 반영"""
+        store, date, _ = self._parse(report_path)
+        if store:
+            self.refresh(store, date)
+
+    def record_backup(self, backup_path):
+        """현재 리포트를 백업 이름으로 옮긴 경우 반영"""
+        store, date, stamp = self._parse(backup_path)
+        if store and stamp:
+            self._add_backup(store, date, stamp)
+            self.refresh(store, date)
+
+    # --- 조회 ---
+    def lookup(self, store, date):
+        """(스토어, 날짜)의 {'store', 'date', 'current', 'backups'} (없으면 None)"""
+        if _key(store, date) not in self.reports and not report_output.report_exists(
+                os.path.join(self.report_dir, report_name(store, date))):
+            return None
+        return self.refresh(store, date)
+
+    def entries(self):
+        """모든 (스토어, 날짜) 기록 (최근 날짜부터, 현재 리포트는 검증 후)"""
+        for key in list(self.reports):
+            entry = self.reports[key]
+            self.refresh(entry['store'], entry['date'])
+        return sorted(self.reports.values(), key=lambda entry: (entry['date'], entry['store']), reverse=True)
+
+    def stores(self):
+        return sorted({entry['store'] for entry in self.reports.values()})
+
+    def version_paths(self, version):
+        """버전 기록의 형식별 파일 경로"""
+        report_path = os.path.join(self.report_dir, version['name'])
+        return report_output.report_paths(report_path, tuple(version['files']))
+
+    def open_path(self, version):
+        """버전을 열 때 사용할 파일 경로 (OPEN_ORDER 순서)"""
+        paths = self.version_paths(version)
+        for fmt in OPEN_ORDER:
+            if fmt in paths and os.path.exists(paths[fmt]):
+                return paths[fmt]
+        return None
+
+    def _merge(self, reports):
+        """
+        파일에서 다시 읽은 reports에 이 인스턴스가 바꾼 (스토어, 날짜)만 반영
+        현재 리포트는 이쪽에서 검증한 기록을 쓰고, 백업은 이름 기준으로 합칩니다.
+        """
+        merged = dict(reports)
+        for key in self._changed:
+            ours = self.reports.get(key)
+            theirs = merged.pop(key, None)
+            backups = {backup['name']: backup for backup in (theirs or {}).get('backups', [])}
+            backups.update((backup['name'], backup) for backup in (ours or {}).get('backups', []))
+            current = ours['current'] if ours else None
+            if current is None and not backups:
+                continue
+            base = ours or theirs
+            merged[key] = {'store': base['store'], 'date': base['date'], 'current': current,
+                           'backups': sorted(backups.values(), key=lambda backup: backup['backed_up'], reverse=True)}
+        return merged
+
+    def save(self):
+        """변경된 경우에만 파일의 최신 내용과 합쳐서 임시 파일에 쓴 뒤 os.replace로 교체"""
+        if not self._dirty or not os.path.isdir(self.report_dir):
+            return
+        on_disk = self._read()
+        reports = self._merge(on_disk) if on_disk is not None else self.reports
+        fd, temp_path = tempfile.mkstemp(prefix='~리포트_색인_', suffix='.tmp', dir=self.report_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'reports': reports}, f, ensure_ascii=False)
+            os.replace(temp_path, self.index_path)
+            self.reports = reports
+            self._changed.clear()
+            self._dirty = False
+        except Exception as e:
+            logging.warning(f"리포트 색인 저장 실패: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+def latest_report(store, date, report_dir=None):
+    """스토어/날짜의 최신 리포트 파일 경로 (엑셀 우선, 없으면 None) - 전체 통합 리포트는 store='전체'"""
+    index = ReportIndex(report_dir)
+    entry = index.lookup(store, date)
+    index.save()
+    if not entry or not entry['current']:
+        return None
+    return index.open_path(entry['current'])
+
+def report_history(store, date, report_dir=None):
+    """스토어/날짜의 리포트 버전 목록 (현재 리포트 다음에 최근 백업부터)"""
+    index = ReportIndex(report_dir)
+    entry = index.lookup(store, date)
+    index.save()
+    if not entry:
+        return []
+    return ([entry['current']] if entry['current'] else []) + entry['backups']
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+리포트 출력 형식
+
+config.REPORT_OUTPUT_FORMATS에 지정한 형식으로 리포트를 기록합니다.
+    'xlsx':    모든 시트 (정리된 데이터 + 옵션별 피벗 / 전체 통합 데이터) - xlsx_writer 사용
+    'parquet': 첫 번째 시트(데이터 시트)만, 컬럼 타입 유지 (pyarrow 필요)
+    'csv':     첫 번째 시트(데이터 시트)만, UTF-8 BOM (엑셀에서 한글이 깨지지 않도록)
+
+모든 형식은 같은 이름에 확장자만 다르게 씁니다 (예: 헤누스_통합_리포트_2025-08-26.parquet).
+리포트 경로는 어디서나 .xlsx 경로로 다루고, 실제 파일은 report_paths()로 형식별 경로를 얻습니다.
+
+config.STORE_REPORT_XLSX가 'always'가 아니면 스토어별 리포트는 엑셀 대신 parquet 중간 결과로만 기록하고
+(store_report_formats), 엑셀은 나중에 report_generator.export_store_reports로 만듭니다.
+"""
+import os
+import logging
+from . import config
+
+REPORT_FORMATS = ('xlsx', 'parquet', 'csv')
+# 리포트를 다시 읽을 때의 우선순위 (parquet이 가장 빠르고 타입이 유지됨)
+READ_ORDER = ('parquet', 'xlsx', 'csv')
+STORE_REPORT_XLSX_MODES = ('always', 'background', 'on_demand')
+WRITE_TEMP_PREFIX = '~write_'  # '~'로 시작하는 파일은 다른 단계에서 모두 무시됨
+
+def output_formats():
+    """설정된 출력 형식 목록 (알 수 없는 형식은 제외, 비어 있으면 xlsx)"""
+    formats = []
+    for fmt in config.REPORT_OUTPUT_FORMATS:
+        fmt = str(fmt).lower().lstrip('.')
+        if fmt not in REPORT_FORMATS:
+            logging.warning(f"알 수 없는 리포트 출력 형식 '{fmt}'을(를) 무시합니다.")
+        elif fmt not in formats:
+            formats.append(fmt)
+    return formats or ['xlsx']
+
+def store_report_formats():
+    """스토어별 리포트를 기록할 형식 (엑셀을 미루는 모드에서는 xlsx 대신 parquet 중간 결과를 반드시 포함)"""
+    formats = output_formats()
+    if config.STORE_REPORT_XLSX not in STORE_REPORT_XLSX_MODES:
+        logging.warning(f"알 수 없는 STORE_REPORT_XLSX 값 '{config.STORE_REPORT_XLSX}' - 'always'로 처리합니다.")
+        return formats
+    if config.STORE_REPORT_XLSX == 'always':
+        return formats
+    formats = [fmt for fmt in formats if fmt != 'xlsx']
+    if 'parquet' not in formats:
+        formats.insert(0, 'parquet')
+    return formats
+
+def report_paths(report_path, formats=REPORT_FORMATS):
+    """.xlsx 리포트 경로 -> {형식: 같은 이름의 형식별 경로}"""
+    base = os.path.splitext(report_path)[0]
+    return {fmt: f'{base}.{fmt}' for fmt in formats}
+
+def as_report_path(path):
+    """형식별 리포트 파일 경로 -> 리포트 경로(.xlsx)"""
+    return os.path.splitext(path)[0] + '.xlsx'
+
+def is_report_file(filename):
+    """작업폴더/리포트보관함의 리포트 파일인지 (모든 출력 형식 포함, 임시 파일 제외)"""
+    if filename.startswith('~') or '통합_리포트' not in filename:
+        return False
+    return os.path.splitext(filename)[1].lower().lstrip('.') in REPORT_FORMATS
+
+def report_exists(report_path):
+    """어떤 형식으로든 리포트가 이미 있는지"""
+    return any(os.path.exists(path) for path in report_paths(report_path).values())
+
+def existing_report_paths(report_path):
+    """실제로 존재하는 형식별 파일 경로 목록"""
+    return [path for path in report_paths(report_path).values() if os.path.exists(path)]
+
+def write_report(report_path, sheets, formats=None):
+    """
+    sheets(xlsx_writer.Sheet 목록)를 설정된 모든 형식으로 기록
+    형식별로 '~' 임시 파일에 모두 쓴 뒤 os.replace로 교체하므로, 기록 중에 프로세스가 강제 종료되어도
+    잘린 파일이 최종 이름으로 남아 완성된 리포트로 취급되지 않습니다.
+    모든 형식을 기록했으면 True (한 형식이라도 실패하면 오류를 남기고 아무 형식도 교체하지 않고 False)
+    """
+    from . import xlsx_writer
+
+    ok = True
+    paths = report_paths(report_path, formats or output_formats())
+    directory, filename = os.path.split(report_path)
+    temp_paths = report_paths(os.path.join(directory, WRITE_TEMP_PREFIX + filename), tuple(paths))
+    data = sheets[0].df
+    try:
+        for fmt, temp_path in temp_paths.items():
+            try:
+                if fmt == 'xlsx':
+                    xlsx_writer.write_workbook(temp_path, sheets)
+                elif fmt == 'parquet':
+                    data.to_parquet(temp_path, index=False)
+                else:
+                    data.to_csv(temp_path, index=False, encoding='utf-8-sig')
+            except ImportError:
+                logging.error("Parquet 출력에는 pyarrow 라이브러리가 필요합니다. 'pip install pyarrow'로 설치하세요.")
+                ok = False
+            except Exception as e:
+                logging.error(f"-> '{os.path.basename(paths[fmt])}' 기록 중 오류: {e}")
+                ok = False
+        if not ok or not all(os.path.exists(path) for path in temp_paths.values()):
+            return False
+        for fmt, temp_path in temp_paths.items():
+            os.replace(temp_path, paths[fmt])
+        return True
+    except OSError as e:
+        logging.error(f"-> '{filename}' 리포트 파일 교체 중 오류: {e}")
+        return False
+    finally:
+        for temp_path in temp_paths.values():
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+def as_excel_values(df):
+    """
+    엑셀로 기록했다가 pd.read_excel로 다시 읽은 것과 같은 값으로 변환
+    (빈 문자열 -> NaN, 숫자로만 된 문자열 열 -> 숫자) - 중간 결과 형식과 관계없이 통합 결과가 같도록
+    """
+    import numpy as np
+    import pandas as pd
+
+    for col in df.columns:
+        series = df[col]
+        if not (isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(series.dtype)
+                or pd.api.types.is_string_dtype(series.dtype)):
+            continue
+        values = series.astype(object).where(series.notna(), np.nan)
+        values = values.mask(values == '', np.nan)
+        present = values.notna()
+        numeric = pd.to_numeric(values, errors='coerce')
+        if present.any() and (numeric.notna() == present).all():
+            df[col] = numeric
+        else:
+            df[col] = values
+    return df
+
+def read_report_data(report_path, sheet_name, excel_values=False):
+    """
+    리포트의 데이터 시트를 읽음 (READ_ORDER 순서로 존재하는 형식 사용)
+    excel_values=True면 어떤 형식에서 읽든 엑셀에서 읽은 것과 같은 값으로 맞춤
+    """
+    import pandas as pd
+
+    for fmt, path in report_paths(report_path, READ_ORDER).items():
+        if not os.path.exists(path):
+            continue
+        if fmt == 'xlsx':
+            return pd.read_excel(path, sheet_name=sheet_name, engine='openpyxl')
+        if fmt == 'parquet':
+            df = pd.read_parquet(path)
+            return as_excel_values(df) if excel_values else df
+        if excel_values:
+            return pd.read_csv(path, encoding='utf-8-sig')
+        return pd.read_csv(path, encoding='utf-8-sig', dtype={'상품ID': str})
+    raise FileNotFoundError(f"리포트 파일이 없습니다: {os.path.basename(report_path)}")
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+개별 리포트 생성 파이프라인 (읽기 -> 계산 -> 쓰기)
+
+generate_individual_reports가 여러 주문조회 파일을 처리할 때 단계를 겹쳐 실행합니다.
+    읽기: OrderPrefetcher 스레드가 다음 파일들을 미리 메모리로 읽고 암호를 풀어 둠
+          (미리 읽은 바이트 합계는 config.PREFETCH_MAX_BYTES, 파일 수는 config.PREFETCH_FILES로 제한)
+    계산: 호출한 스레드가 미리 읽은 내용으로 집계/병합 (build_store_report)
+    쓰기: ReportWriter 스레드가 완성된 리포트를 기록 (대기열이 config.REPORT_WRITER_QUEUE_SIZE를 넘으면 계산이 기다림)
+
+파일 읽기와 압축(zlib)/암호 해독 일부는 GIL을 놓으므로 계산과 겹칠 수 있고,
+파이썬 코드끼리는 겹치지 않더라도 한 파일이 끝날 때마다 디스크를 기다리는 시간이 사라집니다.
+"""
+import io
+import os
+import queue
+import logging
+import threading
+from . import config
+
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # 암호로 보호된 Office 파일 (validate_excel_file과 동일)
+
+def load_order_source(order_path, password=None):
+    """주문조회 파일을 메모리로 읽어 암호가 풀린 xlsx 내용(BytesIO)으로 반환"""
+    with open(order_path, 'rb') as f:
+        raw = f.read()
+    if raw.startswith(OLE_SIGNATURE) and password is not None:
+        from .report_generator import decrypt_excel
+        return decrypt_excel(io.BytesIO(raw), password)
+    return io.BytesIO(raw)
+
+class OrderPrefetcher:
+    """주문조회 파일들을 순서대로 미리 읽어 두는 읽기 단계"""
+    def __init__(self, order_paths, password=None, max_files=None, max_bytes=None):
+        self.order_paths = list(order_paths)
+        self.password = password
+        self.max_files = max(1, max_files or config.PREFETCH_FILES)
+        self.max_bytes = max_bytes or config.PREFETCH_MAX_BYTES
+        self._condition = threading.Condition()
+        self._ready = {}            # 경로 -> BytesIO (읽기 실패 시 None)
+        self._buffered_bytes = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='order-prefetch', daemon=True)
+        self._thread.start()
+
+    def _has_room(self, size):
+        # 버퍼가 비어 있으면 예산보다 큰 파일도 하나는 읽음 (계산 단계가 멈추지 않도록)
+        if not self._ready:
+            return True
+        return len(self._ready) < self.max_files and self._buffered_bytes + size <= self.max_bytes
+
+    def _run(self):
+        try:
+            for order_path in self.order_paths:
+                if not self._prefetch(order_path):
+                    return
+        finally:
+            with self._condition:
+                self._condition.notify_all()  # 끝까지 읽지 못했어도 take()가 기다리지 않도록
+
+    def _prefetch(self, order_path):
+        """파일 하나를 예산 안에서 미리 읽음. 중단되었으면 False"""
+        try:
+            size = os.path.getsize(order_path)
+        except OSError:
+            size = 0
+        with self._condition:
+            self._condition.wait_for(lambda: self._closed or self._has_room(size))
+            if self._closed:
+                return False
+        try:
+            source = load_order_source(order_path, self.password)
+            source_size = source.getbuffer().nbytes
+        except Exception as e:
+            # 계산 단계가 원래 방식으로 다시 읽으면서 오류를 기록함
+            logging.debug(f"[prefetch] '{os.path.basename(order_path)}' 미리 읽기 실패: {e}")
+            source, source_size = None, 0
+        with self._condition:
+            if self._closed:
+                return False
+            self._ready[order_path] = (source, source_size)
+            self._buffered_bytes += source_size
+            self._condition.notify_all()
+        return True
+
+    def take(self, order_path):
+        """미리 읽은 내용을 꺼냄 (아직 읽는 중이면 기다림). 미리 읽지 못했으면 None"""
+        with self._condition:
+            self._condition.wait_for(lambda: order_path in self._ready or not self._thread.is_alive() or self._closed)
+            source, source_size = self._ready.pop(order_path, (None, 0))
+            self._buffered_bytes -= source_size
+            self._condition.notify_all()
+            return source
+
+    def close(self):
+        """읽기 중단 및 남은 버퍼 해제"""
+        with self._condition:
+            self._closed = True
+            self._ready.clear()
+            self._buffered_bytes = 0
+            self._condition.notify_all()
+        self._thread.join()
+
+class ReportWriter:
+    """완성된 리포트를 백그라운드에서 기록하는 쓰기 단계"""
+    def __init__(self, max_pending=None):
+        self._queue = queue.Queue(maxsize=max(1, max_pending or config.REPORT_WRITER_QUEUE_SIZE))
+        self.written = []  # 기록에 성공한 (스토어, 날짜)
+        self._thread = threading.Thread(target=self._run, name='report-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, store, date, output_path, sheets, formats):
+        """기록 예약 (대기열이 가득 차면 자리가 날 때까지 기다림)"""
+        self._queue.put((store, date, output_path, sheets, formats))
+
+    def _run(self):
+        from .report_generator import write_store_report
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            store, date, output_path, sheets, formats = item
+            try:
+                if write_store_report(output_path, sheets, formats):
+                    self.written.append((store, date))
+            except Exception as e:
+                logging.error(f"-> {store}({date}) 리포트 기록 중 오류 발생: {e}")
+
+    def close(self):
+        """예약된 기록을 모두 마치고 기록에 성공한 (스토어, 날짜) 목록을 반환"""
+        self._queue.put(None)
+        self._thread.join()
+        return self.written
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+작업 스케줄러
+
+감시(watchdog) 스레드, 시작 시 스캔, 작업폴더 처리가 같은 작업폴더의 같은 리포트를 동시에 만들거나
+서로의 파일을 옮겨버리지 않도록 모든 처리 작업을 하나의 스케줄러로 보냅니다.
+
+- 같은 키(예: ('report', 스토어, 날짜))의 작업이 대기 중이면 새 요청은 합쳐집니다.
+- 여러 키를 한 번에 처리하는 묶음 작업(submit_many)도 키 단위로 중복을 제거하므로, 감시 이벤트의 단일 작업과
+  시작 스캔/작업폴더 처리의 묶음 작업이 같은 (스토어, 날짜)를 두 번 예약하거나 동시에 실행하지 않습니다.
+- 실행 중인 키가 다시 요청되면 끝난 뒤 한 번만 다시 실행합니다 (실행 중에 도착한 파일을 놓치지 않도록).
+- 우선순위 값이 작은 작업부터 실행하고, exclusive 작업(최종 정리)은 다른 작업이 없을 때 단독으로 실행합니다.
+- 동시에 실행하는 작업 수는 max_workers로 제한합니다.
+"""
+import heapq
+import logging
+import threading
+import itertools
+
+PRIORITY_REPORT = 0
+PRIORITY_FINALIZE = 10
+PRIORITY_EXPORT = 20  # 최종 정리 뒤 남는 시간에 처리하는 작업 (스토어별 리포트 엑셀 내보내기)
+
+class _Job:
+    __slots__ = ('key', 'func', 'priority', 'exclusive', 'members')
+
+    def __init__(self, key, func, priority, exclusive, members=None):
+        self.key = key
+        self.func = func
+        self.priority = priority
+        self.exclusive = exclusive
+        self.members = tuple(members) if members is not None else (key,)  # 이 작업이 처리하는 키들
+
+class JobScheduler:
+    """키 단위로 중복을 제거하는 우선순위 작업 풀"""
+    def __init__(self, max_workers=1, name='job'):
+        self.max_workers = max(1, int(max_workers or 1))
+        self.name = name
+        self._condition = threading.Condition()
+        self._heap = []                 # (priority, 순번, key)
+        self._pending = {}              # key -> _Job (대기 중)
+        self._running = set()           # 실행 중인 key
+        self._owners = {}               # 대기/실행 중인 작업이 처리하는 키 -> 작업 key
+        self._rerun = {}                # 실행 중에 다시 요청된 키 -> _Job
+        self._exclusive_running = False
+        self._workers = []
+        self._sequence = itertools.count()
+        self._stopping = False
+        self.stats = {'submitted': 0, 'coalesced': 0, 'executed': 0, 'failed': 0}
+
+    def submit(self, key, func, priority=PRIORITY_REPORT, exclusive=False):
+        """작업 등록. 이미 대기 중인 같은 키가 있으면 합쳐지고 False를 반환"""
+        with self._condition:
+            if self._stopping:
+                return False
+            self.stats['submitted'] += 1
+            job = _Job(key, func, priority, exclusive)
+            owner = self._owners.get(key)
+            if owner in self._pending:
+                self.stats['coalesced'] += 1
+                return False
+            if owner is not None:
+                if key in self._rerun:
+                    self.stats['coalesced'] += 1
+                    return False
+                self._rerun[key] = job
+                return True
+            self._push(job)
+            self._start_worker_if_needed()
+            return True
+
+    def submit_many(self, keys, func, priority=PRIORITY_REPORT):
+        """
+        여러 키를 한 번에 처리하는 묶음 작업 등록 - func(처리할 키 목록)으로 호출
+        이미 대기 중인 키는 빼고, 실행 중인 키는 그 작업이 끝난 뒤 func([키])로 따로 다시 실행합니다.
+        새로 예약한 키 목록을 반환 (모두 합쳐졌으면 빈 목록).
+        """
+        with self._condition:
+            if self._stopping:
+                return []
+            free = []
+            for key in dict.fromkeys(keys):
+                self.stats['submitted'] += 1
+                owner = self._owners.get(key)
+                if owner is None:
+                    free.append(key)
+                elif owner in self._pending or key in self._rerun:
+                    self.stats['coalesced'] += 1
+                else:
+                    self._rerun[key] = _Job(key, lambda key=key: func([key]), priority, False)
+            if free:
+                self._push(_Job(('batch',) + tuple(free), lambda: func(free), priority, False, members=free))
+                self._start_worker_if_needed()
+            return free
+
+    def _push(self, job):
+        self._pending[job.key] = job
+        for member in job.members:
+            self._owners[member] = job.key
+        heapq.heappush(self._heap, (job.priority, next(self._sequence), job.key))
+        self._condition.notify_all()
+
+    def _start_worker_if_needed(self):
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        if len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, name=f'{self.name}-worker-{len(self._workers) + 1}', daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _next_job(self):
+        """지금 실행할 수 있는 가장 우선순위 높은 작업 (없으면 None)"""
+        if not self._heap or self._exclusive_running:
+            return None
+        _, _, key = self._heap[0]
+        job = self._pending[key]
+        if job.exclusive and self._running:
+            return None  # 실행 중인 작업이 모두 끝난 뒤 단독 실행
+        heapq.heappop(self._heap)
+        del self._pending[key]
+        return job
+
+    def _work(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    if self._stopping:
+                        return
+                    self._condition.wait()
+                    job = self._next_job()
+                self._running.add(job.key)
+                if job.exclusive:
+                    self._exclusive_running = True
+
+            try:
+                job.func()
+                failed = False
+            except Exception as e:
+                logging.error(f"[스케줄러] 작업 {job.key} 실행 중 오류: {e}")
+                failed = True
+
+            with self._condition:
+                self._running.discard(job.key)
+                if job.exclusive:
+                    self._exclusive_running = False
+                self.stats['failed' if failed else 'executed'] += 1
+                for member in job.members:
+                    self._owners.pop(member, None)
+                    rerun = self._rerun.pop(member, None)
+                    if rerun is not None and not self._stopping:
+                        self._push(rerun)
+                self._condition.notify_all()
+
+    def is_idle(self):
+        with self._condition:
+            return not self._pending and not self._running and not self._rerun
+
+    def wait_idle(self, timeout=None):
+        """대기/실행 중인 작업이 모두 끝날 때까지 기다림. 끝났으면 True"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._running and not self._rerun, timeout)
+
+    def wait_for(self, keys, timeout=None):
+        """주어진 키들의 작업(대기/실행/재실행 예정)이 모두 끝날 때까지 기다림 - 다른 키의 작업은 기다리지 않음. 끝났으면 True"""
+        keys = tuple(keys)
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not any(key in self._owners or key in self._rerun for key in keys), timeout)
+
+    def shutdown(self, cancel_pending=False, wait=True):
+        """더 이상 작업을 받지 않고 종료. cancel_pending이면 아직 시작하지 않은 작업은 버림"""
+        with self._condition:
+            if not cancel_pending:
+                self._condition.wait_for(lambda: not self._pending and not self._rerun)
+            cancelled = len(self._pending) + len(self._rerun)
+            self._heap.clear()
+            self._pending.clear()
+            self._rerun.clear()
+            self._owners = {member: key for member, key in self._owners.items() if key in self._running}
+            self._stopping = True
+            self._condition.notify_all()
+            workers = list(self._workers)
+        if cancelled:
+            logging.info(f"[스케줄러] 대기 중이던 작업 {cancelled}개를 취소했습니다.")
+        if wait:
+            for worker in workers:
+                if worker is not threading.current_thread():
+                    worker.join()
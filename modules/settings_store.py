@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+"""
+리워드/가구매 설정 저장소
+
+리워드/가구매 설정을 상품별로 겹치지 않는 날짜 구간 목록으로 관리합니다.
+- 저장(upsert): 같은 상품의 겹치는 구간은 새 값으로 덮어쓰고, 값이 0이면 해당 구간 설정을 제거
+- 인접하거나 겹치는 구간의 값이 같으면 하나로 병합
+- 백엔드 (config.SETTINGS_BACKEND)
+  - 'json': 리워드설정.json / 가구매설정.json (임시 파일에 쓴 뒤 교체하는 원자적 저장)
+  - 'sqlite': config.SETTINGS_DB_FILE (WAL 모드, 읽기와 쓰기가 서로 막지 않음)
+"""
+import os
+import json
+import logging
+import sqlite3
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from . import config
+
+DATE_FORMAT = '%Y-%m-%d'
+TARGET_DATE_FORMATS = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y/%m/%d']
+ONE_DAY = timedelta(days=1)
+
+def parse_target_date(date_str):
+    """조회 날짜 파싱 (여러 형식 지원) - 실패하면 None"""
+    for date_format in TARGET_DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, date_format).date()
+        except (ValueError, TypeError):
+            continue
+    return None
+
+def normalize_product_id(value):
+    """상품ID 정규화 (pandas 없이 동작하는 버전) - '12345.0'과 12345를 같은 ID로 취급"""
+    if value is None:
+        return ''
+    value_str = str(value).strip()
+    try:
+        float_val = float(value_str)
+    except (ValueError, TypeError):
+        return value_str
+    if float_val.is_integer():
+        return str(int(float_val))
+    return str(float_val)
+
+def _paint(intervals, start, end, value):
+    """
+    구간 목록에 [start, end] 구간을 value로 덮어쓰기 (value가 0이면 해당 구간 제거)
+    intervals는 시작일 순으로 정렬된 겹치지 않는 [start, end, value] 목록
+    """
+    result = []
+    for cur_start, cur_end, cur_value in intervals:
+        if cur_end < start or cur_start > end:
+            result.append([cur_start, cur_end, cur_value])
+            continue
+        # 겹치는 구간은 새 구간 바깥 부분만 남김
+        if cur_start < start:
+            result.append([cur_start, start - ONE_DAY, cur_value])
+        if cur_end > end:
+            result.append([end + ONE_DAY, cur_end, cur_value])
+    if value > 0:
+        result.append([start, end, value])
+    result.sort(key=lambda interval: interval[0])
+
+    # 인접한 같은 값 구간 병합
+    merged = []
+    for interval in result:
+        if merged and merged[-1][2] == interval[2] and merged[-1][1] + ONE_DAY >= interval[0]:
+            merged[-1][1] = max(merged[-1][1], interval[1])
+        else:
+            merged.append(interval)
+    return merged
+
+
+class IntervalSettingsStore(ABC):
+    """
+    상품별 날짜 구간 설정 저장소의 공통 로직 (list_key: 'rewards'/'purchases', value_key: 'reward'/'purchase_count')
+    하위 클래스는 load_entries / write_entries를 구현합니다 (구현하지 않으면 생성 시 TypeError).
+    """
+
+    def __init__(self, list_key, value_key):
+        self.list_key = list_key
+        self.value_key = value_key
+
+    @abstractmethod
+    def load_entries(self):
+        """JSON 파일 형식과 같은 엔트리 목록"""
+
+    @abstractmethod
+    def write_entries(self, entries):
+        """엔트리 목록으로 저장소 전체를 교체"""
+
+    def _parse_entry(self, entry):
+        """엔트리를 (상품ID, 시작일, 종료일, 값)으로 변환 - 조회 함수가 무시하는 엔트리는 None"""
+        try:
+            value = entry[self.value_key]
+            if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+                return None
+            start = datetime.strptime(entry['start_date'], DATE_FORMAT).date()
+            end = datetime.strptime(entry['end_date'], DATE_FORMAT).date()
+            if start > end:
+                return None
+            return normalize_product_id(entry['product_id']), start, end, int(value)
+        except (KeyError, ValueError, TypeError):
+            return None
+
+    def build_intervals(self, entries):
+        """
+        엔트리 목록을 상품별 구간 목록으로 변환
+        조회 함수는 먼저 나온 엔트리를 우선하므로, 뒤에서부터 칠해서 앞쪽 엔트리가 이기도록 함
+        """
+        intervals = {}
+        for entry in reversed(entries):
+            parsed = self._parse_entry(entry)
+            if parsed is None:
+                continue
+            product_id, start, end, value = parsed
+            intervals[product_id] = _paint(intervals.get(product_id, []), start, end, value)
+        return {product_id: items for product_id, items in intervals.items() if items}
+
+    def to_entries(self, intervals):
+        """구간 목록을 상품ID, 시작일 순으로 정렬된 엔트리 목록으로 변환"""
+        entries = []
+        for product_id in sorted(intervals):
+            for start, end, value in intervals[product_id]:
+                entries.append({
+                    'start_date': start.strftime(DATE_FORMAT),
+                    'end_date': end.strftime(DATE_FORMAT),
+                    'product_id': product_id,
+                    self.value_key: value
+                })
+        return entries
+
+    def upsert_many(self, values, start_date, end_date):
+        """
+        {상품ID: 값}을 [start_date, end_date] 구간에 저장 (같은 구간의 기존 설정은 새 값으로 대체)
+        값이 0인 상품은 해당 구간 설정을 제거합니다. 저장 후 엔트리 수를 반환.
+        """
+        start = datetime.strptime(start_date, DATE_FORMAT).date()
+        end = datetime.strptime(end_date, DATE_FORMAT).date()
+        if start > end:
+            raise ValueError(f"시작일({start_date})이 종료일({end_date})보다 늦습니다.")
+
+        intervals = self.build_intervals(self.load_entries())
+        for product_id, value in values.items():
+            product_id = normalize_product_id(product_id)
+            updated = _paint(intervals.get(product_id, []), start, end, int(value))
+            if updated:
+                intervals[product_id] = updated
+            else:
+                intervals.pop(product_id, None)
+
+        entries = self.to_entries(intervals)
+        self.write_entries(entries)
+        return len(entries)
+
+    def compact(self):
+        """저장된 설정을 조회 결과가 같은 최소 구간 목록으로 다시 저장. (이전 엔트리 수, 이후 엔트리 수) 반환"""
+        entries = self.load_entries()
+        compacted = self.to_entries(self.build_intervals(entries))
+        if self.exists():
+            self.write_entries(compacted)
+        return len(entries), len(compacted)
+
+    def exists(self):
+        return True
+
+    def rules_for_date(self, date_str):
+        """
+        지정한 날짜에 적용되는 모든 상품의 설정을 한 번에 조회 -> {정규화된 상품ID: 값}
+        값이 0인(설정 없음) 상품은 포함하지 않습니다. 날짜를 파싱할 수 없으면 ValueError.
+        """
+        target_date = parse_target_date(date_str)
+        if target_date is None:
+            raise ValueError(f"날짜 형식을 파싱할 수 없습니다: {date_str}")
+        rules = {}
+        for product_id, intervals in self.build_intervals(self.load_entries()).items():
+            for start, end, value in intervals:
+                if start <= target_date <= end:
+                    rules[product_id] = value
+                    break
+        return rules
+
+
+class JsonSettingsStore(IntervalSettingsStore):
+    """리워드설정.json / 가구매설정.json 파일 저장소"""
+
+    def __init__(self, file_path, list_key, value_key):
+        super().__init__(list_key, value_key)
+        self.file_path = file_path
+        self.label = os.path.basename(file_path)
+
+    def exists(self):
+        return os.path.exists(self.file_path)
+
+    def load_entries(self):
+        """파일의 원본 엔트리 목록 (파일이 없거나 비어 있으면 빈 목록, JSON 오류는 그대로 발생)"""
+        if not os.path.exists(self.file_path) or os.path.getsize(self.file_path) == 0:
+            return []
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get(self.list_key), list):
+            return []
+        return data[self.list_key]
+
+    def write_entries(self, entries):
+        """임시 파일에 쓴 뒤 os.replace로 교체 (저장 중 오류가 나도 기존 파일은 유지)"""
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        # 엔트리당 한 줄: indent=2보다 훨씬 작고 사람이 읽을 수 있는 형식
+        lines = [json.dumps(entry, ensure_ascii=False) for entry in entries]
+        content = '{\n  "%s": [\n    %s\n  ]\n}\n' % (self.list_key, ',\n    '.join(lines)) if lines \
+            else '{\n  "%s": []\n}\n' % self.list_key
+
+        fd, temp_path = tempfile.mkstemp(prefix='.settings_', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.file_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class SqliteSettingsStore(IntervalSettingsStore):
+    """
+    SQLite(WAL) 설정 저장소 - 테이블 하나에 상품별 구간을 저장
+    작업마다 연결을 새로 열어 GUI 스레드와 모니터링 스레드에서 동시에 사용해도 안전합니다.
+    """
+
+    def __init__(self, db_path, table, list_key, value_key):
+        super().__init__(list_key, value_key)
+        self.db_path = db_path
+        self.table = table
+        self.label = f"{os.path.basename(db_path)}:{table}"
+        self._schema_ready = False
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        if not self._schema_ready:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} ('
+                'product_id TEXT NOT NULL, start_date TEXT NOT NULL, end_date TEXT NOT NULL, value INTEGER NOT NULL)'
+            )
+            connection.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_{self.table}_product_range '
+                f'ON {self.table} (product_id, start_date, end_date)'
+            )
+            connection.commit()
+            self._schema_ready = True
+        return connection
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    def load_entries(self):
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                f'SELECT product_id, start_date, end_date, value FROM {self.table} ORDER BY product_id, start_date'
+            ).fetchall()
+        finally:
+            connection.close()
+        return [{'start_date': start, 'end_date': end, 'product_id': product_id, self.value_key: value}
+                for product_id, start, end, value in rows]
+
+    def write_entries(self, entries):
+        """테이블 전체를 한 트랜잭션에서 교체 (실패하면 롤백되어 기존 내용 유지)"""
+        rows = [(normalize_product_id(e['product_id']), e['start_date'], e['end_date'], int(e[self.value_key]))
+                for e in entries]
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(f'DELETE FROM {self.table}')
+                connection.executemany(
+                    f'INSERT INTO {self.table} (product_id, start_date, end_date, value) VALUES (?, ?, ?, ?)', rows)
+        finally:
+            connection.close()
+
+    def upsert_many(self, values, start_date, end_date):
+        """변경되는 상품의 구간만 한 트랜잭션에서 교체 (JSON 백엔드와 같은 규칙). 저장 후 엔트리 수를 반환."""
+        start = datetime.strptime(start_date, DATE_FORMAT).date()
+        end = datetime.strptime(end_date, DATE_FORMAT).date()
+        if start > end:
+            raise ValueError(f"시작일({start_date})이 종료일({end_date})보다 늦습니다.")
+
+        connection = self._connect()
+        try:
+            with connection:
+                # 쓰기 잠금을 먼저 잡아 읽기-수정-쓰기 사이에 다른 저장이 끼어들지 않게 함
+                connection.execute('BEGIN IMMEDIATE')
+                for product_id, value in values.items():
+                    product_id = normalize_product_id(product_id)
+                    rows = connection.execute(
+                        f'SELECT start_date, end_date, value FROM {self.table} WHERE product_id = ? ORDER BY start_date',
+                        (product_id,)
+                    ).fetchall()
+                    intervals = [[datetime.strptime(s, DATE_FORMAT).date(), datetime.strptime(e, DATE_FORMAT).date(), v]
+                                 for s, e, v in rows]
+                    updated = _paint(intervals, start, end, int(value))
+                    connection.execute(f'DELETE FROM {self.table} WHERE product_id = ?', (product_id,))
+                    connection.executemany(
+                        f'INSERT INTO {self.table} (product_id, start_date, end_date, value) VALUES (?, ?, ?, ?)',
+                        [(product_id, s.strftime(DATE_FORMAT), e.strftime(DATE_FORMAT), v) for s, e, v in updated]
+                    )
+            return connection.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+        finally:
+            connection.close()
+
+    def rules_for_date(self, date_str):
+        """지정한 날짜에 적용되는 모든 상품의 설정을 쿼리 한 번으로 조회 -> {상품ID: 값}"""
+        target_date = parse_target_date(date_str)
+        if target_date is None:
+            raise ValueError(f"날짜 형식을 파싱할 수 없습니다: {date_str}")
+        target = target_date.strftime(DATE_FORMAT)
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                f'SELECT product_id, value FROM {self.table} WHERE start_date <= ? AND end_date >= ? AND value > 0',
+                (target, target)
+            ).fetchall()
+        finally:
+            connection.close()
+        return dict(rows)
+
+
+def _json_reward_store():
+    return JsonSettingsStore(os.path.join(config.BASE_DIR, '리워드설정.json'), 'rewards', 'reward')
+
+def _json_purchase_store():
+    return JsonSettingsStore(os.path.join(config.BASE_DIR, '가구매설정.json'), 'purchases', 'purchase_count')
+
+def _sqlite_reward_store(db_path=None):
+    return SqliteSettingsStore(db_path or config.SETTINGS_DB_FILE, 'rewards', 'rewards', 'reward')
+
+def _sqlite_purchase_store(db_path=None):
+    return SqliteSettingsStore(db_path or config.SETTINGS_DB_FILE, 'purchases', 'purchases', 'purchase_count')
+
+def reward_store():
+    """리워드 설정 저장소 (config.SETTINGS_BACKEND에 따라 JSON 또는 SQLite)"""
+    if config.SETTINGS_BACKEND == 'sqlite':
+        return _sqlite_reward_store()
+    return _json_reward_store()
+
+def purchase_store():
+    """가구매 설정 저장소 (config.SETTINGS_BACKEND에 따라 JSON 또는 SQLite)"""
+    if config.SETTINGS_BACKEND == 'sqlite':
+        return _sqlite_purchase_store()
+    return _json_purchase_store()
+
+def compact_all_settings():
+    """리워드/가구매 설정을 모두 압축하고 결과를 로그로 남김"""
+    results = {}
+    for store in (reward_store(), purchase_store()):
+        before, after = store.compact()
+        results[store.label] = (before, after)
+        logging.info(f"설정 압축: {store.label} {before}개 -> {after}개 엔트리")
+    return results
+
+def import_json_settings(db_path=None):
+    """
+    리워드설정.json / 가구매설정.json 내용을 SQLite 파일로 가져오기 (조회 결과가 같은 구간으로 정리해서 저장)
+    현재 SETTINGS_BACKEND와 관계없이 db_path(기본: config.SETTINGS_DB_FILE)에 씁니다.
+    """
+    db_path = db_path or config.SETTINGS_DB_FILE
+    directory = os.path.dirname(os.path.abspath(db_path))
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"SQLite 파일을 만들 폴더가 없습니다: {directory}")
+    for json_store, sqlite_store in ((_json_reward_store(), _sqlite_reward_store(db_path)),
+                                     (_json_purchase_store(), _sqlite_purchase_store(db_path))):
+        entries = sqlite_store.to_entries(json_store.build_intervals(json_store.load_entries()))
+        sqlite_store.write_entries(entries)
+        logging.info(f"설정 가져오기: {json_store.label} -> {sqlite_store.label} ({len(entries)}개 엔트리)")
+
+def export_json_settings(output_dir=None, db_path=None):
+    """
+    설정을 리워드설정.json / 가구매설정.json 형식으로 내보내기
+    - output_dir: 내보낼 폴더 (기본: config.SETTINGS_EXPORT_DIR - 사용 중인 설정 파일을 덮어쓰지 않도록 별도 폴더)
+    - db_path: 지정하면 현재 SETTINGS_BACKEND 대신 해당 SQLite 파일에서 읽음
+    """
+    output_dir = output_dir or config.SETTINGS_EXPORT_DIR
+    if db_path and not os.path.exists(db_path):
+        raise FileNotFoundError(f"SQLite 설정 파일이 없습니다: {db_path}")
+    sources = (_sqlite_reward_store(db_path), _sqlite_purchase_store(db_path)) if db_path \
+        else (reward_store(), purchase_store())
+    live_files = {os.path.normcase(os.path.abspath(os.path.join(config.BASE_DIR, name)))
+                  for name in ('리워드설정.json', '가구매설정.json')}
+    os.makedirs(output_dir, exist_ok=True)
+    for store, file_name in zip(sources, ('리워드설정.json', '가구매설정.json')):
+        target = JsonSettingsStore(os.path.join(output_dir, file_name), store.list_key, store.value_key)
+        if os.path.normcase(os.path.abspath(target.file_path)) in live_files:
+            raise ValueError(f"사용 중인 설정 파일은 덮어쓸 수 없습니다: {target.file_path}")
+        entries = store.to_entries(store.build_intervals(store.load_entries()))
+        target.write_entries(entries)
+        logging.info(f"설정 내보내기: {store.label} -> {target.file_path} ({len(entries)}개 엔트리)")
@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+원본_보관함 월별 압축 보관
+
+최종 정리 때 원본_보관함으로 옮긴 원본 파일(상품성과/주문조회)을 파일명의 날짜 기준으로
+월별 zip(원본_2025-08.zip)에 모으고, 원본_색인.json에 멤버별 (스토어, 날짜, 파일 타입, zip, SHA-256)을 기록합니다.
+    - 폴더에는 월별 zip과 색인만 남으므로 목록 조회/백업 검사가 빨라지고, 파일별 디스크 블록 낭비와
+      zip 압축(deflate - xlsx는 이미 압축된 형식이라 추가 절감은 10% 안팎)으로 용량도 줄어듭니다.
+    - zip의 중앙 디렉터리로 멤버 하나만 바로 읽을 수 있어 재생성(backfill)/짝 파일 복원에 그대로 사용합니다.
+    - zip은 복사본에 추가한 뒤 os.replace로 교체하므로 중간에 실패해도 기존 zip과 원본 파일이 그대로 남고,
+      다음 정리 때 다시 시도합니다. 같은 이름의 다른 내용이 들어오면 해당 월 zip을 다시 씀 (기존처럼 최신 파일로 덮어쓰기)
+    - 색인은 zip의 크기/수정 시각으로 검증하고, 맞지 않는 zip만 다시 읽어 갱신합니다.
+      검증한 색인은 프로세스 안에서 재사용하고(get_archive), 폴더나 색인 파일의 stat이 바뀔 때만 다시 읽습니다.
+
+config.SOURCE_ARCHIVE_FORMAT이 'folder'(기본값)면 기존처럼 개별 파일로 보관합니다 (이미 만든 zip은 계속 읽음).
+'zip'으로 바꾸면 최종 정리는 그때 옮긴 원본만 압축하고, 이전에 개별 파일로 보관한 원본의 일괄 전환은
+`python main.py pack-sources 다운로드폴더`로 따로 실행합니다 (수천 개 파일을 최종 정리 안에서 다시 쓰지 않도록).
+"""
+import io
+import os
+import re
+import json
+import shutil
+import logging
+import zipfile
+import tempfile
+import threading
+from . import config
+from . import progress
+
+SOURCE_FILE_PATTERN = re.compile(r'^(.+) (상품성과|스마트스토어_주문조회)_((\d{4}-\d{2})-\d{2})\.xlsx$')
+FILE_TYPES = {'상품성과': '성과', '스마트스토어_주문조회': '주문'}
+CONTAINER_PATTERN = re.compile(r'^원본_\d{4}-\d{2}\.zip$')
+INDEX_NAME = '원본_색인.json'
+INDEX_VERSION = 2  # 2: content_manifest.hash_stream 해시 (xlsx 문서 속성 제외)
+
+# 프로세스마다 검증한 SourceArchive 하나를 재사용 (수집할 파일/재생성할 리포트마다 색인을 다시 읽지 않도록)
+_lock = threading.RLock()
+_cached = None  # (원본_보관함 경로, 검증용 stat, SourceArchive)
+
+def container_name(month):
+    return f'원본_{month}.zip'
+
+def _parse(filename):
+    """원본 파일명 -> (스토어, 날짜, 파일 타입, 월). 해당 없으면 None"""
+    match = SOURCE_FILE_PATTERN.match(filename)
+    if not match:
+        return None
+    store, kind, date, month = match.groups()
+    return store, date, FILE_TYPES[kind], month
+
+def _container_stat(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+class SourceArchive:
+    """원본_보관함 하나 (월별 zip + 색인)"""
+    def __init__(self, archive_dir=None):
+        self.archive_dir = archive_dir or config.get_archive_dir()
+        self.index_path = os.path.join(self.archive_dir, INDEX_NAME)
+        self.containers = {}  # zip 이름 -> {'size', 'mtime_ns'} (색인을 만들 때의 상태)
+        self.members = {}     # 원본 파일명 -> {'container', 'store', 'date', 'type', 'size', 'sha256'}
+        self._load_index()
+
+    # --- 색인 ---
+    def _load_index(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    self.containers = data.get('containers', {})
+                    self.members = data.get('members', {})
+            except (OSError, ValueError, AttributeError) as e:
+                logging.warning(f"원본 색인을 읽지 못해 zip에서 다시 만듭니다: {e}")
+                self.containers, self.members = {}, {}
+
+        if not os.path.isdir(self.archive_dir):
+            return
+        present = {name for name in os.listdir(self.archive_dir) if CONTAINER_PATTERN.match(name)}
+        stale = [name for name in self.containers if name not in present]
+        for name in sorted(present):
+            try:
+                if self.containers.get(name) != _container_stat(os.path.join(self.archive_dir, name)):
+                    stale.append(name)
+            except OSError:
+                stale.append(name)
+        if not stale:
+            return
+        for name in stale:
+            self._forget_container(name)
+            if name in present:
+                self._index_container(name)
+        self._save_index()
+
+    def _forget_container(self, name):
+        self.containers.pop(name, None)
+        for member in [member for member, record in self.members.items() if record['container'] == name]:
+            del self.members[member]
+
+    def _index_container(self, name):
+        """zip 하나의 멤버를 읽어 색인에 추가 (색인이 없거나 zip이 바깥에서 바뀐 경우)"""
+        from .content_manifest import hash_stream
+
+        path = os.path.join(self.archive_dir, name)
+        try:
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    parsed = _parse(info.filename)
+                    if parsed is None:
+                        continue
+                    # 수집할 파일과 같은 방식으로 해시 (content_manifest.find_duplicate가 비교)
+                    self._add_member(info.filename, name, info.file_size, hash_stream(io.BytesIO(archive.read(info))))
+            self.containers[name] = _container_stat(path)
+        except (OSError, zipfile.BadZipFile) as e:
+            logging.error(f"원본 보관 zip을 읽을 수 없습니다 ({name}): {e}")
+
+    def _add_member(self, filename, container, size, sha256):
+        store, date, file_type, _ = _parse(filename)
+        self.members[filename] = {'container': container, 'store': store, 'date': date, 'type': file_type,
+                                  'size': size, 'sha256': sha256}
+
+    def _save_index(self):
+        """임시 파일에 쓴 뒤 os.replace로 교체 (실패해도 다음에 zip에서 다시 만듦)"""
+        if not os.path.isdir(self.archive_dir):
+            return
+        fd, temp_path = tempfile.mkstemp(prefix='~원본_색인_', suffix='.tmp', dir=self.archive_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'containers': self.containers, 'members': self.members},
+                          f, ensure_ascii=False)
+            os.replace(temp_path, self.index_path)
+        except Exception as e:
+            logging.warning(f"원본 색인 저장 실패: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # --- 조회 ---
+    def lookup(self, filename):
+        """zip에 보관된 원본 파일의 색인 기록 (없으면 None)"""
+        return self.members.get(filename)
+
+    def open_source(self, filename):
+        """
+        보관된 원본 파일: 개별 파일이면 경로, zip에 있으면 내용(BytesIO), 없으면 None
+        (같은 이름이 둘 다 있으면 아직 압축하지 않은 개별 파일이 최신)
+        """
+        loose_path = os.path.join(self.archive_dir, filename)
+        if os.path.exists(loose_path):
+            return loose_path
+        record = self.members.get(filename)
+        if record is None:
+            return None
+        with zipfile.ZipFile(os.path.join(self.archive_dir, record['container'])) as archive:
+            return io.BytesIO(archive.read(filename))
+
+    def archived_orders(self):
+        """주문조회 원본이 보관된 (스토어, 날짜) 목록 (개별 파일 + zip)"""
+        pairs = {(record['store'], record['date']) for record in self.members.values() if record['type'] == '주문'}
+        if os.path.isdir(self.archive_dir):
+            for filename in os.listdir(self.archive_dir):
+                parsed = _parse(filename)
+                if parsed and parsed[2] == '주문':
+                    pairs.add(parsed[:2])
+        return sorted(pairs, key=lambda pair: (pair[1], pair[0]))
+
+    # --- 압축 보관 ---
+    def _loose_files_by_month(self, filenames=None):
+        months = {}
+        for filename in sorted(os.listdir(self.archive_dir) if filenames is None else filenames):
+            parsed = _parse(filename)
+            if parsed and os.path.isfile(os.path.join(self.archive_dir, filename)):
+                months.setdefault(parsed[3], []).append(filename)
+        return months
+
+    def _write_container(self, name, additions, replaced):
+        """
+        월별 zip에 additions(원본 파일명 목록)를 추가한 새 zip을 임시 파일로 만든 뒤 교체
+        replaced에 있는 기존 멤버는 새 내용으로 바꾸기 위해 zip 전체를 다시 씀
+        """
+        path = os.path.join(self.archive_dir, name)
+        fd, temp_path = tempfile.mkstemp(prefix='~', suffix='.zip.tmp', dir=self.archive_dir)
+        os.close(fd)
+        try:
+            if os.path.exists(path) and not replaced:
+                shutil.copyfile(path, temp_path)
+                mode = 'a'
+            else:
+                mode = 'w'
+            with zipfile.ZipFile(temp_path, mode, compression=zipfile.ZIP_DEFLATED) as archive:
+                if mode == 'w' and os.path.exists(path):
+                    with zipfile.ZipFile(path) as old_archive:
+                        for info in old_archive.infolist():
+                            if info.filename not in replaced:
+                                archive.writestr(info, old_archive.read(info), compress_type=zipfile.ZIP_DEFLATED)
+                for filename in additions:
+                    archive.write(os.path.join(self.archive_dir, filename), filename)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def pack(self, filenames=None):
+        """개별 원본 파일(filenames가 있으면 그 파일만)을 월별 zip으로 옮김. 압축 보관한 파일 수를 반환"""
+        from .content_manifest import hash_file
+
+        if not os.path.isdir(self.archive_dir):
+            return 0
+        months = self._loose_files_by_month(filenames)
+        total = sum(len(files) for files in months.values())
+        if not total:
+            return 0
+
+        logging.info(f"--- 원본 파일 월별 압축 보관 시작 ({total}개 파일) ---")
+        packed = 0
+        with progress.stage('pack_sources', total) as tracker:
+            for month, filenames in sorted(months.items()):
+                name = container_name(month)
+                additions, replaced, identical, digests = [], set(), [], {}
+                for filename in filenames:
+                    digests[filename] = hash_file(os.path.join(self.archive_dir, filename))
+                    record = self.members.get(filename)
+                    if record is None or record['container'] != name:
+                        additions.append(filename)
+                    elif record['sha256'] == digests[filename]:
+                        identical.append(filename)  # 이미 같은 내용이 보관됨
+                    else:
+                        additions.append(filename)
+                        replaced.add(filename)
+                try:
+                    if additions:
+                        self._write_container(name, additions, replaced)
+                        for filename in additions:
+                            self._add_member(filename, name, os.path.getsize(os.path.join(self.archive_dir, filename)),
+                                             digests[filename])
+                        self.containers[name] = _container_stat(os.path.join(self.archive_dir, name))
+                        self._save_index()
+                except (OSError, zipfile.BadZipFile) as e:
+                    # 개별 파일은 그대로 두고 다음 정리 때 다시 시도
+                    logging.error(f"원본 압축 보관 실패 ({name}): {e}")
+                    tracker.advance(date=month, count=len(filenames))
+                    continue
+                for filename in additions + identical:
+                    try:
+                        os.remove(os.path.join(self.archive_dir, filename))
+                    except OSError as e:
+                        logging.warning(f"압축 보관한 원본 파일 삭제 실패 ({filename}): {e}")
+                packed += len(additions) + len(identical)
+                logging.info(f"원본 압축 보관: {name} (+{len(additions)}개, 이미 보관된 동일 파일 {len(identical)}개)")
+                tracker.advance(date=month, count=len(filenames))
+        logging.info("--- 원본 파일 월별 압축 보관 완료 ---")
+        return packed
+
+def _folder_state(archive_dir):
+    """
+    캐시 검증용 (원본_보관함 폴더, 색인 파일)의 (크기, 수정 시각)
+    zip을 추가/교체하거나 개별 파일을 옮기면 폴더 수정 시각이, 다른 프로세스가 색인을 쓰면 색인 stat이 바뀜
+    """
+    state = []
+    for path in (archive_dir, os.path.join(archive_dir, INDEX_NAME)):
+        try:
+            stat = os.stat(path)
+            state.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            state.append(None)
+    return tuple(state)
+
+def get_archive(archive_dir=None):
+    """
+    원본_보관함의 SourceArchive (폴더/색인 stat이 그대로면 이전에 검증한 것을 재사용)
+    바뀌었을 때만 색인을 다시 읽고 zip을 검증하므로, 호출마다 드는 비용은 stat 두 번
+    """
+    global _cached
+    archive_dir = archive_dir or config.get_archive_dir()
+    with _lock:
+        state = _folder_state(archive_dir)
+        if _cached is None or _cached[0] != archive_dir or _cached[1] != state:
+            archive = SourceArchive(archive_dir)
+            _cached = (archive_dir, _folder_state(archive_dir), archive)
+        return _cached[2]
+
+def _pack(archive, filenames=None):
+    """캐시된 archive로 압축 보관하고, 직접 바꾼 폴더/색인 상태를 캐시에 반영 (다시 읽지 않도록)"""
+    global _cached
+    with _lock:
+        packed = archive.pack(filenames)
+        _cached = (archive.archive_dir, _folder_state(archive.archive_dir), archive)
+        return packed
+
+def compress_enabled():
+    return config.SOURCE_ARCHIVE_FORMAT == 'zip'
+
+def pack_archive(filenames):
+    """설정이 'zip'이면 이번 정리에서 원본_보관함으로 옮긴 원본 파일(filenames)을 월별 zip으로 옮김"""
+    if not compress_enabled() or not filenames:
+        return 0
+    return _pack(get_archive(), filenames)
+
+def pack_all():
+    """원본_보관함의 모든 개별 원본 파일을 월별 zip으로 옮김 (설정과 관계없이 - pack-sources 명령)"""
+    return _pack(get_archive())
+
+def archived_record(filename):
+    """zip에 보관된 원본 파일의 색인 기록 (없으면 None)"""
+    return get_archive().lookup(filename)
+
+def open_source(filename):
+    """보관된 원본 파일의 경로(개별 파일) 또는 내용(BytesIO, zip 멤버). 없으면 None"""
+    return get_archive().open_source(filename)
+
+def restore_source(filename, dest_path):
+    """보관된 원본 파일을 dest_path로 복사 (개별 파일/zip 멤버 모두). 보관된 파일이 없으면 False"""
+    source = open_source(filename)
+    if source is None:
+        return False
+    if isinstance(source, str):
+        shutil.copy2(source, dest_path)
+    else:
+        with open(dest_path, 'wb') as f:
+            f.write(source.getbuffer())
+    return True
+
+def archived_orders():
+    """주문조회 원본이 보관된 (스토어, 날짜) 목록"""
+    return get_archive().archived_orders()
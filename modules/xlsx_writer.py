@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+엑셀 리포트 쓰기
+
+config.XLSX_WRITER_PROFILE:
+    'standard': pandas to_excel로 시트를 쓰고 표 서식(add_table)과 전체 행 기준 열 너비 적용 (기존 방식)
+    'fast':     xlsxwriter constant_memory 모드로 행 단위로 바로 기록 (워크북 전체를 메모리에 들지 않음)
+                열 너비는 숫자 열은 최솟값/최댓값, 카테고리 열은 사용 중인 사전, 나머지는 표본 행으로 계산
+                constant_memory 모드는 표(add_table)를 지원하지 않으므로 머리글 서식 + 자동 필터로 대신함
+
+시트 구성(머리글/인덱스 위치)은 두 방식이 같아서 pd.read_excel로 다시 읽은 결과는 동일합니다.
+"""
+import logging
+import numpy as np
+import pandas as pd
+from . import config
+
+PROFILES = ('standard', 'fast')
+# 한 번에 object로 변환해 기록할 행 수 (fast 방식에서 변환용 임시 메모리 제한)
+WRITE_CHUNK_ROWS = 10000
+
+class Sheet:
+    """기록할 시트 하나: 이름, DataFrame, 인덱스 포함 여부, 표 서식/열 너비 적용 여부"""
+    __slots__ = ('name', 'df', 'index', 'styled')
+
+    def __init__(self, name, df, index=False, styled=False):
+        self.name = name
+        self.df = df
+        self.index = index
+        self.styled = styled
+
+def _profile(profile):
+    profile = profile or config.XLSX_WRITER_PROFILE
+    if profile not in PROFILES:
+        logging.warning(f"알 수 없는 엑셀 쓰기 방식 '{profile}' - 'standard'로 기록합니다.")
+        return 'standard'
+    return profile
+
+def column_widths(df):
+    """기존 방식의 열 너비: 모든 값을 문자열로 바꾼 최대 길이와 헤더 길이 중 큰 값 + 2"""
+    return [max(df[col].astype(str).map(len).max(), len(col)) + 2 for col in df.columns]
+
+def _sample_positions(length, sample_rows):
+    if length <= sample_rows:
+        return None
+    return np.unique(np.linspace(0, length - 1, sample_rows).astype(np.int64))
+
+def _text_length(series, sample_rows):
+    """astype(str) 기준 최대 문자열 길이를 전체 변환 없이 추정"""
+    if len(series) == 0:
+        return 0
+    has_missing = bool(series.isna().any())
+    missing_length = 3 if has_missing else 0  # astype(str)에서 NaN은 'nan'
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.remove_unused_categories().cat.categories
+        if len(categories) == 0:
+            return missing_length
+        return max(int(categories.astype(str).str.len().max()), missing_length)
+    if pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        values = series.dropna()
+        if values.empty:
+            return missing_length
+        return max(len(str(values.max())), len(str(values.min())), missing_length)
+
+    positions = _sample_positions(len(series), sample_rows)
+    sample = series if positions is None else series.iloc[positions]
+    if pd.api.types.is_float_dtype(series.dtype):
+        # 표본 외에 최댓값/최솟값도 포함 (자릿수가 가장 긴 값일 가능성이 높음)
+        sample = pd.concat([sample, pd.Series([series.max(), series.min()], dtype=series.dtype)])
+    return max(int(sample.astype(str).str.len().max()), missing_length)
+
+def sampled_column_widths(df, sample_rows=None):
+    """fast 방식의 열 너비 (표본/벡터화 계산)"""
+    sample_rows = sample_rows or config.XLSX_WIDTH_SAMPLE_ROWS
+    return [max(_text_length(df[col], sample_rows), len(str(col))) + 2 for col in df.columns]
+
+def _write_standard(output_path, sheets):
+    with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+        for sheet in sheets:
+            sheet.df.to_excel(writer, sheet_name=sheet.name, index=sheet.index)
+            if not sheet.styled:
+                continue
+            # 표 서식 적용
+            worksheet = writer.sheets[sheet.name]
+            (max_row, max_col) = sheet.df.shape
+            worksheet.add_table(0, 0, max_row, max_col - 1, {'columns': [{'header': col} for col in sheet.df.columns]})
+            for i, width in enumerate(column_widths(sheet.df)):
+                worksheet.set_column(i, i, width)
+
+def _iter_rows(df):
+    """NaN을 빈 셀(None)로 바꾼 파이썬 값 행을 청크 단위로 생성"""
+    for start in range(0, len(df), WRITE_CHUNK_ROWS):
+        chunk = df.iloc[start:start + WRITE_CHUNK_ROWS]
+        values = chunk.astype(object).where(chunk.notna(), None)
+        yield from values.to_numpy().tolist()
+
+def _write_fast_sheet(workbook, sheet, header_format):
+    worksheet = workbook.add_worksheet(sheet.name)
+    df = sheet.df
+    if sheet.index:
+        # pandas to_excel(index=True)와 같은 배치: [인덱스 이름, 열 값...] / [인덱스 값, 데이터...]
+        # (열이 하나도 없으면 pandas는 빈 머리글 행 다음 줄에 인덱스 이름을 씀)
+        row = 0 if len(df.columns) else 1
+        worksheet.write(row, 0, df.index.name, header_format)
+        for col_index, label in enumerate(df.columns, start=1):
+            worksheet.write(0, col_index, label, header_format)
+        row += 1
+        for label, values in zip(df.index, _iter_rows(df)):
+            worksheet.write(row, 0, label, header_format)
+            worksheet.write_row(row, 1, values)
+            row += 1
+        return worksheet
+
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+    row = 1
+    for values in _iter_rows(df):
+        worksheet.write_row(row, 0, values)
+        row += 1
+    if sheet.styled:
+        # constant_memory 모드는 표를 지원하지 않으므로 자동 필터와 머리글 고정으로 대신함
+        if len(df.columns):
+            worksheet.autofilter(0, 0, len(df), len(df.columns) - 1)
+        worksheet.freeze_panes(1, 0)
+        for i, width in enumerate(sampled_column_widths(df)):
+            worksheet.set_column(i, i, width)
+    return worksheet
+
+def _write_fast(output_path, sheets):
+    import xlsxwriter
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True, 'nan_inf_to_errors': True})
+    try:
+        # pandas 기본 머리글 서식과 동일
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        for sheet in sheets:
+            _write_fast_sheet(workbook, sheet, header_format)
+    finally:
+        workbook.close()
+
+def write_workbook(output_path, sheets, profile=None):
+    """sheets(Sheet 목록)를 output_path에 기록 (profile 생략 시 config.XLSX_WRITER_PROFILE)"""
+    if _profile(profile) == 'fast':
+        _write_fast(output_path, sheets)
+    else:
+        _write_standard(output_path, sheets)